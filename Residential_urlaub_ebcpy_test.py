@@ -1,185 +1,81 @@
-import os
-import pathlib
-import easygui as gui
-import pandas as pd
-from datetime import datetime
-import time
-import numpy as np
-import matplotlib.pyplot as plt
-# Imports from ebcpy
-from ebcpy import DymolaAPI, TimeSeriesData, FMU_API
-from ebcpy.utils.conversion import convert_tsd_to_modelica_txt
-
-from teaser.logic.buildingobjects.buildingphysics.window import Window
-from teaser.project import Project
-from teaser.logic.buildingobjects.building import Building
-from teaser.logic.buildingobjects.thermalzone import ThermalZone
-from teaser.logic.buildingobjects.useconditions \
-    import UseConditions
-from teaser.logic.buildingobjects.buildingphysics.outerwall import OuterWall
-from teaser.logic.buildingobjects.buildingphysics.innerwall import InnerWall
-from teaser.logic.buildingobjects.buildingphysics.ceiling import Ceiling
-from teaser.logic.buildingobjects.buildingphysics.floor import Floor
-import teaser.logic.utilities as utilities
-# from teaser.logic.buildingobjects.buildingphysics.layer import Layer
-# from teaser.logic.buildingobjects.buildingphysics.material import Material
-
-
-def main(
-        aixlib_mo,
-        teaser_mo,
-        building_mo,
-        savepath,
-        result_file_name,
-        cd=None,
-        n_cpu=1,
-        min_year_of_construction=None,
-        max_year_of_construction=None,
-        height_of_floors=None,
-        with_ahu=None,
-        residential_layout=None,
-        internal_gains=None,
-        with_heating=None,
-        construction=None,
-        with_plot=True,
-):
-    # General settings
-    if cd is None:
-        cd = pathlib.Path(__file__).parent.joinpath("results")
-
-    # ######################### Simulation API Instantiation ##########################
-    # %% Setup the Dymola-API:
-    dym_api = DymolaAPI(
-        model_name=building_mo,
-        cd=cd,
-        n_cpu=n_cpu,
-        packages=[aixlib_mo, teaser_mo],
-        show_window=True,
-        n_restart=-1,
-        equidistant_output=False,
-        get_structural_parameters=True,
-        # Only necessary if you need a specific dymola version
-        dymola_path=(r'C:\Program Files\Dymola 2021')
-        # dymola_version=None
-    )
+"""Variantenstudie 3ZimKid: TEASER-Modelle erzeugen, simulieren und auswerten.
 
-    ######################### Teaser ##########################
-    prj = Project(load_data=True)
-    prj.used_library_calc = 'AixLib',
-    prj.number_of_elements_calc = 2
-    prj.weather_file_path = utilities.get_full_path(
-        os.path.join(
-            "data",
-            "input",
-            "inputdata",
-            "weatherdata",
-            "DEU_BW_Mannheim_107290_TRY2010_12_Jahr_BBSR.mos"))
+Läuft ohne Anzeige (Dymola ohne Fenster, keine GUI- oder Plot-Module);
+Bibliothek, Dymola und Ablageorte werden über die Kommandozeile gesetzt:
 
-# ______________________________________________________________________________________________________________________________________________________________________________
-
-    # Szenario
-    scenario = 1  # 1 oder 2'
-    weekend = 1  # 0 oder 1
-
-     # Create a list of years of construction
-    construction_years =[1900, 1925, 1950, 1962, 1970, 1980, 1992, 2000, 2003]
-
-    # create a dictionary to map the areas to the years of construction
-    area_construction_years = {
-        75: construction_years[0],
-        75: construction_years[1],
-        68: construction_years[2],
-        62: construction_years[3],
-        67: construction_years[4],
-        73: construction_years[5],
-        75: construction_years[6],
-        73: construction_years[7],
-        75: construction_years[8],
-        85: construction_years[9],
-       }
-
-    # create a loop to assign the years of construction to each area
-    for area in building_model.thermal_zones:
-        area.set_attribute('year_of_construction', area_construction_years[area.area])
-
-    # Create a list of tuples with each leased area and corresponding year of construction
-    year_leased_area = list(zip(years_of_construction, leased_areas))
-
-    # loop over all years of construction and simulate each building
-    for year, leased_area in year_leased_area:
-        print(f"Creating building model for year {year} with leased area {leased_area}...")
-
-        # Create the building model
-        building = Building(
-            net_leased_area=leased_area,
-            year_of_construction=year,
-            height_of_floors=height_of_floors,
-            number_of_floors=number_of_floors,
-            with_ahu=with_ahu,
-            residential_layout=residential_layout,
-            internal_gains=internal_gains,
-            with_heating=with_heating,
-            construction=construction,
-            name=f"Building {year}_{leased_area}"
-        )
+    python Residential_urlaub_ebcpy_test.py --aixlib-mo /opt/AixLib/package.mo --savepath /scratch/sweep
+"""
+import argparse
+import os
+import socket
+import time
+from functools import partial
+
+from fmu_backend import FMUBackend, FMUExporter
+from incremental_export import ObjectStore
+from job_queue import JobQueue, LeaseKeeper, iter_claims
+from kpis import compute_kpis, write_summary, compare_constructions, normalize_heating
+from pipeline import run_pipeline
+from simulators import SessionPool, SessionDirs, DymolaBackend, StubBackend, SIMULATION_SETUP
+from archetypes import archetype_cache, check_archetype
+from doe import METHODS, qmc_available, sample_indices, refine_indices, variant_responses
+from retrofit import NO_RETROFIT, RETROFIT_SETTINGS, retrofit_variant
+from sweep import SweepSpec, building_parameters, parse_shard
+from rc_backend import RCBackend, rc_parameters
+from result_cache import ResultCache, inputs_key, file_digest, library_version
+from result_store import ResultStore, DEFAULT_VARIABLES
+from schedules import apply_schedules, teaser_day_profiles
+from time_chunks import CHUNKS, DAY, simulate_chunked, compare_results
+from tracing import Tracer, stage
+from weather import load_weather, heating_degree_days
+from teaser_models import new_project, variant_project, add_building, calc_building, export_building, \
+    model_name, reuse_package, write_schedule_tables, weather_file_path
+
+
+# Modelica-Bibliothek und Ablageorte (Voreinstellungen, per Kommandozeile überschreibbar).
+# AixLib und Dymola aus der Umgebung; ohne DYMOLA_PATH sucht ebcpy die Installation selbst
+aixlib_mo = os.environ.get("AIXLIB_MO")
+dymola_path = os.environ.get("DYMOLA_PATH")
+savepath = "results"
+# None -> TEASER-Standardablage
+teaser_output = None
 
-        # Add a thermal zone to the building model
-        zone = ThermalZone(
-            name="ThermalZone",
-            use_conditions=UseConditions(
-                occupancy=occupancy,
-                monday_schedule=monday_schedule,
-                tuesday_schedule=tuesday_schedule)
-        )
-  # Run the simulation
-        result = simulate_building(
-            aixlib_mo=aixlib_mo,
-            teaser_mo=teaser_mo,
-            building=building,
-            thermal_zones=[zone],
-            cd=cd,
-            n_cpu=n_cpu,
-            savepath=savepath,
-            result_file_name=result_file_name,
-            with_plot=with_plot,
-        )
 
-        # Print the heating energy demand for the building
-        print(f"Heating energy demand for Building {year}_{leased_area}: {result.heating_demand:.2f} kWh")
 #
-# Parameter Maximim-, Minimumwerte und Schrittgrößen. Bei festem Wert: Max = Min eingeben
-# Anzahl Etagen
-min_number_of_floors = 1
-max_number_of_floors = 1
-step_number_of_floors = 1
-
-# Geschosshöhe
-min_height_of_floors = 3.0
-max_height_of_floors = 3.0
-step_height_of_floors = .5
-
-# AirHandlingUnit
-both_ahu = False  # Modelle mit beiden Optionen? (an und aus)
-with_ahu = False  # Falls nur mit einem -> Mit (true) oder ohne (false)?
-
-# Struktur
-both_layout = False  # Modelle mit beiden Optionen? (an und aus)
-residential_layout = 0  # 0 -> compact; 1 -> elongated/complex
-
-# Internal gains
-internal_gains_all = False  # Modelle mit allen Optionen?
-internal_gains = 1
-
-# Heizung
-both_heating = False  # Modelle mit beiden Optionen? (an und aus)
-with_heating = True
-
-#Bautyp
-both_const = True #Modelle mit beiden Optionen? (an und aus)
-construction = "tabula_retrofit"
-
-# Urlaubswochen
-holiday = [4, 5, 20, 21, 40, 41]
+# Parameterraum der Variantenstudie. Je Dimension entweder eine feste Zahl, eine Liste
+# expliziter Werte oder ein Bereich {"min": .., "max": .., "step": ..}. Bei festem Wert: Max = Min eingeben
+sweep_spec = {
+    # Wohnfläche
+    "leased_area": {"min": 75, "max": 75, "step": 10},
+    # Baujahr
+    "year_of_construction": [1900, 1925, 1950, 1962, 1970, 1980, 1992, 2000, 2003],
+    # Anzahl Etagen
+    "number_of_floors": {"min": 1, "max": 1, "step": 1},
+    # Geschosshöhe
+    "height_of_floors": {"min": 3.0, "max": 3.0, "step": .5},
+    # AirHandlingUnit: [False, True] -> Modelle mit beiden Optionen (an und aus)
+    "with_ahu": [False],
+    # Struktur: 0 -> compact; 1 -> elongated/complex
+    "residential_layout": [0],
+    # Internal gains: [1, 2, 3] -> Modelle mit allen Optionen
+    "internal_gains": [1],
+    # Heizung: [True, False] -> Modelle mit beiden Optionen (an und aus)
+    "with_heating": [True],
+    # Bautyp
+    "construction": ["tabula_standard", "tabula_retrofit"],
+    # Sanierung des berechneten Gebäudes: "none", "retrofit" oder "adv_retrofit" (Jahr, Fenster
+    # und Dämmstoff aus RETROFIT_SETTINGS); frühere Studie: "tabula_retrofit" mit "adv_retrofit"
+    "retrofit": ["none"],
+}
+
+# Nutzungsprofile. Ändern nur Tabellen, nicht die Modellstruktur
+schedule_variants = [
+    {
+        "scenario": 1,  # 1 oder 2
+        "weekend": 1,  # 0 oder 1
+        "holiday": [4, 5, 20, 21, 40, 41],  # Urlaubswochen
+    },
+]
 
 # ______________________________________________________________________________________________________________________________________________________________________________
 
@@ -187,343 +83,590 @@ usage = 'multi_family_house'
 name = "3ZimKid"
 method = 'tabula_de'
 
-# ______________Zähler für die Schleifen______________
-if internal_gains_all:
-    internal_gains_help = 3
-else:
-    internal_gains_help = 1
-
-if both_layout:
-    layout_help = 2
-else:
-    layout_help = 1
-
-if both_ahu:
-    ahu_help = 2
-else:
-    ahu_help = 1
-
-if both_heating:
-    heating_help = 2
-else:
-    heating_help = 1
-
-if both_const:
-    const_help = 2
-else:
-    const_help = 1
-
-zone0_M = []
-zone1_M = []
-zone2_M = []
-zone3_M = []
-zone4_M = []
-zone0_H = []
-zone1_H = []
-zone2_H = []
-zone3_H = []
-zone4_H = []
-zone0_P = []
-zone1_P = []
-zone2_P = []
-zone3_P = []
-zone4_P = []
-y = 1
-height_help = int((max_height_of_floors - min_height_of_floors) / step_height_of_floors) + 1
-number_floors_help = int((max_number_of_floors - min_number_of_floors) / step_number_of_floors) + 1
-
-# ___________________Schleifen_____________________
-leased_area = min_leased_area
-for x in range(area_help):
-
-    year_of_construction = min_year_of_construction
-    for x in range(year_help):
-
-        number_of_floors = min_number_of_floors
-        for x in range(number_floors_help):
-
-            height_of_floors = min_height_of_floors
-            for x in range(height_help):
-
-                for x in range(ahu_help):
-
-                    if both_layout:
-                        residential_layout = 0
-                    for x in range(layout_help):
-
-                        if internal_gains_all:
-                            internal_gains = 1
-                        for x in range(internal_gains_help):
-
-                            for x in range(heating_help):
-
-                                if both_const:
-                                    construction = "tabula_standard"
-                                for x in range(const_help):
-
-                                    prj.name = name + "_urlaub_scenario:" + str(scenario) + "_area:" + str(leased_area) + "_constructed:" + str(year_of_construction) + "_numberFloors:" + str(number_of_floors) + "_heightFloors:" + str(height_of_floors) + "_ahu:" + str(with_ahu) + "_layout:" + str(residential_layout) + "_internalGainsMode:" + str(internal_gains) + "_heating:" + str(with_heating) + "_constructiontyp:" + str(construction)
-                                    W_G = prj.add_residential(
-                                        method=method,
-                                        usage=usage,
-                                        name=name,
-                                        year_of_construction=year_of_construction,
-                                        number_of_floors=number_of_floors,
-                                        height_of_floors=height_of_floors,
-                                        net_leased_area=leased_area,
-                                        with_ahu=with_ahu,
-                                        residential_layout=residential_layout,
-                                        internal_gains_mode=internal_gains,
-                                        construction_type=construction
-                                    )
-
-                                    W_G.thermal_zones[0].use_conditions.machines = 1000 / (0.25 * leased_area)
-                                    W_G.thermal_zones[1].use_conditions.machines = 1000 / (0.20 * leased_area)
-                                    W_G.thermal_zones[2].use_conditions.machines = 1000 / (0.15 * leased_area)
-                                    W_G.thermal_zones[3].use_conditions.machines = 1000 / (0.20 * leased_area)
-                                    W_G.thermal_zones[4].use_conditions.machines = 1000 / (0.20 * leased_area)
-
-
-                                    for x in range(53):
-                                        if x in holiday:
-                                            if scenario == 1 and weekend == 0 or scenario == 1 and weekend == 1:
-                                                for y in range(7):
-                                                    zone0_M.extend([0]*24)
-                                                    zone1_M.extend([0.165]*24)
-                                                    zone2_M.extend([0]*24)
-                                                    zone3_M.extend([0]*24)
-                                                    zone4_M.extend([0] * 24)
-                                                    zone0_P.extend([0] * 24)
-                                                    zone1_P.extend([0] * 24)
-                                                    zone2_P.extend([0] * 24)
-                                                    zone3_P.extend([0] * 24)
-                                                    zone4_P.extend([0] * 24)
-                                                    zone0_H.extend([288.15] * 24)
-                                                    zone1_H.extend([288.15] * 24)
-                                                    zone2_H.extend([288.15] * 24)
-                                                    zone3_H.extend([288.15] * 24)
-                                                    zone4_H.extend([288.15] * 24)
-
-                                            elif scenario == 2 and weekend == 0 or scenario == 2 and weekend == 1:
-                                                for y in range(7):
-                                                    zone0_M.extend([0] * 24)
-                                                    zone1_M.extend([0.165] * 24)
-                                                    zone2_M.extend([0] * 24)
-                                                    zone3_M.extend([0] * 24)
-                                                    zone4_M.extend([0] * 24)
-                                                    zone0_P.extend([0] * 24)
-                                                    zone1_P.extend([0] * 24)
-                                                    zone2_P.extend([0] * 24)
-                                                    zone3_P.extend([0] * 24)
-                                                    zone4_P.extend([0] * 24)
-                                                    zone0_H.extend([288.15] * 24)
-                                                    zone1_H.extend([288.15] * 24)
-                                                    zone2_H.extend([288.15] * 24)
-                                                    zone3_H.extend([288.15] * 24)
-                                                    zone4_H.extend([288.15] * 24)
-                                            else:
-                                                print(
-                                                    'Scenario ' + str(scenario) + ' nicht vorhanden. Kein Modell erstellt!')
-                                                quit()
-                                        else:
-                                            if scenario == 1 and weekend == 0:
-                                                for y in range(5):
-                                                    zone0_M.extend([0,	0,	0,	0,	0,	0,	0,	0.06,	0.2376,	0.18,	0.18,	0.18,	0.18,	0.18,	0.18,	0.18,	0.18,	0.18,	0.18,	0.297,	0.297,	0.297,	0.2994,	0])
-                                                    zone1_M.extend([0.165,	0.165,	0.165,	0.165,	0.165,	0.165,	0.165,	0.48,	0.165,	0.165,	0.165,	0.165,	0.165,	0.165,	0.165,	0.165,	0.165,	0.165,	0.165,	0.7004,	0.165,	0.165,	0.165,	0.165])
-                                                    zone2_M.extend([0,	0,	0,	0,	0,	0,	0,	0,	0.005,	0,	0.005,	0,	0,	0,	0,	0,	0,	0.005,	0,	0,	0,	0,	0.03,	0])
-                                                    zone3_M.extend([0,	0,	0,	0,	0,	0,	0.06,	0,	0,	0,	0,	0,	0,	0,	0,	0,	0,	0,	0,	0,	0,	0,	0,	0.06])
-                                                    zone4_M.extend([0,	0,	0,	0,	0,	0,	0.06,	0,	0,	0,	0,	0,	0,	0,	0,	0.15,	0.15,	0.15,	0.15,	0,	0,	0,	0.06,	0])
-                                                    zone0_P.extend(W_G.thermal_zones[0].use_conditions.persons_profile)
-                                                    zone1_P.extend(W_G.thermal_zones[1].use_conditions.persons_profile)
-                                                    zone2_P.extend(W_G.thermal_zones[2].use_conditions.persons_profile)
-                                                    zone3_P.extend(W_G.thermal_zones[3].use_conditions.persons_profile)
-                                                    zone4_P.extend(W_G.thermal_zones[4].use_conditions.persons_profile)
-                                                    zone0_H.extend(W_G.thermal_zones[0].use_conditions.heating_profile)
-                                                    zone1_H.extend(W_G.thermal_zones[1].use_conditions.heating_profile)
-                                                    zone2_H.extend(W_G.thermal_zones[2].use_conditions.heating_profile)
-                                                    zone3_H.extend(W_G.thermal_zones[3].use_conditions.heating_profile)
-                                                    zone4_H.extend(W_G.thermal_zones[4].use_conditions.heating_profile)
-                                                for y in range(5, 7):
-                                                    zone0_M.extend([0]*24)
-                                                    zone1_M.extend([0.165] * 24)
-                                                    zone2_M.extend([0] * 24)
-                                                    zone3_M.extend([0] * 24)
-                                                    zone4_M.extend([0] * 24)
-                                                    zone0_P.extend([0] * 24)
-                                                    zone1_P.extend([0] * 24)
-                                                    zone2_P.extend([0] * 24)
-                                                    zone3_P.extend([0] * 24)
-                                                    zone4_P.extend([0] * 24)
-                                                    zone0_H.extend([288.15] * 24)
-                                                    zone1_H.extend([288.15] * 24)
-                                                    zone2_H.extend([288.15] * 24)
-                                                    zone3_H.extend([288.15] * 24)
-                                                    zone4_H.extend([288.15] * 24)
-                                            elif scenario == 1 and weekend == 1:
-                                                for y in range(5):
-                                                    zone0_M.extend([0, 0, 0, 0, 0, 0, 0, 0.06, 0.2376, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.297, 0.297, 0.297, 0.2994, 0])
-                                                    zone1_M.extend([0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165,0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.7004, 0.165, 0.165, 0.165, 0.165])
-                                                    zone2_M.extend([0, 0, 0, 0, 0, 0, 0, 0, 0.005, 0, 0.005, 0, 0, 0, 0, 0, 0, 0.005, 0, 0, 0, 0, 0.03, 0])
-                                                    zone3_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0.06])
-                                                    zone4_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0.15, 0.15, 0.15, 0.15, 0, 0, 0, 0.06, 0])
-                                                    zone0_P.extend(W_G.thermal_zones[0].use_conditions.persons_profile)
-                                                    zone1_P.extend(W_G.thermal_zones[1].use_conditions.persons_profile)
-                                                    zone2_P.extend(W_G.thermal_zones[2].use_conditions.persons_profile)
-                                                    zone3_P.extend(W_G.thermal_zones[3].use_conditions.persons_profile)
-                                                    zone4_P.extend(W_G.thermal_zones[4].use_conditions.persons_profile)
-                                                    zone0_H.extend(W_G.thermal_zones[0].use_conditions.heating_profile)
-                                                    zone1_H.extend(W_G.thermal_zones[1].use_conditions.heating_profile)
-                                                    zone2_H.extend(W_G.thermal_zones[2].use_conditions.heating_profile)
-                                                    zone3_H.extend(W_G.thermal_zones[3].use_conditions.heating_profile)
-                                                    zone4_H.extend(W_G.thermal_zones[4].use_conditions.heating_profile)
-                                                for y in range(5, 7):
-                                                    zone0_M.extend([0,	0,	0,	0,	0,	0,	0,	0.06,	0.255,	0.255,	0.255,	0.255,	0.255,	0.255,	0.255,	0.255,	0.255,	0.255,	0.255,	0.255,	0,	0,	0.255,	0.255])
-                                                    zone1_M.extend([0.165,	0.165,	0.165,	0.165,	0.165,	0.165,	0.165,	0.48,	0.165,	0.165,	0.165,	0.165,	0.165,	0.48,	0.165,	0.165,	0.165,	0.165,	0.165,	0.7004,	0.165,	0.165,	0.165,	0.165])
-                                                    zone2_M.extend([0,	0,	0,	0,	0,	0,	0.03,	0,	0.005,	0,	0.005,	0,	0,	0,	0,	0,	0,	0.005,	0,	0,	0,	0,	0.03,	0])
-                                                    zone3_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0.06])
-                                                    zone4_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0.15, 0.15, 0.15, 0.15, 0, 0, 0, 0.06, 0])
-                                                    zone0_P.extend(W_G.thermal_zones[0].use_conditions.persons_profile)
-                                                    zone1_P.extend(W_G.thermal_zones[1].use_conditions.persons_profile)
-                                                    zone2_P.extend(W_G.thermal_zones[2].use_conditions.persons_profile)
-                                                    zone3_P.extend(W_G.thermal_zones[3].use_conditions.persons_profile)
-                                                    zone4_P.extend(W_G.thermal_zones[4].use_conditions.persons_profile)
-                                                    zone0_H.extend(W_G.thermal_zones[0].use_conditions.heating_profile)
-                                                    zone1_H.extend(W_G.thermal_zones[1].use_conditions.heating_profile)
-                                                    zone2_H.extend(W_G.thermal_zones[2].use_conditions.heating_profile)
-                                                    zone3_H.extend(W_G.thermal_zones[3].use_conditions.heating_profile)
-                                                    zone4_H.extend(W_G.thermal_zones[4].use_conditions.heating_profile)
-                                            elif scenario == 2 and weekend == 0:
-                                                for y in range(5):
-                                                    zone0_M.extend([0, 0, 0, 0, 0, 0, 0, 0.06, 0.2376, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.297, 0.297, 0.297, 0.2994, 0])
-                                                    zone1_M.extend([0.165,	0.165,	0.165,	0.165,	0.165,	0.165,	0.165,	0.48,	0.165,	0.165,	0.165,	0.165,	0.165,	0.48,	0.165,	0.165,	0.165,	0.165,	0.165,	0.7004,	0.165,	0.165,	0.165,	0.165])
-                                                    zone2_M.extend([0, 0, 0, 0, 0, 0, 0, 0, 0.005, 0, 0.005, 0, 0, 0, 0, 0, 0, 0.005, 0, 0, 0, 0, 0.03, 0])
-                                                    zone3_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0.06])
-                                                    zone4_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0.15, 0.15, 0.15, 0.15, 0, 0, 0, 0.06, 0])
-                                                    zone0_P.extend(W_G.thermal_zones[0].use_conditions.persons_profile)
-                                                    zone1_P.extend(W_G.thermal_zones[1].use_conditions.persons_profile)
-                                                    zone2_P.extend(W_G.thermal_zones[2].use_conditions.persons_profile)
-                                                    zone3_P.extend(W_G.thermal_zones[3].use_conditions.persons_profile)
-                                                    zone4_P.extend(W_G.thermal_zones[4].use_conditions.persons_profile)
-                                                    zone0_H.extend([294.15] * 24)
-                                                    zone1_H.extend([294.15] * 24)
-                                                    zone2_H.extend([294.15] * 24)
-                                                    zone3_H.extend([294.15] * 24)
-                                                    zone4_H.extend([294.15] * 24)
-                                                for y in range(5, 7):
-                                                    zone0_M.extend([0]*24)
-                                                    zone1_M.extend([0.165] * 24)
-                                                    zone2_M.extend([0] * 24)
-                                                    zone3_M.extend([0] * 24)
-                                                    zone4_M.extend([0] * 24)
-                                                    zone0_P.extend([0] * 24)
-                                                    zone1_P.extend([0] * 24)
-                                                    zone2_P.extend([0] * 24)
-                                                    zone3_P.extend([0] * 24)
-                                                    zone4_P.extend([0] * 24)
-                                                    zone0_H.extend([294.15] * 24)
-                                                    zone1_H.extend([294.15] * 24)
-                                                    zone2_H.extend([294.15] * 24)
-                                                    zone3_H.extend([294.15] * 24)
-                                                    zone4_H.extend([294.15] * 24)
-                                            elif scenario == 2 and weekend == 1:
-                                                for y in range(5):
-                                                    zone0_M.extend([0, 0, 0, 0, 0, 0, 0, 0.06, 0.2376, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.297, 0.297, 0.297, 0.2994, 0])
-                                                    zone1_M.extend([0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165, 0.165, 0.165, 0.165, 0.165, 0.7004, 0.165, 0.165, 0.165, 0.165])
-                                                    zone2_M.extend([0, 0, 0, 0, 0, 0, 0, 0, 0.005, 0, 0.005, 0, 0, 0, 0, 0, 0, 0.005, 0, 0, 0, 0, 0.03, 0])
-                                                    zone3_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0.06])
-                                                    zone4_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0.15, 0.15, 0.15,0.15, 0, 0, 0, 0.06, 0])
-                                                    zone0_P.extend(W_G.thermal_zones[0].use_conditions.persons_profile)
-                                                    zone1_P.extend(W_G.thermal_zones[1].use_conditions.persons_profile)
-                                                    zone2_P.extend(W_G.thermal_zones[2].use_conditions.persons_profile)
-                                                    zone3_P.extend(W_G.thermal_zones[3].use_conditions.persons_profile)
-                                                    zone4_P.extend(W_G.thermal_zones[4].use_conditions.persons_profile)
-                                                    zone0_H.extend([294.15] * 24)
-                                                    zone1_H.extend([294.15] * 24)
-                                                    zone2_H.extend([294.15] * 24)
-                                                    zone3_H.extend([294.15] * 24)
-                                                    zone4_H.extend([294.15] * 24)
-                                                for y in range(5, 7):
-                                                    zone0_M.extend([0, 0, 0, 0, 0, 0, 0, 0.06, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0, 0, 0.255, 0.255])
-                                                    zone1_M.extend([0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165, 0.165, 0.165, 0.165, 0.165, 0.7004, 0.165, 0.165, 0.165, 0.165])
-                                                    zone2_M.extend([0, 0, 0, 0, 0, 0, 0.03, 0, 0.005, 0, 0.005, 0, 0, 0, 0, 0, 0, 0.005, 0, 0, 0, 0, 0.03, 0])
-                                                    zone3_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0.06])
-                                                    zone4_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0.15, 0.15, 0.15, 0.15, 0, 0, 0, 0.06, 0])
-                                                    zone0_P.extend(W_G.thermal_zones[0].use_conditions.persons_profile)
-                                                    zone1_P.extend(W_G.thermal_zones[1].use_conditions.persons_profile)
-                                                    zone2_P.extend(W_G.thermal_zones[2].use_conditions.persons_profile)
-                                                    zone3_P.extend(W_G.thermal_zones[3].use_conditions.persons_profile)
-                                                    zone4_P.extend(W_G.thermal_zones[4].use_conditions.persons_profile)
-                                                    zone0_H.extend([294.15] * 24)
-                                                    zone1_H.extend([294.15] * 24)
-                                                    zone2_H.extend([294.15] * 24)
-                                                    zone3_H.extend([294.15] * 24)
-                                                    zone4_H.extend([294.15] * 24)
-                                            else:
-                                                print(
-                                                    'Scenario ' + str(
-                                                        scenario) + ' nicht vorhanden. Kein Modell erstellt!')
-                                                quit()
-
-                                    W_G.thermal_zones[0].use_conditions.machines_profile = zone0_M
-                                    W_G.thermal_zones[1].use_conditions.machines_profile = zone1_M
-                                    W_G.thermal_zones[2].use_conditions.machines_profile = zone2_M
-                                    W_G.thermal_zones[3].use_conditions.machines_profile = zone3_M
-                                    W_G.thermal_zones[4].use_conditions.machines_profile = zone4_M
-                                    W_G.thermal_zones[0].use_conditions.persons_profile = zone0_P
-                                    W_G.thermal_zones[1].use_conditions.persons_profile = zone1_P
-                                    W_G.thermal_zones[2].use_conditions.persons_profile = zone2_P
-                                    W_G.thermal_zones[3].use_conditions.persons_profile = zone3_P
-                                    W_G.thermal_zones[4].use_conditions.persons_profile = zone4_P
-                                    W_G.thermal_zones[0].use_conditions.heating_profile = zone0_H
-                                    W_G.thermal_zones[1].use_conditions.heating_profile = zone1_H
-                                    W_G.thermal_zones[2].use_conditions.heating_profile = zone2_H
-                                    W_G.thermal_zones[3].use_conditions.heating_profile = zone3_H
-                                    W_G.thermal_zones[4].use_conditions.heating_profile = zone4_H
-                                    for x in range(4):
-                                        W_G.thermal_zones[x].use_conditions.with_heating = with_heating
-
-
-                                    prj.calc_all_buildings()
-                                    prj.export_aixlib()
-
-                                    model_export_path = pathlib.Path(r'C:\Users\mel-ama\TEASEROutput').joinpath(prj.name,"package.mo")
-                                    print(model_export_path)
-                                    main(
-                                        aixlib_mo=r"C:\Users\mel-ama\sciebo2\Modelica\AixLib-development_1.0.2\AixLib\package.mo",
-                                        teaser_mo=model_export_path,
-                                        building_mo=prj.name+".B"+name+".B"+name,
-                                        savepath=r"D:\00_temp",
-                                        result_file_name=prj.name,
-                                        n_cpu=1
-                                    )
-                                    if both_const:
-                                        construction = "tabula_retrofit"
-                                        prj.retrofit_all_buildings(
-                                            year_of_retrofit=2015,
-                                            type_of_retrofit="adv_retrofit",
-                                            window_type='Alu- oder Stahlfenster, Isolierverglasung',
-                                            material='EPS_perimeter_insulation_top_layer')
-
-                                if both_heating:
-                                    with_heating = not with_heating
-
-                            if internal_gains_all:
-                                internal_gains = internal_gains + 1
-
-                        if both_layout:
-                            residential_layout = residential_layout + 1
-
-                    if both_ahu:
-                        with_ahu = not with_ahu
-
-                height_of_floors = height_of_floors + step_height_of_floors
-
-            number_of_floors = number_of_floors + step_number_of_floors
-
-        year_of_construction = year_of_construction + step_year_of_construction
-
-    leased_area = leased_area + step_leased_area
-
-
-
-
 
+def variant_name(variant):
+    return name + "_area:" + str(variant["leased_area"]) + "_constructed:" + str(variant["year_of_construction"]) + "_numberFloors:" + str(variant["number_of_floors"]) + "_heightFloors:" + str(variant["height_of_floors"]) + "_ahu:" + str(variant["with_ahu"]) + "_layout:" + str(variant["residential_layout"]) + "_internalGainsMode:" + str(variant["internal_gains"]) + "_heating:" + str(variant["with_heating"]) + "_constructiontyp:" + str(variant["construction"]) + retrofit_suffix(variant)
+
+
+def is_retrofit(variant):
+    return variant.get("retrofit", NO_RETROFIT) != NO_RETROFIT
+
+
+def retrofit_suffix(variant):
+    # Unsanierte Varianten behalten ihren bisherigen Namen
+    if not is_retrofit(variant):
+        return ""
+    return "_retrofit:" + str(variant["retrofit"])
+
+
+def run_name(variant, schedule):
+    return name + "_urlaub_scenario:" + str(schedule["scenario"]) + "_weekend:" + str(schedule["weekend"]) + "_holiday:" + "-".join(str(week) for week in schedule["holiday"]) + variant_name(variant)[len(name):]
+
+
+def library_id(library):
+    # Version statt Pfad: auf allen Rechnern gleich, auch bei anderem Installationsort
+    return library_version(library) if library and os.path.isfile(library) else library
+
+
+def model_key(variant, library=aixlib_mo):
+    # Alles, was das exportierte Modell bestimmt
+    return inputs_key({
+        "variant": variant,
+        "retrofit": RETROFIT_SETTINGS if is_retrofit(variant) else None,
+        "name": name,
+        "method": method,
+        "usage": usage,
+        "weather": file_digest(weather_file_path()),
+        "library": library_id(library),
+    })
+
+
+def run_key(model_key, schedule, backend, simulation=SIMULATION_SETUP):
+    return inputs_key({"model": model_key, "schedule": schedule, "simulation": simulation, "backend": backend})
+
+
+def job_settings(backend, simulation=SIMULATION_SETUP, library=aixlib_mo):
+    # Einstellungen, aus denen die Cache-Schlüssel eines Jobs berechnet werden
+    return {"backend": backend, "simulation": simulation, "library": library_id(library)}
+
+
+def schedule_dir(schedule):
+    # Tabellen je Nutzungsprofil, eindeutig auch im zwischengespeicherten Paket
+    return os.path.join("_schedules", inputs_key(schedule)[:16])
+
+
+def pending_tasks(variants, groups, cache, backend, store=None, library=aixlib_mo, simulation=SIMULATION_SETUP):
+    # Nur Läufe ohne vorhandenes Ergebnis im Cache erzeugen
+    skipped = 0
+    settings = job_settings(backend, simulation, library)
+    for variant in variants:
+        key = model_key(variant, library)
+        # Zwischengespeichertes Modell: alle offenen Profile in einem Job, da sich die Jobs
+        # sonst dasselbe Paket (und dessen Tabellen) teilen würden
+        merged = [] if cache.model_path(key) is not None else None
+        for schedules in groups:
+            todo = []
+            for schedule in schedules:
+                run = run_key(key, schedule, backend, simulation)
+                if not cache.has_result(run):
+                    todo.append((schedule, run))
+                elif store is not None:
+                    # Ergebnis vorhanden, aber evtl. noch nicht im Ergebnisspeicher
+                    store.add(run, cache.result_path(run), variant, schedule)
+            skipped += len(schedules) - len(todo)
+            if merged is not None:
+                merged.extend(todo)
+            elif todo:
+                yield {
+                    "variant": variant,
+                    "schedules": [schedule for schedule, run in todo],
+                    "keys": [run for schedule, run in todo],
+                    "model_key": key,
+                    "settings": settings,
+                }
+        if merged:
+            yield {
+                "variant": variant,
+                "schedules": [schedule for schedule, run in merged],
+                "keys": [run for schedule, run in merged],
+                "model_key": key,
+                "settings": settings,
+            }
+    if skipped:
+        print("Aus dem Cache übernommen: " + str(skipped))
+
+
+def generate_variant(
+        variant,
+        schedules,
+        keys=None,
+        object_store=None,
+        export=True,
+        output_path=teaser_output,
+        archetype_dir=None,
+        model=None,
+):
+    # Läuft in einem Worker-Prozess: Modell erzeugen, berechnen und einmal exportieren.
+    # Für jedes Nutzungsprofil werden nur die Tabellen-Dateien geschrieben.
+    # Ohne Export (RC-Screening) nur die RC-Parameter der Zonen.
+    # model: (Paketverzeichnis, Metadaten) eines zwischengespeicherten Exports
+    if len(schedules) == 1:
+        prj_name = run_name(variant, schedules[0])
+    else:
+        prj_name = variant_name(variant)
+    events = []
+    runs = [
+        {
+            "key": keys[index] if keys else None,
+            "schedule": schedule,
+            "result_file_name": run_name(variant, schedule),
+        }
+        for index, schedule in enumerate(schedules)]
+    package_dir = None
+    if export and model is not None:
+        model_dir, meta = model
+        with stage(events, "export", prj_name):
+            package_dir = reuse_package(model_dir, meta["package"], path=output_path)
+        for run in runs:
+            tables = meta.get("tables", {}).get(inputs_key(run["schedule"]))
+            if tables is not None:
+                run["tables"] = {target: os.path.join(package_dir, source) for target, source in tables.items()}
+        job = {
+            "variant": variant,
+            "trace": events,
+            "runs": runs,
+            "teaser_mo": os.path.join(package_dir, "package.mo"),
+            "building_mo": meta["building_mo"],
+        }
+        if all("tables" in run for run in runs):
+            # Weder Gebäude noch Export nötig
+            return job
+    # Eigenes Projekt je Variante, wird nach dem Export wieder freigegeben
+    with variant_project(prj_name, method) as prj:
+        with stage(events, "build", prj_name):
+            W_G = add_building(
+                prj,
+                name=name,
+                method=method,
+                usage=usage,
+                archetypes=archetype_cache(archetype_dir) if archetype_dir else None,
+                **building_parameters(variant)
+            )
+            day_profiles = teaser_day_profiles(W_G)
+            apply_schedules(W_G, day_profiles=day_profiles, **schedules[0])
+        with stage(events, "calc", prj_name):
+            calc_building(prj, W_G)
+        if is_retrofit(variant):
+            with stage(events, "retrofit", prj_name):
+                # Saniertes Gebäude ersetzt das berechnete im Projekt und wird exportiert
+                base = W_G
+                W_G = retrofit_variant(base, type_of_retrofit=variant["retrofit"], project=prj, **RETROFIT_SETTINGS)
+                prj.buildings.remove(base)
+                del base
+        if package_dir is None:
+            job = {"variant": variant, "trace": events, "runs": runs}
+        if not export:
+            # RC-Parameter nur für das Screening ohne Modelica-Export
+            job["rc"] = rc_parameters(W_G, day_profiles)
+        if export:
+            with stage(events, "export", prj_name):
+                if package_dir is None:
+                    package_dir = export_building(prj, W_G, path=output_path, object_store=object_store)
+                    job["teaser_mo"] = os.path.join(package_dir, "package.mo")
+                    job["building_mo"] = model_name(prj, W_G)
+                for run in runs:
+                    if "tables" in run:
+                        continue
+                    apply_schedules(W_G, day_profiles=day_profiles, **run["schedule"])
+                    run["tables"] = write_schedule_tables(
+                        W_G, os.path.join(package_dir, schedule_dir(run["schedule"])), object_store=object_store)
+        del W_G
+    return job
+
+
+def generate_task(task, object_store=None, export=True, output_path=teaser_output, archetype_dir=None, cache=None):
+    model = None
+    if export and cache is not None:
+        # Bereits exportiertes Modell wiederverwenden statt neu aufzubauen
+        model_dir = cache.model_path(task["model_key"])
+        meta = cache.model_meta(task["model_key"]) if model_dir is not None else None
+        if meta is not None and "package" in meta:
+            model = (model_dir, meta)
+    job = generate_variant(
+        task["variant"], task["schedules"], task["keys"], object_store=object_store, export=export,
+        output_path=output_path, archetype_dir=archetype_dir, model=model)
+    job["model_key"] = task["model_key"]
+    return job
+
+
+def check_chunks(job, pool, results):
+    # Volljahreslauf zum Vergleich; Fehler durch das Zusammensetzen der Zeitabschnitte ausgeben
+    reference = dict(job, runs=[dict(run, result_file_name=run["result_file_name"] + "_full") for run in job["runs"]])
+    for run, result, full in zip(job["runs"], results, pool.simulate(reference)):
+        print("Abweichung Zeitabschnitte gegen Volljahr: " + run["result_file_name"])
+        for variable, error in compare_results(result, full, DEFAULT_VARIABLES).items():
+            print("  %-24s max %.3g, RMSE %.3g, Integral %+.2e" % (
+                variable, error["max_abs"], error["rmse"], error["rel_integral"]))
+
+
+def simulate_variant(
+        job,
+        pool,
+        cache=None,
+        store=None,
+        tracer=None,
+        result_dir=savepath,
+        chunks=None,
+        warmup_days=7,
+        chunk_reference=False,
+):
+    job = dict(job, savepath=result_dir)
+    events = job.get("trace")
+    label = variant_name(job["variant"])
+    with stage(events, "simulate", label):
+        if chunks:
+            # Jahr in Zeitabschnitte mit Vorlauf teilen und parallel simulieren
+            results = simulate_chunked(pool, job, DEFAULT_VARIABLES, chunk=chunks, warmup=warmup_days * DAY)
+            if chunk_reference:
+                check_chunks(job, pool, results)
+        else:
+            results = pool.simulate(job)
+    if cache is None:
+        return results
+    cached = []
+    with stage(events, "ingest", label):
+        for run, result in zip(job["runs"], results):
+            cached.append(cache.store_result(
+                run["key"], result, meta={"variant": job["variant"], "schedule": run["schedule"]}))
+            if store is not None:
+                # Nur die konfigurierten Variablen in den spaltenbasierten Speicher übernehmen
+                store.add(run["key"], cached[-1], job["variant"], run["schedule"])
+        if "teaser_mo" in job:
+            package_dir = os.path.dirname(job["teaser_mo"])
+            cache.store_model(job["model_key"], package_dir, meta={
+                "variant": job["variant"],
+                "package": os.path.basename(package_dir),
+                "building_mo": job["building_mo"],
+                # Tabellen je Nutzungsprofil, relativ zum Paket
+                "tables": {
+                    inputs_key(run["schedule"]): {
+                        target: os.path.relpath(source, package_dir) for target, source in run["tables"].items()}
+                    for run in job["runs"]},
+            })
+    if tracer is not None:
+        tracer.variant_done(events or (), count=len(job["runs"]))
+    return cached
+
+
+def work_queue(job_queue, worker, generate, simulate, settings=None, poll=30.0, n_generate=1, **kwargs):
+    # Jobs aus der Queue rechnen, bis keiner mehr offen ist. Fehlgeschlagene Jobs gehen
+    # mit Backoff zurück in die Queue und zählen erst nach dem letzten Versuch als Fehler.
+    # Ein Job wird erst beansprucht, wenn ein Erzeugungs-Slot frei ist; solange er in
+    # Arbeit ist (auch wartend vor der Simulation), wird seine Lease verlängert.
+    # settings: Einstellungen dieses Workers (job_settings); Jobs, deren Schlüssel mit
+    # anderen Einstellungen berechnet wurden, werden abgelehnt
+    summary = {"done": 0, "failed": []}
+
+    def reject(job_id, task, error):
+        leases.discard(job_id)
+        if not job_queue.fail(job_id, "settings:\n" + error):
+            summary["failed"].append((task, "settings", error))
+
+    def claimed():
+        for job_id, payload in iter_claims(job_queue, worker, leases=leases):
+            if settings is not None and inputs_key(payload.get("settings")) != inputs_key(settings):
+                # Ergebnisse nicht unter den Schlüsseln fremder Einstellungen ablegen
+                reject(job_id, payload, "Job published with settings " + str(payload.get("settings"))
+                       + ", worker runs with " + str(settings))
+                continue
+            yield dict(payload, job_id=job_id)
+
+    def complete(task, paths):
+        job_queue.complete(task["job_id"])
+        leases.discard(task["job_id"])
+
+    with LeaseKeeper(job_queue, worker) as leases:
+        while True:
+            result = run_pipeline(
+                claimed(),
+                generate,
+                simulate,
+                n_generate=n_generate,
+                on_result=complete,
+                max_in_flight=max(n_generate, 1),
+                **kwargs
+            )
+            summary["done"] += result["done"]
+            for task, step, error in result["failed"]:
+                leases.discard(task["job_id"])
+                if not job_queue.fail(task["job_id"], step + ":\n" + error):
+                    summary["failed"].append((task, step, error))
+            wait = job_queue.next_ready()
+            if wait is None:
+                return summary
+            # Auf Wiederholungen und Jobs ausgefallener Worker warten
+            time.sleep(min(wait, poll))
+
+
+def check_archetypes(variants, archetype_dir):
+    # Je Archetyp-Vorlage eine Variante gegen ein neu aufgebautes Gebäude prüfen
+    cache = archetype_cache(archetype_dir)
+    checked = set()
+    failed = 0
+    for variant in variants:
+        key = cache.key(
+            method, usage, variant["year_of_construction"], variant["number_of_floors"], variant["height_of_floors"],
+            variant["with_ahu"], variant["residential_layout"], variant["internal_gains"], variant["construction"])
+        if key in checked:
+            continue
+        checked.add(key)
+        differences = check_archetype(
+            cache, partial(new_project, method=method), calc_building,
+            method=method,
+            usage=usage,
+            name=name,
+            year_of_construction=variant["year_of_construction"],
+            number_of_floors=variant["number_of_floors"],
+            height_of_floors=variant["height_of_floors"],
+            net_leased_area=variant["leased_area"],
+            with_ahu=variant["with_ahu"],
+            residential_layout=variant["residential_layout"],
+            internal_gains_mode=variant["internal_gains"],
+            construction_type=variant["construction"],
+        )
+        if differences:
+            failed += 1
+            print("Archetyp-Vorlage weicht ab: " + variant_name(variant))
+            for parameter, (fresh, cached) in differences.items():
+                print("  %-40s neu %s, Vorlage %s" % (parameter, fresh, cached))
+    print("Archetyp-Vorlagen geprüft: " + str(len(checked)) + ", abweichend: " + str(failed))
+    return failed
+
+
+def shard_indices(indices, shard):
+    if shard is None:
+        return list(indices)
+    shard_index, n_shards = shard
+    return list(indices)[shard_index::n_shards]
+
+
+def create_session_pool(
+        n_cpu,
+        backend="dymola",
+        cache=None,
+        library=aixlib_mo,
+        dymola=dymola_path,
+        show_window=False,
+        cd=os.path.join(savepath, "simulators"),
+):
+    # Simulator-Sessions einmal je Sweep starten und für alle Varianten wiederverwenden.
+    # cd: Arbeitsverzeichnis der Simulatoren, jede Dymola-Session in einem eigenen Unterverzeichnis
+    dymola = partial(
+        DymolaBackend,
+        aixlib_mo=library,
+        show_window=show_window,
+        dymola_path=dymola,
+    )
+    if backend == "fmu":
+        # Eine Dymola-Session nur für den FMU-Export, n_cpu FMU-Sessions mit je einem Worker-Prozess
+        exporter = FMUExporter(partial(dymola, cd=os.path.join(cd, "dymola_export")), cache, cd)
+        factory = partial(FMUBackend, exporter=exporter, cd=cd, variables=DEFAULT_VARIABLES)
+    elif backend == "stub":
+        factory = partial(StubBackend, variables=DEFAULT_VARIABLES)
+    elif backend == "rc":
+        # Schnelles Screening ohne Modelica
+        factory = partial(RCBackend, weather_file=weather_file_path())
+    else:
+        factory = SessionDirs(dymola, cd)
+    return SessionPool(factory, n_cpu=n_cpu)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Variantenstudie 3ZimKid")
+    parser.add_argument(
+        "--savepath", default=savepath,
+        help="Ablage für Simulationsergebnisse und Arbeitsverzeichnisse der Simulatoren; Voreinstellung für "
+             "Cache, Ergebnisspeicher, Kennwerte und Trace")
+    parser.add_argument(
+        "--aixlib-mo", default=aixlib_mo,
+        help="package.mo der AixLib (Standard: Umgebungsvariable AIXLIB_MO); nötig für --backend dymola/fmu")
+    parser.add_argument(
+        "--dymola-path", default=dymola_path,
+        help="Installationsverzeichnis von Dymola (Standard: DYMOLA_PATH, sonst Suche durch ebcpy)")
+    parser.add_argument(
+        "--teaser-output", default=teaser_output,
+        help="Exportverzeichnis der TEASER-Modelle (Standard: TEASER-Voreinstellung)")
+    parser.add_argument(
+        "--show-window", action="store_true",
+        help="Dymola mit Fenster starten (Standard: ohne Anzeige)")
+    parser.add_argument(
+        "--shard", type=parse_shard, default=None,
+        help="Nur den Teil i/N (0 <= i < N) des Parameterraums rechnen")
+    parser.add_argument(
+        "--sampling", choices=("grid",) + METHODS, default="grid",
+        help="Vollfaktorielles Raster oder Stichprobe (Latin Hypercube, Sobol) über den Parameterraum")
+    parser.add_argument("--samples", type=int, default=64, help="Anzahl Stichproben (--sampling lhs/sobol)")
+    parser.add_argument(
+        "--refine-rounds", type=int, default=0,
+        help="Verfeinerungsrunden: neue Stichproben zwischen Nachbarn mit starker Änderung des Heizwärmebedarfs")
+    parser.add_argument(
+        "--refine-samples", type=int, default=None,
+        help="Neue Stichproben je Verfeinerungsrunde (Standard: halbe Anzahl --samples)")
+    parser.add_argument("--seed", type=int, default=None, help="Startwert der Stichprobe")
+    parser.add_argument(
+        "--n-generate", type=int, default=os.cpu_count() or 1,
+        help="Worker-Prozesse für Modellerzeugung und Export (0 = im Hauptprozess)")
+    parser.add_argument(
+        "--n-cpu", type=int, default=1,
+        help="Anzahl Simulator-Sessions bzw. FMU-Worker-Prozesse (parallele Simulationen)")
+    parser.add_argument(
+        "--translate-once", action="store_true",
+        help="Je Gebäudemodell einmal übersetzen und alle Nutzungsprofile als Tabellen simulieren")
+    parser.add_argument(
+        "--chunks", choices=CHUNKS, default=None,
+        help="Jahressimulation in Monats- oder Wochenabschnitte teilen und parallel auf den Sessions rechnen")
+    parser.add_argument(
+        "--warmup-days", type=float, default=7,
+        help="Vorlauf je Zeitabschnitt in Tagen, wird beim Zusammensetzen verworfen")
+    parser.add_argument(
+        "--chunk-reference", action="store_true",
+        help="Zusätzlich das ganze Jahr am Stück rechnen und die Abweichung ausgeben")
+    parser.add_argument(
+        "--queue", default=None,
+        help="SQLite-Jobqueue: mit --publish Jobs einstellen, mit --worker Jobs abarbeiten")
+    parser.add_argument(
+        "--queue-shared", action="store_true",
+        help="Queue liegt auf einem Netzlaufwerk und wird von Workern mehrerer Rechner genutzt "
+             "(Rollback-Journal statt WAL)")
+    parser.add_argument("--publish", action="store_true", help="Offene Läufe in die Queue stellen und beenden")
+    parser.add_argument("--worker", action="store_true", help="Jobs aus der Queue beanspruchen und rechnen")
+    parser.add_argument(
+        "--lease", type=float, default=7200.0,
+        help="Sekunden, nach denen ein beanspruchter Job eines ausgefallenen Workers neu vergeben wird")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Versuche je Job, bevor er als fehlgeschlagen gilt")
+    parser.add_argument(
+        "--cache-dir", default=None,
+        help="Ablage für Modelle und Ergebnisse; vorhandene Ergebnisse werden übersprungen")
+    parser.add_argument(
+        "--archetype-dir", default=None,
+        help="Ablage der TEASER-Archetyp-Vorlagen (Standard: <cache-dir>/archetypes)")
+    parser.add_argument(
+        "--no-archetype-cache", action="store_true",
+        help="Jedes Gebäude mit add_residential neu aufbauen statt aus einer Vorlage zu skalieren")
+    parser.add_argument(
+        "--check-archetypes", action="store_true",
+        help="Vor dem Sweep je Archetyp die berechneten Parameter aus Vorlage und add_residential vergleichen")
+    parser.add_argument(
+        "--store", default=None,
+        help="Parquet-Ergebnisspeicher für die ausgewählten Variablen")
+    parser.add_argument(
+        "--kpis", default=None,
+        help="Zusammenfassung (Heizwärmebedarf, Spitzenlast, Unterheizstunden) je Lauf, .parquet oder .csv")
+    parser.add_argument(
+        "--reference-degree-days", type=float, default=None,
+        help="Gradtagzahl G20/15 des Referenzklimas; ergänzt den auf dieses Klima umgerechneten Heizwärmebedarf")
+    parser.add_argument(
+        "--trace-dir", default=None,
+        help="Ablage für Stufen-Log (JSON lines) und Chrome-Trace")
+    parser.add_argument(
+        "--backend", choices=("dymola", "fmu", "rc", "stub"), default="dymola",
+        help="Simulator: Dymola/AixLib, FMU je Gebäudemodell (sinnvoll mit --translate-once), "
+             "NumPy-RC-Modell (Screening) oder lokaler Stub")
+    args = parser.parse_args(argv)
+    if (args.publish or args.worker) and not args.queue:
+        parser.error("--publish and --worker need --queue")
+    if args.publish and args.worker:
+        parser.error("--publish and --worker are exclusive")
+    if args.backend in ("dymola", "fmu") and not args.aixlib_mo:
+        parser.error("--backend " + args.backend + " needs --aixlib-mo or the AIXLIB_MO environment variable")
+    if args.queue and args.refine_rounds:
+        parser.error("--refine-rounds needs the results of each round and cannot be used with --queue")
+    if args.shard and args.refine_rounds:
+        # Jeder Shard sähe nur seine eigenen Ergebnisse, die Verfeinerungen liefen auseinander
+        parser.error("--refine-rounds needs the results of all shards and cannot be used with --shard")
+    if args.sampling == "sobol" and not qmc_available():
+        parser.error("--sampling sobol needs scipy (scipy.stats.qmc); install scipy or use --sampling lhs")
+    cache_dir = args.cache_dir or os.path.join(args.savepath, "cache")
+    archetype_dir = None if args.no_archetype_cache else args.archetype_dir or os.path.join(cache_dir, "archetypes")
+    store_path = args.store or os.path.join(args.savepath, "results.parquet")
+    kpis_path = args.kpis or os.path.join(args.savepath, "kpis.parquet")
+    trace_dir = args.trace_dir or os.path.join(args.savepath, "trace")
+
+    spec = SweepSpec(sweep_spec)
+    print("Varianten gesamt: " + str(len(spec)))
+    if args.sampling == "grid":
+        indices = spec.indices(args.shard)
+        refine_rounds = 0
+    else:
+        # Alle Shards ziehen mit gleichem --seed dieselbe Stichprobe und teilen sie auf
+        indices = shard_indices(sample_indices(spec, args.samples, method=args.sampling, seed=args.seed), args.shard)
+        refine_rounds = args.refine_rounds
+        print("Stichproben: " + str(len(indices)))
+    if args.check_archetypes:
+        if archetype_dir is None:
+            parser.error("--check-archetypes cannot be used with --no-archetype-cache")
+        if check_archetypes((spec.variant(index) for index in indices), archetype_dir):
+            parser.exit(1, "Archetype templates differ from add_residential, see above\n")
+    if args.translate_once:
+        # Alle Nutzungsprofile einer Variante in einem Job
+        groups = [schedule_variants]
+    else:
+        groups = [[schedule] for schedule in schedule_variants]
+    simulation = SIMULATION_SETUP
+    if args.chunks:
+        # Zusammengesetzte Ergebnisse nicht mit Volljahresläufen verwechseln
+        simulation = dict(SIMULATION_SETUP, chunks=args.chunks, warmup_days=args.warmup_days)
+    cache = ResultCache(cache_dir)
+    store = ResultStore(store_path)
+    if args.publish:
+        # Nur Jobs in die Queue stellen; gerechnet wird von Workern mit --worker
+        with store, JobQueue(args.queue, shared=args.queue_shared) as job_queue:
+            tasks = pending_tasks(
+                (spec.variant(index) for index in indices), groups, cache, args.backend, store,
+                library=args.aixlib_mo, simulation=simulation)
+            published = job_queue.publish((inputs_key(task["keys"]), task) for task in tasks)
+            print("Neue Jobs: " + str(published) + ", Queue: " + str(job_queue.counts()))
+        return None
+    tracer = Tracer(trace_dir, total=None if args.worker else len(indices) * len(schedule_variants))
+    pool = create_session_pool(
+        args.n_cpu, backend=args.backend, cache=cache,
+        library=args.aixlib_mo, dymola=args.dymola_path, show_window=args.show_window,
+        cd=os.path.join(args.savepath, "simulators"))
+    generate = partial(
+        generate_task,
+        object_store=ObjectStore(os.path.join(cache_dir, "objects")),
+        export=args.backend != "rc",
+        output_path=args.teaser_output,
+        archetype_dir=archetype_dir,
+        cache=cache)
+    simulate = partial(
+        simulate_variant, pool=pool, cache=cache, store=store, tracer=tracer, result_dir=args.savepath,
+        chunks=args.chunks, warmup_days=args.warmup_days, chunk_reference=args.chunk_reference)
+    n_simulate = args.n_cpu
+    summary = {"done": 0, "failed": []}
+    with pool, store, tracer:
+        if args.worker:
+            with JobQueue(
+                    args.queue, lease=args.lease, max_attempts=args.max_attempts, shared=args.queue_shared
+            ) as job_queue:
+                worker = socket.gethostname() + ":" + str(os.getpid())
+                summary = work_queue(
+                    job_queue, worker, generate, simulate,
+                    settings=job_settings(args.backend, simulation, args.aixlib_mo),
+                    n_generate=args.n_generate, n_simulate=n_simulate)
+                print("Queue: " + str(job_queue.counts()))
+        for refinement in range(0 if args.worker else refine_rounds + 1):
+            tasks = pending_tasks(
+                (spec.variant(index) for index in indices), groups, cache, args.backend, store,
+                library=args.aixlib_mo, simulation=simulation)
+            result = run_pipeline(tasks, generate, simulate, n_generate=args.n_generate, n_simulate=n_simulate)
+            summary["done"] += result["done"]
+            summary["failed"].extend(result["failed"])
+            if refinement == refine_rounds:
+                break
+            # Nachverdichten, wo sich der Heizwärmebedarf zwischen Nachbarn stark ändert
+            store.flush()
+            responses = variant_responses(spec, compute_kpis(store))
+            indices = refine_indices(spec, responses, args.refine_samples or max(args.samples // 2, 1))
+            if not indices:
+                break
+            print("Verfeinerung " + str(refinement + 1) + ": " + str(len(indices)) + " neue Varianten")
+            tracer.total += len(indices) * len(schedule_variants)
+    print("Fertig: " + str(summary["done"]) + ", fehlgeschlagen: " + str(len(summary["failed"])))
+    for task, step, error in summary["failed"]:
+        print(variant_name(task["variant"]) + " (" + step + "):\n" + error)
+
+    # Kennwerte aller Läufe in einem Durchgang über den Ergebnisspeicher
+    kpis = compute_kpis(store)
+    if len(kpis):
+        if args.reference_degree_days:
+            degree_days = heating_degree_days(load_weather(weather_file_path()))
+            print("Gradtagzahl G20/15 des Wetterjahrs: %.0f Kd" % degree_days)
+            normalize_heating(kpis, degree_days, args.reference_degree_days)
+        write_summary(kpis, kpis_path)
+        print(compare_constructions(kpis))
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Persistent cache of built TEASER archetype buildings.
+
+``prj.add_residential`` looks up the TABULA data and builds every wall,
+window and floor layer stack from scratch, although variants of the same
+archetype differ only in their floor area. The cache builds each archetype
+once, at a reference area, and stores it pickled on disk keyed by method,
+usage, the building age groups of TEASER's type element data that contain
+the construction year, construction type, layout, AHU, internal gains mode
+and geometry per floor (floors, floor height) plus the TEASER version. New
+variants are unpickled from the template; all zone and element areas are
+scaled to the requested net leased area, which is exact for TABULA
+archetypes (all areas are proportional to it), and the building sums
+(net leased area, volume, outer and window area per orientation) are
+rebuilt from the zones.
+
+The project is not pickled with the template; it is replaced by the target
+project when the template is loaded, and the project gets the TEASER data
+base of the method (retrofits look up their type elements there). ``check_archetype`` compares the
+calculated parameters of a cached building with a fresh ``add_residential``.
+"""
+import io
+import os
+import pickle
+import random
+import uuid
+from functools import lru_cache
+
+from result_cache import inputs_key
+from teaser_models import project_data
+
+# Bezugsfläche der gespeicherten Vorlagen [m²]
+REFERENCE_AREA = 100.0
+# Bauteillisten einer Zone, deren Flächen mit der Wohnfläche skaliert werden
+ELEMENTS = ("outer_walls", "doors", "rooftops", "ground_floors", "windows", "inner_walls", "floors", "ceilings")
+_PROJECT = "project"
+
+
+@lru_cache(maxsize=None)
+def age_groups(method):
+    # Baualtersklassen aller Bauteile der TEASER-Datenbasis des Verfahrens
+    return tuple(sorted({
+        tuple(element["building_age_group"])
+        for key, element in project_data(method).element_bind.items()
+        if isinstance(element, dict) and "building_age_group" in element}))
+
+
+def year_class(method, year_of_construction):
+    # Gleiche Baualtersklassen aller Bauteile -> gleiche TABULA-Bauteile und Fassadenanteile
+    if not method.startswith("tabula"):
+        return year_of_construction
+    return [list(group) for group in age_groups(method) if group[0] <= year_of_construction <= group[1]]
+
+
+def teaser_version():
+    try:
+        from importlib.metadata import version
+        return version("teaser")
+    except Exception:
+        return None
+
+
+class _Pickler(pickle.Pickler):
+
+    def __init__(self, file, project):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.project = project
+
+    def persistent_id(self, obj):
+        return _PROJECT if obj is self.project else None
+
+
+class _Unpickler(pickle.Unpickler):
+
+    def __init__(self, file, project):
+        super().__init__(file)
+        self.project = project
+
+    def persistent_load(self, pid):
+        if pid != _PROJECT:
+            raise pickle.UnpicklingError("Unknown persistent id " + repr(pid))
+        return self.project
+
+
+def scale_building(building, factor):
+    for zone in building.thermal_zones:
+        zone.area *= factor
+        zone.volume *= factor
+        for attr in ELEMENTS:
+            for element in getattr(zone, attr, None) or ():
+                element.area *= factor
+    # Gebäudesummen wie bei add_residential aus Zonen und Bauteilen bilden
+    building.net_leased_area = sum(zone.area for zone in building.thermal_zones)
+    building.volume = sum(zone.volume for zone in building.thermal_zones)
+    building.fill_outer_area_dict()
+    building.fill_window_area_dict()
+    return building
+
+
+def calc_parameters(building):
+    # Gebäudesummen und alle Zahlenwerte der berechneten Zonenmodelle
+    values = {
+        "net_leased_area": building.net_leased_area,
+        "volume": building.volume,
+        "sum_heat_load": building.sum_heat_load,
+    }
+    for orientation, area in building.outer_area.items():
+        values["outer_area/" + str(orientation)] = area
+    for orientation, area in building.window_area.items():
+        values["window_area/" + str(orientation)] = area
+    for zone in building.thermal_zones:
+        for name, value in vars(zone.model_attr).items():
+            # internal_id ist eine Zufallszahl je Objekt
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and name != "internal_id":
+                values[zone.name + "/" + name.lstrip("_")] = value
+    return values
+
+
+def compare_parameters(fresh, cached, rtol=1e-6):
+    # Abweichende Kennwerte: {Name: (neu aufgebaut, aus dem Cache)}
+    differences = {}
+    for name in sorted(set(fresh) | set(cached)):
+        a, b = fresh.get(name), cached.get(name)
+        if a is None or b is None or abs(a - b) > rtol * max(abs(a), abs(b), 1.0):
+            differences[name] = (a, b)
+    return differences
+
+
+class ArchetypeCache:
+
+    def __init__(self, root):
+        self.root = os.fspath(root)
+        self._templates = {}
+
+    def key(self, method, usage, year_of_construction, number_of_floors, height_of_floors, with_ahu,
+            residential_layout, internal_gains, construction):
+        return inputs_key({
+            "method": method,
+            "usage": usage,
+            "year_class": year_class(method, year_of_construction),
+            "number_of_floors": number_of_floors,
+            "height_of_floors": height_of_floors,
+            "with_ahu": with_ahu,
+            "residential_layout": residential_layout,
+            "internal_gains": internal_gains,
+            "construction": construction,
+            "teaser": teaser_version(),
+        })
+
+    def _path(self, key):
+        return os.path.join(self.root, key + ".pickle")
+
+    def _template(self, prj, key, build):
+        template = self._templates.get(key)
+        if template is None and os.path.isfile(self._path(key)):
+            with open(self._path(key), "rb") as file:
+                template = file.read()
+        if template is None:
+            building = build()
+            # Nur die Vorlage, nicht das Projekt speichern
+            prj.buildings.remove(building)
+            buffer = io.BytesIO()
+            _Pickler(buffer, prj).dump(building)
+            template = buffer.getvalue()
+            os.makedirs(self.root, exist_ok=True)
+            tmp = os.path.join(self.root, "." + key + "-" + uuid.uuid4().hex + ".tmp")
+            with open(tmp, "wb") as file:
+                file.write(template)
+            os.replace(tmp, self._path(key))
+        self._templates[key] = template
+        return template
+
+    def add_residential(
+            self,
+            prj,
+            method,
+            usage,
+            name,
+            year_of_construction,
+            number_of_floors,
+            height_of_floors,
+            net_leased_area,
+            with_ahu,
+            residential_layout,
+            internal_gains_mode,
+            construction_type,
+    ):
+        """Drop-in for ``prj.add_residential`` served from the cache."""
+        # Wie add_residential: Datenbasis des Verfahrens, z.B. für spätere Sanierungen
+        if prj.data is None or prj.data.used_statistic != method:
+            prj.data = project_data(method)
+        key = self.key(
+            method, usage, year_of_construction, number_of_floors, height_of_floors, with_ahu,
+            residential_layout, internal_gains_mode, construction_type)
+        template = self._template(prj, key, lambda: prj.add_residential(
+            method=method,
+            usage=usage,
+            name=name,
+            year_of_construction=year_of_construction,
+            number_of_floors=number_of_floors,
+            height_of_floors=height_of_floors,
+            net_leased_area=REFERENCE_AREA,
+            with_ahu=with_ahu,
+            residential_layout=residential_layout,
+            internal_gains_mode=internal_gains_mode,
+            construction_type=construction_type,
+        ))
+        building = _Unpickler(io.BytesIO(template), prj).load()
+        building.name = name
+        building.year_of_construction = year_of_construction
+        building.internal_id = random.random()
+        prj.buildings.append(building)
+        return scale_building(building, net_leased_area / REFERENCE_AREA)
+
+
+def check_archetype(cache, new_project, calc, rtol=1e-6, **parameters):
+    """Compare a cached building with a fresh ``prj.add_residential``.
+
+    ``new_project(name)`` returns an empty project, ``calc(prj, building)``
+    calculates a building; ``parameters`` are the ``add_residential``
+    arguments. Returns the differing parameters after calculation, an empty
+    dict if the cached building is equivalent.
+    """
+    fresh_prj = new_project("fresh")
+    fresh = fresh_prj.add_residential(**parameters)
+    calc(fresh_prj, fresh)
+    cached_prj = new_project("cached")
+    cached = cache.add_residential(cached_prj, **parameters)
+    calc(cached_prj, cached)
+    return compare_parameters(calc_parameters(fresh), calc_parameters(cached), rtol)
+
+
+@lru_cache(maxsize=None)
+def archetype_cache(root):
+    # Eine Instanz je Worker-Prozess und Verzeichnis
+    return ArchetypeCache(root)
@@ -0,0 +1,226 @@
+"""Benchmarks for the stages of the sweep pipeline.
+
+Times schedule generation, add_residential (plain and from the archetype
+cache), calc_all_buildings, export_aixlib, retrofit_all_buildings, batch
+retrofit variants from one base building, the (stub) simulation, result
+loading into the store and KPI aggregation for sweeps of 1, 100 and 1000
+variants. Timings are written to a JSON baseline; later runs are compared
+against it and regressions beyond the tolerance are reported (exit code 1).
+
+    python benchmarks.py                   # vergleichen mit benchmark_baseline.json
+    python benchmarks.py --update-baseline # Baseline neu schreiben
+    python benchmarks.py --sizes 1 100 --stages schedules kpis
+
+TEASER stages are skipped when TEASER is not installed.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from itertools import islice
+
+import schedules
+from kpis import compute_kpis
+from result_store import ResultStore, DEFAULT_VARIABLES
+from simulators import SessionPool, StubBackend
+from sweep import SweepSpec, building_parameters
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+SIZES = (1, 100, 1000)
+TEASER_STAGES = ("add_residential", "add_residential_cached", "calc_all_buildings", "export_aixlib", "retrofit_all_buildings", "retrofit_batch")
+STAGES = ("schedules",) + TEASER_STAGES + ("simulate", "load_results", "kpis")
+
+# Großes Raster, aus dem die ersten n Varianten genommen werden
+BENCHMARK_SPEC = {
+    "leased_area": {"min": 50, "max": 545, "step": 5},
+    "year_of_construction": [1900, 1950, 1970, 1992, 2003],
+    "number_of_floors": 1,
+    "height_of_floors": 3.0,
+    "with_ahu": False,
+    "residential_layout": 0,
+    "internal_gains": 1,
+    "with_heating": True,
+    "construction": ["tabula_standard", "tabula_retrofit"],
+    "retrofit": "none",
+}
+SCHEDULES = [
+    {"scenario": scenario, "weekend": weekend, "holiday": [4, 5, 20, 21, 40, 41]}
+    for scenario in (1, 2) for weekend in (0, 1)
+]
+TEASER_DAY_PROFILES = ((0.5,) * 24, (294.15,) * 24)
+
+
+def variants(n):
+    return [variant for index, variant in islice(SweepSpec(BENCHMARK_SPEC).iter_variants(), n)]
+
+
+def bench_schedules(n, workdir):
+    schedules.zone_profile.cache_clear()
+    schedules.day_types.cache_clear()
+    for index in range(n):
+        schedule = SCHEDULES[index % len(SCHEDULES)]
+        for zone in range(schedules.N_ZONES):
+            schedules.zone_profiles(
+                schedule["scenario"], schedule["weekend"], schedule["holiday"], zone, *TEASER_DAY_PROFILES)
+
+
+def _teaser_stage(stage, n, workdir):
+    import teaser_models
+    from archetypes import ArchetypeCache
+    from retrofit import retrofit_options, retrofit_variants
+
+    archetypes = ArchetypeCache(os.path.join(workdir, "archetypes")) if stage == "add_residential_cached" else None
+    elapsed = 0.0
+    for index, variant in enumerate(variants(n)):
+        with teaser_models.variant_project("Bench" + str(index), "tabula_de") as prj:
+            start = time.perf_counter()
+            building = teaser_models.add_building(
+                prj, name="Bench", method="tabula_de", usage="multi_family_house", archetypes=archetypes,
+                **building_parameters(variant))
+            if stage in ("add_residential", "add_residential_cached"):
+                elapsed += time.perf_counter() - start
+                continue
+            start = time.perf_counter()
+            prj.calc_all_buildings()
+            if stage == "calc_all_buildings":
+                elapsed += time.perf_counter() - start
+                continue
+            if stage == "export_aixlib":
+                start = time.perf_counter()
+                teaser_models.export_building(prj, building, path=workdir)
+            elif stage == "retrofit_all_buildings":
+                start = time.perf_counter()
+                prj.retrofit_all_buildings(
+                    year_of_retrofit=2015,
+                    type_of_retrofit="adv_retrofit",
+                    window_type='Alu- oder Stahlfenster, Isolierverglasung',
+                    material='EPS_perimeter_insulation_top_layer')
+            elif stage == "retrofit_batch":
+                start = time.perf_counter()
+                for option, retrofitted in retrofit_variants(building, retrofit_options()):
+                    pass
+            elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def _jobs(n, workdir):
+    return [
+        {"savepath": os.path.join(workdir, "results"), "result_file_name": "run" + str(index)}
+        for index in range(n)]
+
+
+def bench_simulate(n, workdir):
+    with SessionPool(lambda: StubBackend(variables=DEFAULT_VARIABLES), n_cpu=1) as pool:
+        return pool.simulate_batch(_jobs(n, workdir))
+
+
+def _prepare_results(n, workdir):
+    paths = bench_simulate(n, workdir)
+    return list(zip(paths, variants(n)))
+
+
+def bench_load_results(n, workdir, prepared):
+    with ResultStore(os.path.join(workdir, "store")) as store:
+        for index, (path, variant) in enumerate(prepared):
+            store.add("run" + str(index), path, variant, SCHEDULES[0])
+
+
+def bench_kpis(n, workdir):
+    compute_kpis(ResultStore(os.path.join(workdir, "store")))
+
+
+def run_stage(stage, n):
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    try:
+        if stage in TEASER_STAGES:
+            return _teaser_stage(stage, n, workdir)
+        if stage == "load_results" or stage == "kpis":
+            prepared = _prepare_results(n, workdir)
+            if stage == "kpis":
+                bench_load_results(n, workdir, prepared)
+                start = time.perf_counter()
+                bench_kpis(n, workdir)
+                return time.perf_counter() - start
+            start = time.perf_counter()
+            bench_load_results(n, workdir, prepared)
+            return time.perf_counter() - start
+        start = time.perf_counter()
+        {"schedules": bench_schedules, "simulate": bench_simulate}[stage](n, workdir)
+        return time.perf_counter() - start
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def teaser_available():
+    try:
+        import teaser  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def run_benchmarks(stages=STAGES, sizes=SIZES):
+    timings = {}
+    with_teaser = teaser_available()
+    for stage in stages:
+        if stage in TEASER_STAGES and not with_teaser:
+            print("%-24s übersprungen (TEASER nicht installiert)" % stage)
+            continue
+        for n in sizes:
+            seconds = run_stage(stage, n)
+            timings[stage + "/" + str(n)] = seconds
+            print("%-24s n=%-5d %10.4f s %12.1f µs/Variante" % (stage, n, seconds, seconds / n * 1e6))
+    return timings
+
+
+def compare(timings, baseline, tolerance):
+    regressions = []
+    for name, seconds in sorted(timings.items()):
+        reference = baseline.get(name)
+        if reference and seconds > reference * (1 + tolerance):
+            regressions.append((name, reference, seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks der Sweep-Stufen")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25,
+        help="Erlaubte relative Verlangsamung gegenüber der Baseline")
+    args = parser.parse_args(argv)
+
+    timings = run_benchmarks(args.stages, args.sizes)
+
+    if args.update_baseline or not os.path.isfile(args.baseline):
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump({
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "timings": timings,
+            }, file, indent=1, sort_keys=True)
+        print("Baseline geschrieben: " + args.baseline)
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)["timings"]
+    regressions = compare(timings, baseline, args.tolerance)
+    for name, reference, seconds in regressions:
+        print("REGRESSION %-28s %.4f s -> %.4f s (+%.0f %%)" % (
+            name, reference, seconds, (seconds / reference - 1) * 100))
+    if not regressions:
+        print("Keine Regressionen gegenüber " + args.baseline)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
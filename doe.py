@@ -0,0 +1,140 @@
+"""Sampled and adaptively refined sweeps instead of the full-factorial grid.
+
+Samples are drawn in the unit hypercube over the dimensions of a
+``SweepSpec`` that have more than one value (Latin hypercube or Sobol via
+``scipy.stats.qmc`` if installed, otherwise a NumPy Latin hypercube) and
+snapped to the grid, so every sample is an ordinary variant index and runs
+through cache, pipeline and result store unchanged.
+
+``refine_indices`` adds points where the response (e.g. heating demand)
+changes most between neighbouring samples: for the sample pairs with the
+steepest change it proposes the grid point halfway between them.
+"""
+import numpy as np
+
+METHODS = ("lhs", "sobol")
+
+
+def latin_hypercube(n, d, seed=None):
+    # Je Dimension eine zufällige Permutation der n Schichten, jitter innerhalb der Schicht
+    rng = np.random.default_rng(seed)
+    strata = np.argsort(rng.random((n, d)), axis=0)
+    return (strata + rng.random((n, d))) / n
+
+
+def qmc_available():
+    try:
+        from scipy.stats import qmc  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def unit_samples(n, d, method="lhs", seed=None):
+    if method not in METHODS:
+        raise ValueError("Unknown sampling method '" + str(method) + "', use one of " + ", ".join(METHODS))
+    try:
+        from scipy.stats import qmc
+    except ImportError:
+        if method == "sobol":
+            raise ImportError("Sobol sampling needs scipy (scipy.stats.qmc)")
+        return latin_hypercube(n, d, seed)
+    if method == "sobol":
+        # Sobol-Folgen sind nur für Zweierpotenzen balanciert
+        m = max(int(np.ceil(np.log2(max(n, 1)))), 0)
+        return qmc.Sobol(d, scramble=True, seed=seed).random_base2(m)[:n]
+    return qmc.LatinHypercube(d, seed=seed).random(n)
+
+
+def _sizes(spec):
+    return np.array([len(values) for values in spec.values])
+
+
+def positions(spec, indices):
+    # Variantenindex -> Position je Dimension (letzte Dimension am schnellsten)
+    indices = np.asarray(indices, dtype=np.int64)
+    result = np.empty((len(indices), len(spec.values)), dtype=np.int64)
+    for axis, size in reversed(list(enumerate(_sizes(spec)))):
+        indices, result[:, axis] = np.divmod(indices, size)
+    return result
+
+
+def grid_indices(spec, positions):
+    index = np.zeros(len(positions), dtype=np.int64)
+    for axis, size in enumerate(_sizes(spec)):
+        index = index * size + positions[:, axis]
+    return index
+
+
+def sample_indices(spec, n, method="lhs", seed=None):
+    """Return up to ``n`` distinct variant indices, spread over the sweep."""
+    sizes = _sizes(spec)
+    varying = np.flatnonzero(sizes > 1)
+    n = min(n, len(spec))
+    if n <= 0:
+        return []
+    if not len(varying):
+        return [0]
+    samples = unit_samples(n, len(varying), method=method, seed=seed)
+    grid = np.zeros((n, len(sizes)), dtype=np.int64)
+    grid[:, varying] = np.minimum((samples * sizes[varying]).astype(np.int64), sizes[varying] - 1)
+    # Auf das Raster gerundete Stichproben können zusammenfallen
+    return sorted(set(grid_indices(spec, grid).tolist()))
+
+
+def refine_indices(spec, responses, n, neighbours=None):
+    """Propose up to ``n`` new indices where ``responses`` change sharply.
+
+    ``responses`` maps sampled variant indices to a scalar result. Each
+    sample is paired with its nearest sampled neighbours (normalised grid
+    distance); pairs are ranked by response change per distance and the
+    grid midpoint of each pair is proposed unless it is already sampled.
+    """
+    sampled = np.fromiter(responses, dtype=np.int64)
+    if len(sampled) < 2 or n <= 0:
+        return []
+    values = np.array([responses[index] for index in sampled], dtype=np.float64)
+    grid = positions(spec, sampled)
+    scale = np.maximum(_sizes(spec) - 1, 1)
+    points = grid / scale
+    distance = np.sqrt(((points[:, None, :] - points[None, :, :]) ** 2).sum(axis=2))
+    np.fill_diagonal(distance, np.inf)
+
+    k = min(neighbours or 2 * int((_sizes(spec) > 1).sum()), len(sampled) - 1)
+    nearest = np.argsort(distance, axis=1)[:, :k]
+    pairs = np.sort(np.column_stack((np.repeat(np.arange(len(sampled)), k), nearest.ravel())), axis=1)
+    # Jedes Paar nur einmal, auch wenn es nur für einen Partner zu den nächsten gehört
+    first, second = np.unique(pairs, axis=0).T
+    change = np.abs(values[first] - values[second]) / distance[first, second]
+
+    known = set(sampled.tolist())
+    proposed = []
+    for pair in np.argsort(-change, kind="stable"):
+        a, b = first[pair], second[pair]
+        middle = (grid[a] + grid[b] + 1) // 2
+        index = int(grid_indices(spec, middle[None, :])[0])
+        if index in known:
+            continue
+        known.add(index)
+        proposed.append(index)
+        if len(proposed) == n:
+            break
+    return proposed
+
+
+def variant_responses(spec, summary, value="heating_kWh"):
+    # Mittelwert je Variante über alle Nutzungsprofile
+    columns = list(spec.names) + [value]
+    if any(column not in summary.columns for column in columns):
+        # Noch keine Kennwerte (leerer Ergebnisspeicher)
+        return {}
+    totals = {}
+    for row in summary[columns].itertuples(index=False):
+        try:
+            index = spec.index(dict(zip(spec.names, row[:-1])))
+        except ValueError:
+            # Läufe früherer Studien mit anderem Parameterraum
+            continue
+        total, count = totals.get(index, (0.0, 0))
+        totals[index] = (total + row[-1], count + 1)
+    return {index: total / count for index, (total, count) in totals.items()}
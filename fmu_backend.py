@@ -0,0 +1,139 @@
+"""FMU execution: export each building model once, simulate it in worker processes.
+
+Dymola is only needed to export one co-simulation FMU per distinct building
+model (cached under ``fmus/<model hash>``); one shared ``FMUExporter``
+serialises the exports of all sessions. Every ``FMUBackend`` session owns
+one persistent worker process that runs the FMUs through ebcpy's
+``FMU_API``. The worker keeps the most recently used FMU instances loaded
+and resets them between runs, so a ``SessionPool`` of ``n_cpu`` FMU
+sessions spreads the runs of different jobs (and the chunks of one job)
+over the cores of the node without a process pool being rebuilt whenever
+the building model changes. The throughput scales with the cores, not with
+simulator licences.
+
+The runs of one model differ only in their schedule tables. Like the
+Dymola backend, every run writes its tables to the fixed files the FMU
+resolved at export: the copies in the ``resources`` folder of the extracted
+FMU (each worker extracts every FMU into its own directory) or, if Dymola
+kept the absolute path, the files in the exported package.
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from incremental_export import replace_file
+from simulators import SIMULATION_SETUP, job_runs
+
+# Geladene FMU-Instanzen je Worker-Prozess
+MAX_LOADED = 4
+
+_loaded = OrderedDict()
+
+
+def table_files(unzip_dir, package_dir, tables):
+    # Zieldatei je Tabelle: Kopie in den Ressourcen der entpackten FMU, sonst die Datei
+    # im Paket, deren Pfad Dymola beim Export eingesetzt hat
+    resources = {}
+    for root, dirs, files in os.walk(os.path.join(os.fspath(unzip_dir), "resources")):
+        for file_name in files:
+            resources.setdefault(file_name, []).append(os.path.join(root, file_name))
+    targets = {}
+    for target, source in tables.items():
+        for path in resources.get(os.path.basename(target)) or [os.path.join(package_dir, target)]:
+            targets[path] = source
+    return targets
+
+
+def _load(fmu_file, cd, variables):
+    # Läuft im Worker-Prozess: FMU nur beim ersten Gebrauch laden, älteste Instanz freigeben
+    fmu_api = _loaded.pop(fmu_file, None)
+    if fmu_api is None:
+        from ebcpy import FMU_API
+
+        # Eigenes Verzeichnis je Prozess und FMU (die Cache-Einträge heißen alle model.fmu),
+        # die FMU wird dort entpackt und ihre Tabellen werden dort ersetzt
+        fmu_cd = os.path.join(cd, "fmu_worker_" + str(os.getpid()), os.path.basename(os.path.dirname(fmu_file)))
+        fmu_api = FMU_API(model_name=fmu_file, cd=fmu_cd, n_cpu=1)
+        fmu_api.result_names = list(variables)
+    _loaded[fmu_file] = fmu_api
+    while len(_loaded) > MAX_LOADED:
+        _loaded.popitem(last=False)[1].close()
+    return fmu_api
+
+
+def simulate_runs(fmu_file, cd, variables, simulation_setup, runs, savepath, package_dir):
+    fmu_api = _load(fmu_file, cd, variables)
+    fmu_api.set_sim_setup(simulation_setup)
+    os.makedirs(savepath, exist_ok=True)
+    paths = []
+    for run in runs:
+        for path, source in table_files(fmu_api._unzip_dir, package_dir, run["tables"]).items():
+            replace_file(source, path)
+        tsd = fmu_api.simulate(return_option="time_series")
+        df = tsd.to_df() if hasattr(tsd, "to_df") else tsd
+        signals = {name: df[name].to_numpy(dtype=np.float64) for name in variables if name in df}
+        path = os.path.join(savepath, run["result_file_name"] + ".npz")
+        np.savez(path, time=df.index.to_numpy(dtype=np.float64), **signals)
+        paths.append(path)
+    return paths
+
+
+class FMUExporter:
+    # Eine Dymola-Session für die FMU-Exporte aller Sessions, Exporte nacheinander
+
+    def __init__(self, exporter_factory, cache, cd):
+        self.exporter_factory = exporter_factory
+        self.cache = cache
+        self.cd = os.fspath(cd)
+        self._exporter = None
+        self._lock = threading.Lock()
+
+    def fmu_path(self, job):
+        fmu_file = self.cache.fmu_path(job["model_key"])
+        if fmu_file is not None:
+            return fmu_file
+        with self._lock:
+            # Eine andere Session kann das Modell inzwischen exportiert haben
+            fmu_file = self.cache.fmu_path(job["model_key"])
+            if fmu_file is None:
+                # Dymola nur für den einmaligen FMU-Export starten
+                if self._exporter is None:
+                    self._exporter = self.exporter_factory()
+                exported = self._exporter.export_fmu(job, os.path.join(self.cd, "fmu_export"))
+                fmu_file = self.cache.store_fmu(job["model_key"], exported, meta={"variant": job["variant"]})
+        return fmu_file
+
+    def close(self):
+        with self._lock:
+            if self._exporter is not None:
+                self._exporter.close()
+                self._exporter = None
+
+
+class FMUBackend:
+
+    def __init__(self, exporter, cd, variables, simulation_setup=None):
+        self.exporter = exporter
+        self.cd = os.fspath(cd)
+        self.variables = list(variables)
+        self.simulation_setup = simulation_setup or SIMULATION_SETUP
+        self._worker = None
+
+    def simulate(self, job):
+        fmu_file = self.exporter.fmu_path(job)
+        if self._worker is None:
+            # Worker-Prozess lebt so lange wie die Session, geladene FMUs bleiben erhalten
+            self._worker = ProcessPoolExecutor(max_workers=1)
+        paths = self._worker.submit(
+            simulate_runs, fmu_file, self.cd, self.variables, job.get("simulation_setup") or self.simulation_setup,
+            job_runs(job), job["savepath"], os.path.dirname(job["teaser_mo"])).result()
+        return paths if "runs" in job else paths[0]
+
+    def close(self):
+        if self._worker is not None:
+            self._worker.shutdown()
+            self._worker = None
+        self.exporter.close()
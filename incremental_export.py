@@ -0,0 +1,127 @@
+"""Incremental, deduplicated export of the generated Modelica packages.
+
+TEASER always renders a complete package. Instead of writing it straight
+into the output directory it is rendered into a staging directory and then
+synchronised: files whose content did not change are left untouched (so
+Dymola does not re-parse them), changed files are replaced atomically and
+stale files are removed. With an object store, every file is kept once per
+content hash and hard linked into the packages, so identical tables and
+records of different variants share one copy on disk.
+
+Files in a synchronised package must only be replaced (``os.replace``),
+never rewritten in place, as they may be shared with other packages.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import uuid
+
+
+def content_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def link_or_copy(source, target):
+    # Harte Links gehen nur innerhalb eines Dateisystems
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def replace_file(source, target, copy=True):
+    tmp = target + ".tmp-" + uuid.uuid4().hex
+    if copy:
+        link_or_copy(source, tmp)
+    else:
+        shutil.move(source, tmp)
+    os.replace(tmp, target)
+
+
+def _same_content(path, digest, size):
+    try:
+        if os.path.getsize(path) != size:
+            return False
+    except OSError:
+        return False
+    return content_digest(path) == digest
+
+
+class ObjectStore:
+
+    def __init__(self, root):
+        self.root = os.fspath(root)
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def add(self, source, digest):
+        path = self.path(digest)
+        if not os.path.isfile(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            replace_file(source, path, copy=False)
+        return path
+
+
+def sync_tree(staging_dir, target_dir, object_store=None):
+    """Make ``target_dir`` equal to ``staging_dir`` with minimal writes.
+
+    Returns counts of ``written``, ``unchanged`` and ``removed`` files.
+    """
+    stats = {"written": 0, "unchanged": 0, "removed": 0}
+    expected = set()
+    for root, dirs, files in os.walk(staging_dir):
+        relative = os.path.relpath(root, staging_dir)
+        target_root = os.path.normpath(os.path.join(target_dir, relative))
+        os.makedirs(target_root, exist_ok=True)
+        for file_name in files:
+            source = os.path.join(root, file_name)
+            target = os.path.join(target_root, file_name)
+            expected.add(os.path.normcase(target))
+            digest = content_digest(source)
+            if _same_content(target, digest, os.path.getsize(source)):
+                stats["unchanged"] += 1
+                continue
+            if object_store is not None:
+                replace_file(object_store.add(source, digest), target)
+            else:
+                replace_file(source, target, copy=False)
+            stats["written"] += 1
+
+    for root, dirs, files in os.walk(target_dir, topdown=False):
+        for file_name in files:
+            path = os.path.join(root, file_name)
+            if os.path.normcase(path) not in expected:
+                os.remove(path)
+                stats["removed"] += 1
+        if root != target_dir and not os.listdir(root):
+            os.rmdir(root)
+    return stats
+
+
+class StagingDir:
+    # Temporäres Verzeichnis, das beim Verlassen in das Ziel synchronisiert wird.
+    # ``subdir``: nur dieses Unterverzeichnis der Staging-Ablage übernehmen
+
+    def __init__(self, target_dir, object_store=None, subdir=""):
+        self.target_dir = os.fspath(target_dir)
+        self.object_store = object_store
+        self.subdir = subdir
+        self.stats = None
+
+    def __enter__(self):
+        self._tmp = tempfile.TemporaryDirectory(prefix="staging-")
+        return self._tmp.name
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.stats = sync_tree(
+                    os.path.join(self._tmp.name, self.subdir), self.target_dir, self.object_store)
+        finally:
+            self._tmp.cleanup()
@@ -0,0 +1,234 @@
+"""Durable job queue for sweeps in a single SQLite file.
+
+The sweep publishes one job per task; any number of worker processes claim
+jobs, run them and mark them done. On one host the queue runs in WAL mode.
+WAL needs shared memory and does not work across hosts, so for workers on
+several hosts sharing a network file system (with working file locks)
+open the queue with ``shared=True``, which uses the rollback journal.
+
+A claimed job carries a lease: if the worker dies, the lease expires and
+the job is handed out again. ``LeaseKeeper`` renews the leases of the jobs
+a worker is still processing. Failed jobs are retried with exponential
+backoff up to ``max_attempts`` times, after that they stay ``failed`` with
+the last error for inspection.
+
+Status: pending -> running -> done | failed (retries go back to pending).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+STATUSES = ("pending", "running", "done", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    key TEXT UNIQUE NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0,
+    lease_until REAL,
+    worker TEXT,
+    error TEXT,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, not_before);
+"""
+
+
+class JobQueue:
+
+    def __init__(self, path, lease=7200.0, max_attempts=3, backoff=60.0, shared=False):
+        path = os.fspath(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        # Eine Verbindung je Queue-Objekt, Zugriffe aus Simulations-Threads über den Lock
+        self._db = sqlite3.connect(path, timeout=60.0, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            # WAL nur auf einem Host; über Netzlaufwerke das Rollback-Journal
+            self._db.execute("PRAGMA journal_mode=" + ("DELETE" if shared else "WAL"))
+            self._db.executescript(_SCHEMA)
+
+    def _transaction(self, statements):
+        # BEGIN IMMEDIATE: Schreibsperre sofort, damit zwei Worker nie denselben Job bekommen
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(self._db)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+        return result
+
+    def publish(self, jobs):
+        """Add ``(key, payload)`` pairs; keys already in the queue are skipped."""
+        now = time.time()
+        rows = [(key, json.dumps(payload, sort_keys=True), now) for key, payload in jobs]
+
+        def insert(db):
+            before = db.total_changes
+            db.executemany("INSERT OR IGNORE INTO jobs (key, payload, updated) VALUES (?, ?, ?)", rows)
+            return db.total_changes - before
+
+        return self._transaction(insert)
+
+    def _expire(self, db, now):
+        # Abgelaufene Leases: Worker ist ausgefallen, Job erneut vergeben oder aufgeben
+        db.execute(
+            "UPDATE jobs SET status = 'failed', error = 'lease expired', updated = ? "
+            "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+            (now, now, self.max_attempts))
+        db.execute(
+            "UPDATE jobs SET status = 'pending', updated = ? WHERE status = 'running' AND lease_until < ?",
+            (now, now))
+
+    def claim(self, worker, n=1):
+        """Lease up to ``n`` ready jobs to ``worker``; returns ``[(id, payload)]``."""
+        now = time.time()
+
+        def take(db):
+            self._expire(db, now)
+            rows = db.execute(
+                "SELECT id, payload FROM jobs WHERE status = 'pending' AND not_before <= ? "
+                "ORDER BY id LIMIT ?", (now, n)).fetchall()
+            db.executemany(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_until = ?, worker = ?, "
+                "updated = ? WHERE id = ?",
+                [(now + self.lease, worker, now, job_id) for job_id, payload in rows])
+            return [(job_id, json.loads(payload)) for job_id, payload in rows]
+
+        return self._transaction(take)
+
+    def heartbeat(self, job_id, worker=None):
+        """Renew the lease; returns False if the job is no longer leased (to ``worker``)."""
+        now = time.time()
+        if worker is None:
+            return self._transaction(lambda db: db.execute(
+                "UPDATE jobs SET lease_until = ?, updated = ? WHERE id = ? AND status = 'running'",
+                (now + self.lease, now, job_id)).rowcount > 0)
+        return self._transaction(lambda db: db.execute(
+            "UPDATE jobs SET lease_until = ?, updated = ? WHERE id = ? AND status = 'running' AND worker = ?",
+            (now + self.lease, now, job_id, worker)).rowcount > 0)
+
+    def complete(self, job_id):
+        now = time.time()
+        self._transaction(lambda db: db.execute(
+            "UPDATE jobs SET status = 'done', lease_until = NULL, error = NULL, updated = ? WHERE id = ?",
+            (now, job_id)))
+
+    def fail(self, job_id, error):
+        now = time.time()
+
+        def retry(db):
+            row = db.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                raise KeyError("Unknown job " + str(job_id))
+            attempts = row[0]
+            if attempts >= self.max_attempts:
+                db.execute(
+                    "UPDATE jobs SET status = 'failed', lease_until = NULL, error = ?, updated = ? WHERE id = ?",
+                    (error, now, job_id))
+                return False
+            # Exponentielles Backoff: backoff, 2 * backoff, 4 * backoff, ...
+            db.execute(
+                "UPDATE jobs SET status = 'pending', lease_until = NULL, not_before = ?, error = ?, updated = ? "
+                "WHERE id = ?",
+                (now + self.backoff * 2 ** (attempts - 1), error, now, job_id))
+            return True
+
+        return self._transaction(retry)
+
+    def next_ready(self):
+        """Seconds until a job may become claimable, ``None`` if all are finished."""
+        with self._lock:
+            pending = self._db.execute(
+                "SELECT MIN(not_before) FROM jobs WHERE status = 'pending'").fetchone()[0]
+            running = self._db.execute(
+                "SELECT MIN(lease_until) FROM jobs WHERE status = 'running'").fetchone()[0]
+        times = [value for value in (pending, running) if value is not None]
+        if not times:
+            return None
+        return max(min(times) - time.time(), 0.0)
+
+    def counts(self):
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update(rows)
+        return counts
+
+    def failures(self):
+        with self._lock:
+            return self._db.execute(
+                "SELECT key, attempts, error FROM jobs WHERE status = 'failed' ORDER BY id").fetchall()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LeaseKeeper:
+    # Hintergrund-Thread, der die Leases beanspruchter Jobs verlängert, solange sie in Arbeit sind
+
+    def __init__(self, job_queue, worker, interval=None):
+        self.job_queue = job_queue
+        self.worker = worker
+        self.interval = interval or job_queue.lease / 3
+        self._ids = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def add(self, job_id):
+        with self._lock:
+            self._ids.add(job_id)
+
+    def discard(self, job_id):
+        with self._lock:
+            self._ids.discard(job_id)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                job_ids = list(self._ids)
+            for job_id in job_ids:
+                if not self.job_queue.heartbeat(job_id, self.worker):
+                    # Lease verloren (abgelaufen und neu vergeben): nicht weiter verlängern
+                    self.discard(job_id)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_claims(job_queue, worker, batch=1, leases=None):
+    # Jobs erst beanspruchen, wenn sie abgerufen werden, bis aktuell keiner mehr bereit ist
+    while True:
+        claimed = job_queue.claim(worker, batch)
+        if not claimed:
+            return
+        for job_id, payload in claimed:
+            if leases is not None:
+                leases.add(job_id)
+            yield job_id, payload
@@ -0,0 +1,92 @@
+"""Heating demand and comfort KPIs for every run in the result store.
+
+The store is read file by file (each file holds complete runs) and all runs
+of a file are evaluated at once: interval energies come from vectorized
+trapezoidal integration over the time axis and are summed per run, per zone
+and per month with ``np.bincount``. The result is one compact summary row
+per run.
+"""
+import os
+
+import numpy as np
+
+from result_store import KEY_COLUMNS
+from schedules import N_ZONES
+
+HEATER = ["multizone.PHeater[" + str(zone + 1) + "]" for zone in range(N_ZONES)]
+T_AIR = ["multizone.TAir[" + str(zone + 1) + "]" for zone in range(N_ZONES)]
+
+# Unterheizt, wenn die Zonenlufttemperatur darunter liegt [K]
+T_MIN_COMFORT = 293.15
+
+YEAR = 3.1536e7
+MONTH_STARTS = np.cumsum([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30]) * 86400.0
+MONTHS = ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+J_PER_KWH = 3.6e6
+
+
+def run_kpis(frame, t_min=T_MIN_COMFORT):
+    # ``frame``: Zeilen mehrerer Läufe, je Lauf zusammenhängend und zeitlich sortiert
+    keys = frame["key"].to_numpy()
+    new_run = np.r_[True, keys[1:] != keys[:-1]]
+    starts = np.flatnonzero(new_run)
+    run = np.cumsum(new_run) - 1
+    n_runs = len(starts)
+
+    time = frame["time"].to_numpy(dtype=np.float64)
+    # Intervalle über Laufgrenzen hinweg zählen nicht
+    dt = np.where(run[1:] == run[:-1], np.diff(time), 0.0)
+    interval_run = run[:-1]
+    month = np.searchsorted(MONTH_STARTS, time[:-1] % YEAR, side="right") - 1
+
+    heat = np.nan_to_num(frame[HEATER].to_numpy(dtype=np.float64))
+    energy = 0.5 * (heat[1:] + heat[:-1]) * dt[:, None]
+    temperature = frame[T_AIR].to_numpy(dtype=np.float64)
+    below = (temperature[:-1] < t_min) * dt[:, None] / 3600
+
+    summary = frame.iloc[starts][[column for column in KEY_COLUMNS if column in frame]].reset_index(drop=True)
+    total = heat.sum(axis=1)
+    for zone in range(N_ZONES):
+        suffix = "_z" + str(zone + 1)
+        summary["heating_kWh" + suffix] = np.bincount(
+            interval_run, weights=energy[:, zone], minlength=n_runs) / J_PER_KWH
+        summary["peak_W" + suffix] = np.maximum.reduceat(heat[:, zone], starts)
+        summary["underheating_h" + suffix] = np.bincount(
+            interval_run, weights=below[:, zone], minlength=n_runs)
+    summary["heating_kWh"] = np.bincount(interval_run, weights=energy.sum(axis=1), minlength=n_runs) / J_PER_KWH
+    summary["peak_W"] = np.maximum.reduceat(total, starts)
+    monthly = np.bincount(
+        interval_run * 12 + month, weights=energy.sum(axis=1), minlength=n_runs * 12).reshape(n_runs, 12)
+    for index, name in enumerate(MONTHS):
+        summary["heating_kWh_" + name] = monthly[:, index] / J_PER_KWH
+    return summary
+
+
+def compute_kpis(store, t_min=T_MIN_COMFORT, filter=None):
+    import pandas as pd
+
+    columns = list(KEY_COLUMNS) + ["time"] + HEATER + T_AIR
+    summaries = [run_kpis(frame, t_min=t_min) for frame in store.iter_runs(columns=columns, filter=filter)]
+    if not summaries:
+        return pd.DataFrame()
+    return pd.concat(summaries, ignore_index=True)
+
+
+def write_summary(summary, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if path.endswith(".csv"):
+        summary.to_csv(path, index=False)
+    else:
+        summary.to_parquet(path, index=False)
+
+
+def normalize_heating(summary, degree_days, reference_degree_days, value="heating_kWh"):
+    # Gradtagzahlverfahren: Heizwärmebedarf auf das Referenzklima umrechnen
+    summary[value + "_norm"] = summary[value] * (reference_degree_days / degree_days)
+    return summary
+
+
+def compare_constructions(summary, value="heating_kWh"):
+    # z. B. tabula_standard gegen tabula_retrofit über Fläche x Baujahr
+    return summary.pivot_table(
+        index=["leased_area", "year_of_construction"], columns="construction", values=value, aggfunc="mean")
@@ -0,0 +1,159 @@
+"""Two-stage pipeline: model generation/export overlapped with simulation.
+
+TEASER generation and AixLib export are CPU-bound Python and run in a pool
+of worker processes. Their results are fed into a bounded queue that the
+simulation stage drains with its own number of workers (threads, as each
+simulation runs in an external simulator process anyway). The bounded
+queue keeps generation from running arbitrarily far ahead of simulation.
+If a generation process dies (e.g. killed for lack of memory), the variants
+it was working on are reported as failed and generation continues in a new
+process pool.
+"""
+import queue
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+_DONE = object()
+
+
+def _generate_inline(variants, generate):
+    for variant in variants:
+        try:
+            yield variant, generate(variant), None
+        except Exception:
+            yield variant, None, traceback.format_exc()
+
+
+def _generate_pooled(variants, generate, n_generate, max_in_flight):
+    pool = ProcessPoolExecutor(max_workers=n_generate)
+    pending = {}
+    variants = iter(variants)
+    exhausted = False
+    # Variante, die wegen eines abgestürzten Pools nicht übergeben werden konnte
+    retry = None
+    try:
+        while pending or not exhausted or retry is not None:
+            broken = False
+            # Nur begrenzt viele Varianten gleichzeitig in Arbeit halten
+            while len(pending) < max_in_flight:
+                if retry is not None:
+                    variant, retry = retry, None
+                else:
+                    try:
+                        variant = next(variants)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                try:
+                    pending[pool.submit(generate, variant)] = variant
+                except BrokenProcessPool:
+                    retry = variant
+                    broken = True
+                    break
+            if pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    variant = pending.pop(future)
+                    try:
+                        yield variant, future.result(), None
+                    except BrokenProcessPool:
+                        broken = True
+                        yield variant, None, traceback.format_exc()
+                    except Exception:
+                        yield variant, None, traceback.format_exc()
+            if broken:
+                # Ein Worker-Prozess ist abgestürzt: alle Varianten in Arbeit sind verloren
+                # (oben als fehlgeschlagen gemeldet), mit einem neuen Pool weitermachen
+                for future in list(pending):
+                    variant = pending.pop(future)
+                    try:
+                        yield variant, future.result(), None
+                    except Exception:
+                        yield variant, None, traceback.format_exc()
+                pool.shutdown(wait=True)
+                pool = ProcessPoolExecutor(max_workers=n_generate)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def run_pipeline(
+        variants,
+        generate,
+        simulate,
+        n_generate=1,
+        n_simulate=1,
+        max_queued=None,
+        on_result=None,
+        max_in_flight=None,
+):
+    """Run ``generate`` and ``simulate`` for every variant with overlap.
+
+    ``generate(variant)`` must be picklable (module level function or
+    ``functools.partial`` of one) when ``n_generate > 0``; with
+    ``n_generate=0`` it runs inline in the calling process.
+    ``simulate(job)`` receives the return value of ``generate``.
+    ``on_result(variant, result)`` is called from the simulation workers;
+    if it raises, the variant is reported as failed in stage ``on_result``.
+    ``max_in_flight`` limits the variants taken from ``variants`` while
+    generation is running (default ``max_queued``); ``n_generate`` takes a
+    new variant only when a generation slot is free.
+    Returns a summary with the number of finished variants and the
+    failures as ``(variant, stage, traceback)``.
+    """
+    if n_simulate < 1:
+        raise ValueError("n_simulate must be at least 1, got " + str(n_simulate))
+    if max_queued is None:
+        max_queued = 2 * max(n_generate, 1) + n_simulate
+    if max_in_flight is None:
+        max_in_flight = max_queued
+    jobs = queue.Queue(maxsize=max_queued)
+    lock = threading.Lock()
+    summary = {"done": 0, "failed": []}
+
+    def worker():
+        while True:
+            item = jobs.get()
+            if item is _DONE:
+                return
+            variant, job = item
+            try:
+                result = simulate(job)
+            except Exception:
+                with lock:
+                    summary["failed"].append((variant, "simulate", traceback.format_exc()))
+                continue
+            if on_result is not None:
+                try:
+                    on_result(variant, result)
+                except Exception:
+                    # Worker muss weiterlaufen, sonst blockiert die Erzeugung an der vollen Queue
+                    with lock:
+                        summary["failed"].append((variant, "on_result", traceback.format_exc()))
+                    continue
+            with lock:
+                summary["done"] += 1
+
+    workers = [threading.Thread(target=worker, daemon=True) for _ in range(n_simulate)]
+    for thread in workers:
+        thread.start()
+
+    try:
+        if n_generate > 0:
+            generated = _generate_pooled(variants, generate, n_generate, max_in_flight)
+        else:
+            generated = _generate_inline(variants, generate)
+        for variant, job, error in generated:
+            if error is not None:
+                with lock:
+                    summary["failed"].append((variant, "generate", error))
+                continue
+            # Blockiert, solange die Simulation hinterherhängt
+            jobs.put((variant, job))
+    finally:
+        for _ in workers:
+            jobs.put(_DONE)
+        for thread in workers:
+            thread.join()
+    return summary
@@ -0,0 +1,196 @@
+"""Hourly two-element reduced-order (RC) simulation in NumPy for screening.
+
+Uses the two-element parameters TEASER already calculates for every zone
+(``prj.number_of_elements_calc = 2``): one capacity for the outer walls,
+one for the inner walls and the zone air. Every (run, zone) is one column,
+so many buildings and schedules are simulated together with one vectorized
+time loop. Each sub-step solves the air node implicitly (ideal heater
+limited to the zone heat load), then both wall nodes implicitly, which is
+stable for any step size.
+
+``RCBackend`` is a drop-in simulator backend for ``SessionPool``: it reads
+``job["rc"]`` (see ``rc_parameters``) instead of a Modelica package and
+writes the same variables as the Modelica model, so result store and KPI
+evaluation work unchanged.
+"""
+import os
+
+import numpy as np
+
+from schedules import N_ZONES, zone_profile
+from weather import load_weather
+
+RHO_CP_AIR = 1.2 * 1005.0  # J/(m³K)
+# Möbel und Einrichtung erhöhen die wirksame Luftkapazität
+AIR_CAPACITY_FACTOR = 5.0
+PERSON_HEAT = 70.0  # W je Person, falls TEASER keinen Wert liefert
+SOLAR_FACTOR = 0.5  # Anteil der horizontalen Globalstrahlung auf mittlere Fensterfläche
+
+
+def _resistance(*parts):
+    return sum(parts)
+
+
+def zone_rc_parameters(zone):
+    attr = zone.model_attr
+    use_conditions = zone.use_conditions
+    windows = list(zone.windows)
+    window_area = sum(window.area for window in windows)
+    g_value = (
+        sum(window.area * window.g_value for window in windows) / window_area
+        if window_area else 0.0)
+    h_ow_in = 1 / _resistance(attr.r1_ow, 1 / (attr.alpha_conv_inner_ow * attr.area_ow)) if attr.area_ow else 0.0
+    h_ow_out = 1 / _resistance(attr.r_rest_ow, 1 / (attr.alpha_comb_outer_ow * attr.area_ow)) if attr.area_ow else 0.0
+    h_iw = 1 / _resistance(attr.r1_iw, 1 / (attr.alpha_conv_inner_iw * attr.area_iw)) if attr.area_iw else 0.0
+    h_win = 1 / _resistance(
+        attr.r1_win,
+        1 / (attr.alpha_conv_inner_win * attr.area_win),
+        1 / (attr.alpha_comb_outer_win * attr.area_win)) if attr.area_win else 0.0
+    return {
+        "c_air": RHO_CP_AIR * zone.volume * AIR_CAPACITY_FACTOR,
+        "h_vent": RHO_CP_AIR * zone.volume * use_conditions.infiltration_rate / 3600,
+        "c_ow": attr.c1_ow,
+        "h_ow_in": h_ow_in,
+        "h_ow_out": h_ow_out,
+        "c_iw": attr.c1_iw,
+        "h_iw": h_iw,
+        "h_win": h_win,
+        "solar_aperture": window_area * g_value * SOLAR_FACTOR,
+        "q_persons": zone.area * use_conditions.persons
+        * getattr(use_conditions, "fixed_heat_flow_rate_persons", PERSON_HEAT),
+        "q_machines": zone.area * use_conditions.machines,
+        "q_lighting": zone.area * use_conditions.lighting_power,
+        "lighting_profile": tuple(use_conditions.lighting_profile),
+        "heat_load": attr.heat_load,
+        "with_heating": bool(use_conditions.with_heating),
+    }
+
+
+def rc_parameters(building, day_profiles):
+    # Picklebare Beschreibung des Gebäudes für Worker und RCBackend
+    return {
+        "zones": [zone_rc_parameters(zone) for zone in building.thermal_zones[:N_ZONES]],
+        "day_profiles": day_profiles,
+    }
+
+
+def _column_profiles(rc, schedule, n_hours, first_hour=0):
+    holidays = tuple(sorted(set(schedule["holiday"])))
+    columns = {"persons": [], "machines": [], "lighting": [], "t_set": []}
+    hours = slice(first_hour, first_hour + n_hours)
+    for zone, params in enumerate(rc["zones"]):
+        persons_day, heating_day = rc["day_profiles"][zone]
+        args = (schedule["scenario"], schedule["weekend"], holidays, zone)
+        columns["persons"].append(zone_profile("P", *args, tuple(persons_day))[hours])
+        columns["machines"].append(zone_profile("M", *args)[hours])
+        columns["t_set"].append(zone_profile("H", *args, tuple(heating_day))[hours])
+        lighting = np.asarray(params["lighting_profile"], dtype=np.float64)
+        columns["lighting"].append(np.resize(lighting, first_hour + n_hours)[hours])
+    return {name: np.column_stack(values) for name, values in columns.items()}
+
+
+def simulate_rc(columns, weather, substeps=4, t_start=293.15):
+    """Simulate all columns over the weather period.
+
+    ``columns`` maps every parameter of ``zone_rc_parameters`` (scalars) and
+    the hourly ``persons``, ``machines``, ``lighting`` and ``t_set``
+    profiles (hours x columns) to arrays. Returns hourly air temperature [K]
+    and heater power [W], both hours x columns.
+    """
+    t_out = weather["dry_bulb"] + 273.15
+    solar = weather["global_horizontal"]
+    n_hours = min(len(t_out), columns["t_set"].shape[0])
+    dt = 3600.0 / substeps
+
+    p = {name: np.asarray(value, dtype=np.float64) for name, value in columns.items()}
+    n_columns = p["c_air"].shape[0]
+    t_air = np.full(n_columns, t_start)
+    t_ow = np.full(n_columns, t_start)
+    t_iw = np.full(n_columns, t_start)
+    result_t = np.empty((n_hours, n_columns))
+    result_q = np.empty((n_hours, n_columns))
+
+    c_air = p["c_air"] / dt
+    c_ow = p["c_ow"] / dt
+    c_iw = p["c_iw"] / dt
+    h_direct = p["h_win"] + p["h_vent"]
+    h_sum = p["h_ow_in"] + p["h_iw"] + h_direct
+    q_max = np.where(p["with_heating"] > 0, p["heat_load"], 0.0)
+
+    for hour in range(n_hours):
+        gains = (
+            p["q_persons"] * p["persons"][hour]
+            + p["q_machines"] * p["machines"][hour]
+            + p["q_lighting"] * p["lighting"][hour]
+            + p["solar_aperture"] * solar[hour])
+        t_set = p["t_set"][hour]
+        q_hour = np.zeros(n_columns)
+        for _ in range(substeps):
+            # Luftknoten implizit, freie Temperatur und benötigte Heizleistung
+            rhs = c_air * t_air + p["h_ow_in"] * t_ow + p["h_iw"] * t_iw + h_direct * t_out[hour] + gains
+            q_heat = np.clip(t_set * (c_air + h_sum) - rhs, 0.0, q_max)
+            t_air = (rhs + q_heat) / (c_air + h_sum)
+            # Wandknoten implizit mit der neuen Lufttemperatur
+            t_ow = (c_ow * t_ow + p["h_ow_in"] * t_air + p["h_ow_out"] * t_out[hour]) / (
+                c_ow + p["h_ow_in"] + p["h_ow_out"])
+            t_iw = (c_iw * t_iw + p["h_iw"] * t_air) / (c_iw + p["h_iw"])
+            q_hour += q_heat
+        result_t[hour] = t_air
+        result_q[hour] = q_hour / substeps
+    return result_t, result_q
+
+
+def batch_columns(rcs, schedules, n_hours, first_hour=0):
+    # Spalten = (Lauf, Zone), die Zonen eines Laufs liegen nebeneinander
+    scalars = {}
+    profiles = {}
+    for rc, schedule in zip(rcs, schedules):
+        for zone in rc["zones"]:
+            for name, value in zone.items():
+                if name != "lighting_profile":
+                    scalars.setdefault(name, []).append(float(value))
+        for name, value in _column_profiles(rc, schedule, n_hours, first_hour).items():
+            profiles.setdefault(name, []).append(value)
+    columns = {name: np.asarray(values) for name, values in scalars.items()}
+    columns.update({name: np.hstack(values) for name, values in profiles.items()})
+    return columns
+
+
+class RCBackend:
+
+    def __init__(self, weather_file, substeps=4, simulation_setup=None):
+        # Einmal geparst und memory-mapped, von allen Sessions und Workern geteilt
+        self.weather = load_weather(weather_file)
+        self.substeps = substeps
+        self.simulation_setup = simulation_setup
+
+    def simulate(self, job):
+        runs = job["runs"] if "runs" in job else [
+            {"result_file_name": job["result_file_name"], "schedule": job["schedule"]}]
+        # Ohne Vorgabe das ganze Wetterjahr, sonst nur das Zeitfenster des Jobs
+        setup = job.get("simulation_setup") or self.simulation_setup
+        first_hour = int(setup["start_time"] // 3600) if setup else 0
+        last_hour = int(setup["stop_time"] // 3600) if setup else len(self.weather["time"])
+        weather = {name: values[first_hour:last_hour] for name, values in self.weather.items()}
+        n_hours = len(weather["time"])
+        columns = batch_columns(
+            [job["rc"]] * len(runs), [run["schedule"] for run in runs], n_hours, first_hour=first_hour)
+        t_air, q_heat = simulate_rc(columns, weather, substeps=self.substeps)
+        time_axis = (first_hour + np.arange(t_air.shape[0])) * 3600.0
+
+        n_zones = len(job["rc"]["zones"])
+        os.makedirs(job["savepath"], exist_ok=True)
+        results = []
+        for index, run in enumerate(runs):
+            zones = slice(index * n_zones, (index + 1) * n_zones)
+            signals = {}
+            for zone, (t, q) in enumerate(zip(t_air[:, zones].T, q_heat[:, zones].T)):
+                signals["multizone.TAir[" + str(zone + 1) + "]"] = t
+                signals["multizone.PHeater[" + str(zone + 1) + "]"] = q
+            path = os.path.join(job["savepath"], run["result_file_name"] + ".npz")
+            np.savez(path, time=time_axis, **signals)
+            results.append(path)
+        return results if "runs" in job else results[0]
+
+    def close(self):
+        pass
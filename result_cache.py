@@ -0,0 +1,143 @@
+"""Content-addressed cache for exported models and simulation results.
+
+Every run is identified by a SHA-256 hash over all of its inputs (building
+parameters, construction and retrofit settings, schedules, weather file
+content and library version). Results live under ``results/<hash>`` and
+exported models under ``models/<hash>`` (hash without the schedules, as
+one exported model serves all schedules). An entry is complete once its
+``meta.json`` exists; entries are assembled in a temporary directory and
+renamed into place, so a crash never leaves a half-written entry behind
+and a resumed sweep only runs the missing variants.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import uuid
+from functools import lru_cache
+
+from incremental_export import link_or_copy
+
+META_FILE = "meta.json"
+
+
+def file_digest(path):
+    # Neu berechnen, sobald sich Änderungszeit oder Größe der Datei ändern
+    stat = os.stat(path)
+    return _file_digest(path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=None)
+def _file_digest(path, mtime_ns, size):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def library_version(package_mo):
+    # Versionsangabe aus der Annotation der Bibliothek, z. B. version="1.0.2"
+    with open(package_mo, encoding="utf-8", errors="replace") as file:
+        match = re.search(r'\bversion\s*=\s*"([^"]*)"', file.read())
+    if match:
+        return match.group(1)
+    return file_digest(package_mo)
+
+
+def inputs_key(inputs):
+    text = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+
+    def __init__(self, root):
+        self.root = os.fspath(root)
+
+    def _entry(self, kind, key):
+        return os.path.join(self.root, kind, key[:2], key)
+
+    def _complete(self, kind, key):
+        entry = self._entry(kind, key)
+        if os.path.isfile(os.path.join(entry, META_FILE)):
+            return entry
+        return None
+
+    def _commit(self, kind, key, fill, meta):
+        entry = self._entry(kind, key)
+        tmp = entry + ".tmp-" + uuid.uuid4().hex
+        os.makedirs(tmp)
+        try:
+            fill(tmp)
+            with open(os.path.join(tmp, META_FILE), "w", encoding="utf-8") as file:
+                json.dump(dict(meta or {}, key=key), file, sort_keys=True, indent=1, default=str)
+            # Unvollständige Reste eines abgebrochenen Laufs ersetzen
+            if os.path.isdir(entry) and not self._complete(kind, key):
+                shutil.rmtree(entry)
+            try:
+                os.rename(tmp, entry)
+            except OSError:
+                # Ein anderer Worker war schneller, dessen Eintrag gilt
+                if not self._complete(kind, key):
+                    raise
+                shutil.rmtree(tmp)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        return entry
+
+    def has_result(self, key):
+        return self._complete("results", key) is not None
+
+    def result_path(self, key):
+        entry = self._complete("results", key)
+        if entry is None:
+            return None
+        with open(os.path.join(entry, META_FILE), encoding="utf-8") as file:
+            return os.path.join(entry, json.load(file)["result_file"])
+
+    def store_result(self, key, result_file, meta=None):
+        result_name = os.path.basename(result_file)
+
+        def fill(tmp):
+            shutil.move(result_file, os.path.join(tmp, result_name))
+        entry = self._commit("results", key, fill, dict(meta or {}, result_file=result_name))
+        return os.path.join(entry, result_name)
+
+    def model_path(self, key):
+        entry = self._complete("models", key)
+        if entry is None:
+            return None
+        return os.path.join(entry, "model")
+
+    def model_meta(self, key):
+        entry = self._complete("models", key)
+        if entry is None:
+            return None
+        with open(os.path.join(entry, META_FILE), encoding="utf-8") as file:
+            return json.load(file)
+
+    def store_model(self, key, package_dir, meta=None):
+        if self._complete("models", key):
+            return self.model_path(key)
+
+        def fill(tmp):
+            shutil.copytree(package_dir, os.path.join(tmp, "model"), copy_function=link_or_copy)
+        return os.path.join(self._commit("models", key, fill, meta), "model")
+
+    def fmu_path(self, key):
+        entry = self._complete("fmus", key)
+        if entry is None:
+            return None
+        return os.path.join(entry, "model.fmu")
+
+    def store_fmu(self, key, fmu_file, meta=None):
+        if self._complete("fmus", key):
+            return self.fmu_path(key)
+
+        def fill(tmp):
+            shutil.move(fmu_file, os.path.join(tmp, "model.fmu"))
+        return os.path.join(self._commit("fmus", key, fill, meta), "model.fmu")
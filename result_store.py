@@ -0,0 +1,190 @@
+"""Columnar store of selected result variables across all sweep runs.
+
+Only a configured set of variables is read from each result file and
+appended to a Parquet dataset (one file per flushed batch of runs, so
+ingestion stays crash-safe and memory bounded). Every row is one time step
+of one run, keyed by the run hash plus the variant and schedule parameters.
+Queries read only the requested columns and rows, memory-mapped and batch
+by batch, instead of loading whole result files.
+
+Requires pandas and pyarrow; they are imported on first use.
+"""
+import os
+import threading
+import uuid
+
+import numpy as np
+
+from sweep import DIMENSIONS
+from schedules import N_ZONES
+
+# Zonenlufttemperaturen, Heizleistung je Zone und AHU-Leistung (AixLib MultizoneEquipped)
+DEFAULT_VARIABLES = tuple(
+    ["multizone.TAir[" + str(zone + 1) + "]" for zone in range(N_ZONES)]
+    + ["multizone.PHeater[" + str(zone + 1) + "]" for zone in range(N_ZONES)]
+    + ["multizone.PelAHU", "multizone.PHeatAHU"]
+)
+SCHEDULE_COLUMNS = ("scenario", "weekend", "holiday")
+KEY_COLUMNS = ("key",) + DIMENSIONS + SCHEDULE_COLUMNS
+
+
+def load_variables(result_file, variables):
+    # Liefert Zeitachse und ein Array (Zeit x Variable); fehlende Variablen sind NaN
+    if result_file.endswith(".npz"):
+        with np.load(result_file) as data:
+            time = data["time"]
+            values = np.column_stack([
+                data[name] if name in data.files else np.full(len(time), np.nan)
+                for name in variables])
+        return time, values
+
+    from ebcpy import TimeSeriesData
+
+    tsd = TimeSeriesData(result_file, variable_names=list(variables))
+    df = tsd.to_df()
+    # Ereignisse erzeugen doppelte Zeitpunkte, der letzte Wert gilt
+    df = df[~df.index.duplicated(keep="last")]
+    values = np.column_stack([
+        df[name].to_numpy(dtype=np.float64) if name in df.columns else np.full(len(df), np.nan)
+        for name in variables])
+    return df.index.to_numpy(dtype=np.float64), values
+
+
+def _key_values(key, variant, schedule):
+    schedule = schedule or {}
+    holiday = schedule.get("holiday")
+    if holiday is not None:
+        holiday = "-".join(str(week) for week in holiday)
+    values = {"key": key, "scenario": schedule.get("scenario"), "weekend": schedule.get("weekend"),
+              "holiday": holiday}
+    for name in DIMENSIONS:
+        values[name] = variant.get(name)
+    return values
+
+
+class ResultStore:
+
+    def __init__(self, path, variables=DEFAULT_VARIABLES, batch_runs=64):
+        self.path = os.fspath(path)
+        self.variables = tuple(variables)
+        self.batch_runs = batch_runs
+        self._pending = []
+        self._lock = threading.Lock()
+        self._keys = None
+
+    def _dataset(self):
+        import pyarrow.dataset as ds
+        from pyarrow import fs
+
+        import pyarrow as pa
+
+        # Dateien werden memory-mapped statt komplett eingelesen
+        filesystem = fs.LocalFileSystem(use_mmap=True)
+        dataset = ds.dataset(os.path.abspath(self.path), format="parquet", filesystem=filesystem)
+        # Ältere Dateien ohne später ergänzte Spalten: Schema über alle Dateien vereinigen
+        schema = pa.unify_schemas([fragment.physical_schema for fragment in dataset.get_fragments()])
+        return ds.dataset(os.path.abspath(self.path), format="parquet", filesystem=filesystem, schema=schema)
+
+    def _has_files(self):
+        return os.path.isdir(self.path) and any(
+            name.endswith(".parquet") for name in os.listdir(self.path))
+
+    def keys(self):
+        if self._keys is None:
+            keys = set()
+            if self._has_files():
+                for batch in self._dataset().to_batches(columns=["key"]):
+                    keys.update(batch.column(0).unique().to_pylist())
+            self._keys = keys
+        return self._keys
+
+    def add(self, key, result_file, variant, schedule=None):
+        with self._lock:
+            if key in self.keys():
+                return False
+        time, values = load_variables(os.fspath(result_file), self.variables)
+        with self._lock:
+            self._keys.add(key)
+            self._pending.append((_key_values(key, variant, schedule), time, values))
+            if len(self._pending) >= self.batch_runs:
+                self._flush()
+        return True
+
+    def _flush(self):
+        if not self._pending:
+            return
+        import pandas as pd
+
+        frames = []
+        for key_values, time, values in self._pending:
+            frame = pd.DataFrame(values, columns=list(self.variables))
+            frame.insert(0, "time", time)
+            for column, value in reversed(list(key_values.items())):
+                frame.insert(0, column, value)
+            frames.append(frame)
+        frame = pd.concat(frames, ignore_index=True)
+        os.makedirs(self.path, exist_ok=True)
+        # Erst vollständig schreiben, dann umbenennen: keine halben Dateien im Datensatz
+        name = "part-" + uuid.uuid4().hex
+        tmp = os.path.join(self.path, "." + name + ".tmp")
+        frame.to_parquet(tmp, engine="pyarrow", index=False)
+        os.replace(tmp, os.path.join(self.path, name + ".parquet"))
+        self._pending = []
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _columns(dataset, columns):
+        # Spalten, die erst spätere Versionen schreiben (z. B. neue Dimensionen), überspringen
+        if columns is None:
+            return None
+        return [column for column in columns if column in dataset.schema.names]
+
+    def iter_batches(self, columns=None, filter=None, batch_size=1 << 16):
+        """Yield pandas frames chunk by chunk.
+
+        ``filter`` is a ``pyarrow.dataset`` expression, e.g.
+        ``pyarrow.dataset.field("construction") == "tabula_retrofit"``.
+        """
+        if not self._has_files():
+            return
+        dataset = self._dataset()
+        scanner = dataset.scanner(
+            columns=self._columns(dataset, columns),
+            filter=filter,
+            batch_size=batch_size)
+        for batch in scanner.to_batches():
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+    def iter_runs(self, columns=None, filter=None):
+        # Eine Parquet-Datei enthält immer vollständige Läufe, daher Datei für Datei
+        if not self._has_files():
+            return
+        dataset = self._dataset()
+        columns = self._columns(dataset, columns)
+        for fragment in dataset.get_fragments(filter=filter):
+            # Schema des Datensatzes: in älteren Dateien fehlende Spalten werden leer ergänzt
+            table = fragment.to_table(schema=dataset.schema, columns=columns, filter=filter)
+            if table.num_rows:
+                yield table.to_pandas()
+
+    def read(self, columns=None, filter=None):
+        import pandas as pd
+
+        frames = list(self.iter_batches(columns=columns, filter=filter))
+        if not frames:
+            return pd.DataFrame(columns=list(columns) if columns is not None else None)
+        return pd.concat(frames, ignore_index=True)
+
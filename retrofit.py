@@ -0,0 +1,128 @@
+"""Batch retrofit variants derived from one calculated base building.
+
+Instead of ``prj.retrofit_all_buildings`` (one hard-coded retrofit that
+alters every building of the project) each variant is a copy of the base
+building, retrofitted zone by zone. Only zones whose element layers
+actually changed are recalculated; the others keep the parameters of the
+base building. The base building and its project are left untouched, the
+copies share the project (and its TABULA data) with the base. A copy is
+only exported once it is attached to a project (``attach`` or the
+``project`` argument); export it by its ``internal_id``.
+
+    for options, building in retrofit_variants(base, retrofit_options(RETROFIT_SPEC)):
+        ...
+"""
+import copy
+import random
+from itertools import product
+
+RETROFIT_DIMENSIONS = ("year_of_retrofit", "type_of_retrofit", "window_type", "material")
+
+# Bisher einzige Sanierung der Studie
+RETROFIT_SPEC = {
+    "year_of_retrofit": [2015],
+    "type_of_retrofit": ["retrofit", "adv_retrofit"],
+    "window_type": ['Alu- oder Stahlfenster, Isolierverglasung'],
+    "material": ['EPS_perimeter_insulation_top_layer'],
+}
+
+# Dimension "retrofit" der Variantenstudie: NO_RETROFIT oder eine Sanierungsart,
+# übrige Einstellungen aus RETROFIT_SETTINGS
+NO_RETROFIT = "none"
+RETROFIT_SETTINGS = {
+    "year_of_retrofit": 2015,
+    "window_type": 'Alu- oder Stahlfenster, Isolierverglasung',
+    "material": 'EPS_perimeter_insulation_top_layer',
+}
+
+# Elemente einer Zone, deren Schichten bei der Sanierung ersetzt werden können
+ELEMENTS = ("outer_walls", "doors", "rooftops", "ground_floors", "windows", "inner_walls", "floors", "ceilings")
+
+
+def retrofit_options(spec=RETROFIT_SPEC):
+    unknown = set(spec) - set(RETROFIT_DIMENSIONS)
+    if unknown:
+        raise ValueError("Unknown retrofit dimensions: " + ", ".join(sorted(unknown)))
+    values = [spec.get(name, [None]) for name in RETROFIT_DIMENSIONS]
+    values = [value if isinstance(value, (list, tuple)) else [value] for value in values]
+    return [dict(zip(RETROFIT_DIMENSIONS, combination)) for combination in product(*values)]
+
+
+def layer_signature(zone):
+    # Aufbau aller Bauteile: Schichtdicken, Materialien und Fensterkennwerte
+    signature = []
+    for attr in ELEMENTS:
+        for element in getattr(zone, attr, None) or ():
+            layers = tuple(
+                (layer.thickness, getattr(layer.material, "name", None)) for layer in element.layer or ())
+            signature.append((attr, element.name, layers, getattr(element, "g_value", None)))
+    return tuple(signature)
+
+
+def copy_building(base):
+    # Projekt (mit TEASER-Datenbasis) nicht mitkopieren; die Kopie ist nicht in prj.buildings
+    building = copy.deepcopy(base, memo={id(base.parent): base.parent})
+    building.internal_id = random.random()
+    return building
+
+
+def attach(building, prj):
+    # In prj.buildings aufnehmen, damit export_aixlib die Kopie über internal_id findet.
+    # Der TEASER-Setter von parent nimmt das Gebäude bereits auf, daher nur einmal anhängen
+    building.parent = prj
+    if not any(other is building for other in prj.buildings):
+        prj.buildings.append(building)
+    return building
+
+
+def _update_building(building, zones):
+    from teaser.logic.buildingobjects.calculation.aixlib import AixLib
+
+    for zone in zones:
+        zone.calc_zone_parameters(
+            number_of_elements=building.number_of_elements_calc,
+            merge_windows=building.merge_windows_calc,
+            t_bt=5)
+    building.sum_heat_load = sum(zone.model_attr.heat_load for zone in building.thermal_zones)
+    building.sum_cooling_load = building.sum_heat_load
+    if building.used_library_calc == "AixLib":
+        building.library_attr = AixLib(parent=building)
+        building.library_attr.calc_auxiliary_attr()
+
+
+def retrofit_variant(
+        base,
+        year_of_retrofit,
+        type_of_retrofit=None,
+        window_type=None,
+        material=None,
+        name=None,
+        project=None,
+):
+    """Return a retrofitted copy of the calculated ``base`` building.
+
+    ``base`` must have been calculated (``calc_building``) before. Without
+    ``project`` the copy is not part of any project; with it, the copy is
+    attached to ``project`` and can be exported from there.
+    """
+    building = copy_building(base)
+    if name is not None:
+        building.name = name
+    building.year_of_retrofit = year_of_retrofit
+    changed = []
+    for zone in building.thermal_zones:
+        before = layer_signature(zone)
+        zone.retrofit_zone(type_of_retrofit=type_of_retrofit, window_type=window_type, material=material)
+        if layer_signature(zone) != before:
+            changed.append(zone)
+    if changed:
+        _update_building(building, changed)
+    if project is not None:
+        attach(building, project)
+    return building
+
+
+def retrofit_variants(base, options=None):
+    # Alle Sanierungsvarianten aus demselben Grundgebäude
+    for option in options if options is not None else retrofit_options():
+        yield option, retrofit_variant(base, **option)
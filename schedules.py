@@ -0,0 +1,148 @@
+"""Vectorized annual schedules (machines, persons, heating) for the five zones.
+
+Every zone profile is assembled from three 24 h day-type templates
+(weekday, weekend, holiday). A day-type index over the 53 simulated weeks
+selects the template rows, so a whole annual profile is one fancy-indexing
+step instead of the former week-by-week ``list.extend`` loop.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+N_ZONES = 5
+N_WEEKS = 53
+HOURS_PER_DAY = 24
+
+WEEKDAY = 0
+WEEKEND = 1
+HOLIDAY = 2
+
+# Sollwert im Urlaub / am freien Wochenende [K]
+T_SET_BACK = 288.15
+# Konstanter Sollwert in Szenario 2 [K]
+T_SET_CONST = 294.15
+
+# Platzhalter: stündliches Profil aus den TEASER UseConditions der Zone
+TEASER = "teaser"
+
+_M_WEEKDAY = (
+    (0, 0, 0, 0, 0, 0, 0, 0.06, 0.2376, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.297, 0.297, 0.297, 0.2994, 0),
+    (0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.7004, 0.165, 0.165, 0.165, 0.165),
+    (0, 0, 0, 0, 0, 0, 0, 0, 0.005, 0, 0.005, 0, 0, 0, 0, 0, 0, 0.005, 0, 0, 0, 0, 0.03, 0),
+    (0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0.06),
+    (0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0.15, 0.15, 0.15, 0.15, 0, 0, 0, 0.06, 0),
+)
+# Szenario 2: zusätzliche Küchennutzung mittags in Zone 1
+_M_WEEKDAY_2 = _M_WEEKDAY[:1] + (
+    (0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165, 0.165, 0.165, 0.165, 0.165, 0.7004, 0.165, 0.165, 0.165, 0.165),
+) + _M_WEEKDAY[2:]
+_M_WEEKEND = (
+    (0, 0, 0, 0, 0, 0, 0, 0.06, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0, 0, 0.255, 0.255),
+    (0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165, 0.165, 0.165, 0.165, 0.165, 0.7004, 0.165, 0.165, 0.165, 0.165),
+    (0, 0, 0, 0, 0, 0, 0.03, 0, 0.005, 0, 0.005, 0, 0, 0, 0, 0, 0, 0.005, 0, 0, 0, 0, 0.03, 0),
+    (0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0.06),
+    (0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0.15, 0.15, 0.15, 0.15, 0, 0, 0, 0.06, 0),
+)
+# Abwesenheit: nur Grundlast (Kühlschrank) in Zone 1
+_M_ABSENT = ((0,) * 24, (0.165,) * 24, (0,) * 24, (0,) * 24, (0,) * 24)
+
+
+def _zones(value):
+    return (value,) * N_ZONES
+
+
+# (scenario, weekend) -> {"M"/"P"/"H": (weekday, weekend, holiday) je Zone}
+DAY_TEMPLATES = {
+    (1, 0): {
+        "M": (_M_WEEKDAY, _M_ABSENT, _M_ABSENT),
+        "P": (_zones(TEASER), _zones((0,) * 24), _zones((0,) * 24)),
+        "H": (_zones(TEASER), _zones((T_SET_BACK,) * 24), _zones((T_SET_BACK,) * 24)),
+    },
+    (1, 1): {
+        "M": (_M_WEEKDAY, _M_WEEKEND, _M_ABSENT),
+        "P": (_zones(TEASER), _zones(TEASER), _zones((0,) * 24)),
+        "H": (_zones(TEASER), _zones(TEASER), _zones((T_SET_BACK,) * 24)),
+    },
+    (2, 0): {
+        "M": (_M_WEEKDAY_2, _M_ABSENT, _M_ABSENT),
+        "P": (_zones(TEASER), _zones((0,) * 24), _zones((0,) * 24)),
+        "H": (_zones((T_SET_CONST,) * 24), _zones((T_SET_CONST,) * 24), _zones((T_SET_BACK,) * 24)),
+    },
+    (2, 1): {
+        "M": (_M_WEEKDAY_2, _M_WEEKEND, _M_ABSENT),
+        "P": (_zones(TEASER), _zones(TEASER), _zones((0,) * 24)),
+        "H": (_zones((T_SET_CONST,) * 24), _zones((T_SET_CONST,) * 24), _zones((T_SET_BACK,) * 24)),
+    },
+}
+
+
+@lru_cache(maxsize=None)
+def day_types(holidays, n_weeks=N_WEEKS):
+    # Mo-Fr Werktag, Sa/So Wochenende, Urlaubswochen komplett Urlaub
+    week = np.array([WEEKDAY] * 5 + [WEEKEND] * 2, dtype=np.int8)
+    types = np.tile(week, (n_weeks, 1))
+    weeks = [w for w in holidays if 0 <= w < n_weeks]
+    types[weeks] = HOLIDAY
+    types = types.ravel()
+    types.flags.writeable = False
+    return types
+
+
+def _templates(scenario, weekend):
+    try:
+        return DAY_TEMPLATES[(scenario, weekend)]
+    except KeyError:
+        raise ValueError(
+            "Scenario " + str(scenario) + " (weekend " + str(weekend) + ") nicht vorhanden.")
+
+
+@lru_cache(maxsize=None)
+def zone_profile(kind, scenario, weekend, holidays, zone, teaser_profile=None):
+    """Annual hourly profile of one zone as a read-only float array.
+
+    ``kind`` is "M" (machines), "P" (persons) or "H" (heating set point).
+    ``teaser_profile`` is the zone's 24 h TEASER profile (as tuple) and is
+    only used by day types that keep the TEASER default.
+    """
+    rows = []
+    for day_type in _templates(scenario, weekend)[kind]:
+        row = day_type[zone]
+        if row == TEASER:
+            if teaser_profile is None:
+                raise ValueError("Profile " + kind + " of zone " + str(zone) + " needs the TEASER profile")
+            row = teaser_profile
+        if len(row) != HOURS_PER_DAY:
+            raise ValueError("Day profiles must have " + str(HOURS_PER_DAY) + " values, got " + str(len(row)))
+        rows.append(row)
+    table = np.asarray(rows, dtype=np.float64)
+    profile = table[day_types(holidays)].ravel()
+    profile.flags.writeable = False
+    return profile
+
+
+def zone_profiles(scenario, weekend, holidays, zone, persons_profile, heating_profile):
+    holidays = tuple(sorted(set(holidays)))
+    return {
+        "machines_profile": zone_profile("M", scenario, weekend, holidays, zone),
+        "persons_profile": zone_profile("P", scenario, weekend, holidays, zone, tuple(persons_profile)),
+        "heating_profile": zone_profile("H", scenario, weekend, holidays, zone, tuple(heating_profile)),
+    }
+
+
+def teaser_day_profiles(building):
+    # 24 h Profile aus TEASER sichern, bevor sie durch Jahresprofile ersetzt werden
+    return tuple(
+        (tuple(zone.use_conditions.persons_profile), tuple(zone.use_conditions.heating_profile))
+        for zone in building.thermal_zones[:N_ZONES])
+
+
+def apply_schedules(building, scenario, weekend, holiday, day_profiles=None):
+    if day_profiles is None:
+        day_profiles = teaser_day_profiles(building)
+    # TEASER arbeitet intern mit Listen, daher erst hier die Kopie
+    for zone, thermal_zone in enumerate(building.thermal_zones[:N_ZONES]):
+        persons_profile, heating_profile = day_profiles[zone]
+        profiles = zone_profiles(
+            scenario, weekend, holiday, zone, persons_profile, heating_profile)
+        for attr, profile in profiles.items():
+            setattr(thermal_zone.use_conditions, attr, profile.tolist())
@@ -0,0 +1,236 @@
+"""Long-lived simulation sessions shared by all variants of a sweep.
+
+A ``SessionPool`` holds ``n_cpu`` simulator sessions that are started once
+and reused, so simulator start-up and loading of the AixLib library happen
+once per session instead of once per variant. Backends are pluggable: a
+backend factory returns an object with ``simulate(job)`` and ``close()``;
+``DymolaBackend`` drives Dymola through ebcpy, ``StubBackend`` is a local
+stand-in for tests and benchmarks. ``SessionDirs`` gives every session its
+own working directory, as Dymola writes its translation and result files
+(``dsin.txt``, ``dymosim``, ``dsres.mat``) there.
+
+A job is a dict with ``teaser_mo`` (package.mo of the exported variant),
+``building_mo`` (model to simulate), ``savepath`` and ``result_file_name``.
+Instead of ``result_file_name`` a job may carry ``runs``: a list of dicts
+with ``result_file_name`` and ``tables`` ({path in package: source file}).
+The model is then translated once and, before each run, only the table
+files it reads at simulation time are swapped; the result is a list.
+An optional ``simulation_setup`` overrides the session's setup for the job
+(e.g. one time window of a chunked annual run).
+"""
+import itertools
+import os
+import pathlib
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from incremental_export import replace_file
+from tracing import stage
+
+# Jahressimulation mit Stundenwerten
+SIMULATION_SETUP = {
+    "start_time": 0,
+    "stop_time": 3.1536e7,
+    "output_interval": 3600,
+}
+
+
+def install_tables(package_dir, tables):
+    # Ersetzen statt überschreiben: die Dateien können hart verlinkt sein
+    for target, source in tables.items():
+        replace_file(source, os.path.join(package_dir, target))
+
+
+def job_runs(job):
+    if "runs" in job:
+        return job["runs"]
+    return [{"result_file_name": job["result_file_name"], "tables": {}}]
+
+
+class DymolaBackend:
+
+    def __init__(
+            self,
+            aixlib_mo,
+            cd,
+            show_window=False,
+            dymola_path=None,
+            simulation_setup=None,
+    ):
+        from ebcpy import DymolaAPI
+
+        kwargs = {}
+        if dymola_path is not None:
+            kwargs["dymola_path"] = dymola_path
+        # AixLib wird nur einmal je Session geladen
+        self.dym_api = DymolaAPI(
+            model_name=None,
+            cd=cd,
+            n_cpu=1,
+            packages=[aixlib_mo],
+            show_window=show_window,
+            n_restart=-1,
+            equidistant_output=False,
+            get_structural_parameters=False,
+            **kwargs
+        )
+        self.simulation_setup = simulation_setup or SIMULATION_SETUP
+        self.dym_api.set_sim_setup(self.simulation_setup)
+
+    def simulate(self, job):
+        dymola = self.dym_api.dymola
+        package = pathlib.Path(job["teaser_mo"])
+        if not dymola.openModel(str(package), changeDirectory=False):
+            raise RuntimeError("Could not load " + str(package) + ": " + dymola.getLastErrorLog())
+        try:
+            self.dym_api.model_name = job["building_mo"]
+            # Einmal übersetzen, danach nur noch Tabellen tauschen und simulieren
+            with stage(job.get("trace"), "translate", job["building_mo"]):
+                self.dym_api.translate()
+            self.dym_api.set_sim_setup(job.get("simulation_setup") or self.simulation_setup)
+            results = []
+            for run in job_runs(job):
+                install_tables(package.parent, run["tables"])
+                results.append(self.dym_api.simulate(
+                    parameters=job.get("parameters"),
+                    return_option="savepath",
+                    savepath=job["savepath"],
+                    result_file_name=run["result_file_name"],
+                ))
+            return results if "runs" in job else results[0]
+        finally:
+            # Paket der Variante wieder entladen, AixLib bleibt geladen
+            dymola.ExecuteCommand('eraseClasses({"' + job["building_mo"].split(".")[0] + '"})')
+
+    def export_fmu(self, job, fmu_dir):
+        # Co-Simulation-FMU des Gebäudemodells; die Tabellen werden je Lauf als Dateien ersetzt
+        dymola = self.dym_api.dymola
+        package = pathlib.Path(job["teaser_mo"])
+        if not dymola.openModel(str(package), changeDirectory=False):
+            raise RuntimeError("Could not load " + str(package) + ": " + dymola.getLastErrorLog())
+        try:
+            os.makedirs(fmu_dir, exist_ok=True)
+            dymola.cd(str(fmu_dir))
+            fmu_name = "B" + job["model_key"][:16]
+            result = dymola.translateModelFMU(job["building_mo"], False, fmu_name, "2", "cs", False)
+            if not result:
+                raise RuntimeError("FMU export of " + job["building_mo"] + " failed: " + dymola.getLastErrorLog())
+            return os.path.join(fmu_dir, fmu_name + ".fmu")
+        finally:
+            dymola.ExecuteCommand('eraseClasses({"' + job["building_mo"].split(".")[0] + '"})')
+
+    def close(self):
+        self.dym_api.close()
+
+
+class StubBackend:
+    # Lokaler Ersatz für Dymola: schreibt ein kleines Ergebnis und merkt sich die Jobs.
+    # Für ``variables`` werden reproduzierbare Kurven erzeugt (T* in K, sonst Leistung in W)
+
+    def __init__(self, delay=0.0, simulation_setup=None, variables=()):
+        self.delay = delay
+        self.simulation_setup = dict(simulation_setup or SIMULATION_SETUP)
+        self.variables = tuple(variables)
+        self.jobs = []
+        self.closed = False
+
+    def _signals(self, time_axis, result_file_name):
+        rng = np.random.default_rng(zlib.crc32(result_file_name.encode("utf-8")))
+        # Kalter Winter am Jahresanfang/-ende, Tagesgang mit 24 h Periode
+        season = np.cos(2 * np.pi * time_axis / 3.1536e7)
+        day = np.sin(2 * np.pi * time_axis / 86400)
+        signals = {}
+        for name in self.variables:
+            noise = rng.normal(0, 0.1, len(time_axis))
+            if name.rsplit(".", 1)[-1].startswith("T"):
+                signals[name] = 293.15 - 1.5 * season + 0.5 * day + noise
+            else:
+                signals[name] = np.maximum(rng.uniform(500, 2000) * (season + 0.2 * day + noise), 0)
+        return signals
+
+    def simulate(self, job):
+        if self.closed:
+            raise RuntimeError("Session is closed")
+        self.jobs.append(job)
+        setup = job.get("simulation_setup") or self.simulation_setup
+        time_axis = np.arange(setup["start_time"], setup["stop_time"] + 1, setup["output_interval"])
+        os.makedirs(job["savepath"], exist_ok=True)
+        results = []
+        for run in job_runs(job):
+            if self.delay:
+                time.sleep(self.delay)
+            path = os.path.join(job["savepath"], run["result_file_name"] + ".npz")
+            np.savez(path, time=time_axis, **self._signals(time_axis, run["result_file_name"]))
+            results.append(path)
+        return results if "runs" in job else results[0]
+
+    def close(self):
+        self.closed = True
+
+
+class SessionDirs:
+    # Backend-Fabrik: jede neue Session arbeitet in <cd>/session_<i>, parallele Sessions
+    # überschreiben sich sonst gegenseitig die Übersetzungs- und Ergebnisdateien
+
+    def __init__(self, backend_factory, cd):
+        self.backend_factory = backend_factory
+        self.cd = os.fspath(cd)
+        self._index = itertools.count()
+
+    def __call__(self):
+        cd = os.path.join(self.cd, "session_" + str(next(self._index)))
+        os.makedirs(cd, exist_ok=True)
+        return self.backend_factory(cd=cd)
+
+
+class SessionPool:
+
+    def __init__(self, backend_factory, n_cpu=1):
+        if n_cpu < 1:
+            raise ValueError("n_cpu must be at least 1, got " + str(n_cpu))
+        self.backend_factory = backend_factory
+        self.n_cpu = n_cpu
+        self._idle = queue.Queue()
+        self._sessions = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _acquire(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("SessionPool is closed")
+            # Sessions erst bei Bedarf starten, höchstens n_cpu Stück
+            if self._idle.empty() and len(self._sessions) < self.n_cpu:
+                session = self.backend_factory()
+                self._sessions.append(session)
+                return session
+        return self._idle.get()
+
+    def simulate(self, job):
+        session = self._acquire()
+        try:
+            return session.simulate(job)
+        finally:
+            self._idle.put(session)
+
+    def simulate_batch(self, jobs):
+        with ThreadPoolExecutor(max_workers=self.n_cpu) as executor:
+            return list(executor.map(self.simulate, jobs))
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
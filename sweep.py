@@ -0,0 +1,120 @@
+"""Declarative parameter sweep over the building variants.
+
+A sweep spec maps every dimension to its values, given either as an
+explicit list, a single fixed value or a ``{"min", "max", "step"}`` range.
+Variants are decoded lazily from their index in the full-factorial grid
+(last dimension varies fastest, like the former nested loops), so a shard
+``i/N`` simply takes every N-th index starting at i without enumerating or
+coordinating with the other shards.
+"""
+
+# Reihenfolge der Dimensionen = Reihenfolge der früheren Schleifen
+DIMENSIONS = (
+    "leased_area",
+    "year_of_construction",
+    "number_of_floors",
+    "height_of_floors",
+    "with_ahu",
+    "residential_layout",
+    "internal_gains",
+    "with_heating",
+    "construction",
+    "retrofit",
+)
+
+
+def value_range(min, max, step):
+    if step <= 0:
+        raise ValueError("step must be positive, got " + str(step))
+    if max < min:
+        raise ValueError("max (" + str(max) + ") is smaller than min (" + str(min) + ")")
+    # Kleine Toleranz gegen Rundungsfehler bei Gleitkomma-Schritten
+    n = int((max - min) / step + 1e-9) + 1
+    values = [min + i * step for i in range(n)]
+    if isinstance(min, float) or isinstance(step, float):
+        values = [round(value, 10) for value in values]
+    return values
+
+
+def _values(name, spec):
+    if isinstance(spec, dict):
+        try:
+            return tuple(value_range(spec["min"], spec["max"], spec["step"]))
+        except KeyError as err:
+            raise ValueError("Range of '" + name + "' needs min, max and step, missing " + str(err))
+    if isinstance(spec, (list, tuple)):
+        if not spec:
+            raise ValueError("Dimension '" + name + "' has no values")
+        return tuple(spec)
+    return (spec,)
+
+
+class SweepSpec:
+
+    def __init__(self, spec, order=DIMENSIONS):
+        unknown = set(spec) - set(order)
+        if unknown:
+            raise ValueError("Unknown sweep dimensions: " + ", ".join(sorted(unknown)))
+        missing = [name for name in order if name not in spec]
+        if missing:
+            raise ValueError("Missing sweep dimensions: " + ", ".join(missing))
+        self.names = tuple(order)
+        self.values = tuple(_values(name, spec[name]) for name in self.names)
+
+    def __len__(self):
+        size = 1
+        for values in self.values:
+            size *= len(values)
+        return size
+
+    def variant(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError("Variant index " + str(index) + " out of range")
+        variant = {}
+        for name, values in zip(reversed(self.names), reversed(self.values)):
+            index, position = divmod(index, len(values))
+            variant[name] = values[position]
+        return {name: variant[name] for name in self.names}
+
+    def index(self, variant):
+        # Umkehrung von variant(): Position je Dimension, gemischtes Stellenwertsystem
+        index = 0
+        for name, values in zip(self.names, self.values):
+            try:
+                position = values.index(variant[name])
+            except ValueError:
+                raise ValueError("Value " + repr(variant[name]) + " of '" + name + "' is not in the sweep")
+            index = index * len(values) + position
+        return index
+
+    def indices(self, shard=None):
+        if shard is None:
+            return range(len(self))
+        shard_index, n_shards = shard
+        return range(shard_index, len(self), n_shards)
+
+    def iter_variants(self, shard=None):
+        for index in self.indices(shard):
+            yield index, self.variant(index)
+
+
+def building_parameters(variant):
+    # Parameter für add_building; die Sanierung wird erst auf das berechnete Gebäude angewendet
+    return {name: value for name, value in variant.items() if name != "retrofit"}
+
+
+def parse_shard(text):
+    # "i/N" mit 0 <= i < N
+    try:
+        shard_index, n_shards = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise ValueError("Shard must look like 'i/N', got '" + str(text) + "'")
+    if n_shards < 1 or not 0 <= shard_index < n_shards:
+        raise ValueError("Shard index must satisfy 0 <= i < N, got '" + str(text) + "'")
+    return shard_index, n_shards
+
+
+def iter_variants(spec, shard=None):
+    if not isinstance(spec, SweepSpec):
+        spec = SweepSpec(spec)
+    return spec.iter_variants(shard=shard)
@@ -0,0 +1,162 @@
+"""TEASER model generation for one sweep variant.
+
+Each variant gets its own short-lived Project holding exactly one building,
+so calculation and export cost do not grow with the number of variants
+already processed. The TEASER data base (``DataClass``) of each method is
+loaded once per process and shared by all projects; ``add_residential``
+keeps it as long as its statistic matches the method.
+TEASER itself is imported on first use, so importing this module is cheap
+for processes that never build a model.
+"""
+import os
+import shutil
+from contextlib import contextmanager
+from functools import lru_cache, partial
+
+from incremental_export import StagingDir, content_digest, replace_file
+
+WEATHER_FILE = "DEU_BW_Mannheim_107290_TRY2010_12_Jahr_BBSR.mos"
+
+# Maschinen-Grundlast je Zone: 1000 W / (Anteil * Wohnfläche)
+MACHINES_SHARE = (0.25, 0.20, 0.15, 0.20, 0.20)
+
+
+def weather_file_path():
+    import teaser.logic.utilities as utilities
+
+    return utilities.get_full_path(
+        os.path.join(
+            "data",
+            "input",
+            "inputdata",
+            "weatherdata",
+            WEATHER_FILE))
+
+
+@lru_cache(maxsize=None)
+def project_data(method):
+    # Eine Datenbasis je Verfahren (tabula_de, iwu, ...); TEASER lädt sie sonst bei jedem
+    # add_residential neu, wenn die Statistik des Projekts nicht zum Verfahren passt
+    from teaser.data.dataclass import DataClass
+
+    return DataClass(used_statistic=method)
+
+
+def new_project(name, method="iwu"):
+    from teaser.project import Project
+
+    prj = Project(load_data=False)
+    prj.data = project_data(method)
+    prj.name = name
+    prj.used_library_calc = 'AixLib'
+    prj.number_of_elements_calc = 2
+    prj.weather_file_path = weather_file_path()
+    return prj
+
+
+@contextmanager
+def variant_project(name, method="iwu"):
+    prj = new_project(name, method)
+    try:
+        yield prj
+    finally:
+        # Gebäude und Profile der Variante freigeben
+        prj.buildings.clear()
+
+
+def add_building(
+        prj,
+        name,
+        method,
+        usage,
+        year_of_construction,
+        number_of_floors,
+        height_of_floors,
+        leased_area,
+        with_ahu,
+        residential_layout,
+        internal_gains,
+        with_heating,
+        construction,
+        archetypes=None,
+):
+    # Mit ArchetypeCache: skalierte Kopie einer gespeicherten Archetyp-Vorlage
+    add_residential = prj.add_residential if archetypes is None else partial(archetypes.add_residential, prj)
+    building = add_residential(
+        method=method,
+        usage=usage,
+        name=name,
+        year_of_construction=year_of_construction,
+        number_of_floors=number_of_floors,
+        height_of_floors=height_of_floors,
+        net_leased_area=leased_area,
+        with_ahu=with_ahu,
+        residential_layout=residential_layout,
+        internal_gains_mode=internal_gains,
+        construction_type=construction
+    )
+
+    for zone, share in zip(building.thermal_zones, MACHINES_SHARE):
+        zone.use_conditions.machines = 1000 / (share * leased_area)
+
+    for zone in building.thermal_zones[:4]:
+        zone.use_conditions.with_heating = with_heating
+    return building
+
+
+def calc_building(prj, building):
+    # Nur das neue Gebäude berechnen, nicht das ganze Projekt
+    building.calc_building_parameter(
+        number_of_elements=prj.number_of_elements_calc,
+        merge_windows=prj.merge_windows_calc,
+        used_library=prj.used_library_calc)
+
+
+def export_building(prj, building, path=None, object_store=None):
+    import teaser.logic.utilities as utilities
+
+    # TEASER legt das Paket unter <path>/<prj.name> ab
+    path = path or utilities.get_default_path()
+    package_dir = os.path.join(path, prj.name)
+    if object_store is None:
+        prj.export_aixlib(internal_id=building.internal_id, path=path)
+        return package_dir
+    # Erst in ein Staging-Verzeichnis, dann nur geänderte Dateien übernehmen
+    with StagingDir(package_dir, object_store, subdir=prj.name) as staging:
+        prj.export_aixlib(internal_id=building.internal_id, path=staging)
+    return package_dir
+
+
+def _replace_changed(source, target):
+    if os.path.isfile(target) and content_digest(target) == content_digest(source):
+        return
+    replace_file(source, target)
+
+
+def reuse_package(model_dir, package, path=None):
+    # Zwischengespeichertes Paket statt eines neuen TEASER-Exports an den Exportort legen.
+    # Dateien werden nur ersetzt (harte Links in den Cache bleiben unverändert) und
+    # nichts wird entfernt, damit Tabellen anderer Nutzungsprofile erhalten bleiben
+    import teaser.logic.utilities as utilities
+
+    path = path or utilities.get_default_path()
+    package_dir = os.path.join(path, package)
+    shutil.copytree(model_dir, package_dir, dirs_exist_ok=True, copy_function=_replace_changed)
+    return package_dir
+
+
+def model_name(prj, building):
+    return prj.name + "." + building.name + "." + building.name
+
+
+def write_schedule_tables(building, path, object_store=None):
+    # Nur die Tabellen-Dateien schreiben, die das übersetzte Modell zur
+    # Simulationszeit liest (Sollwerte und interne Lasten)
+    with StagingDir(path, object_store) as staging:
+        building.library_attr.modelica_set_temp(path=staging)
+        building.library_attr.modelica_gains_boundary(path=staging)
+        tables = os.listdir(staging)
+    return {
+        os.path.join(building.name, table): os.path.join(path, table)
+        for table in tables
+    }
@@ -0,0 +1,88 @@
+"""Archetype cache against TEASER's add_residential."""
+from functools import partial
+from types import SimpleNamespace
+
+import pytest
+
+from archetypes import ArchetypeCache, check_archetype, compare_parameters, scale_building
+from retrofit import RETROFIT_SETTINGS, retrofit_variant
+from teaser_models import calc_building, new_project
+
+PARAMETERS = {
+    "method": "tabula_de",
+    "usage": "multi_family_house",
+    "year_of_construction": 1970,
+    "number_of_floors": 1,
+    "height_of_floors": 3.0,
+    "net_leased_area": 75,
+    "with_ahu": False,
+    "residential_layout": 0,
+    "internal_gains_mode": 1,
+    "construction_type": "tabula_standard",
+}
+
+
+class Building(SimpleNamespace):
+    # Gebäude mit den Summen, die TEASER aus Zonen und Bauteilen bildet
+
+    def fill_outer_area_dict(self):
+        self.outer_area = {}
+        for zone in self.thermal_zones:
+            for element in zone.outer_walls:
+                self.outer_area[element.orientation] = self.outer_area.get(element.orientation, 0.0) + element.area
+
+    def fill_window_area_dict(self):
+        self.window_area = {}
+        for zone in self.thermal_zones:
+            for element in zone.windows:
+                self.window_area[element.orientation] = self.window_area.get(element.orientation, 0.0) + element.area
+
+
+def test_scale_building():
+    zones = [
+        SimpleNamespace(
+            area=area, volume=area * 3.0,
+            outer_walls=[SimpleNamespace(orientation=0.0, area=area * 0.4),
+                         SimpleNamespace(orientation=90.0, area=area * 0.2)],
+            windows=[SimpleNamespace(orientation=0.0, area=area * 0.1)],
+            floors=None)
+        for area in (60.0, 40.0)]
+    building = Building(thermal_zones=zones, net_leased_area=100.0, volume=300.0)
+    assert scale_building(building, 1.5) is building
+    assert [zone.area for zone in zones] == pytest.approx([90.0, 60.0])
+    assert building.net_leased_area == pytest.approx(150.0)
+    assert building.volume == pytest.approx(450.0)
+    assert building.outer_area == pytest.approx({0.0: 60.0, 90.0: 30.0})
+    assert building.window_area == pytest.approx({0.0: 15.0})
+
+
+def test_compare_parameters():
+    fresh = {"volume": 300.0, "r1_iw": 0.001, "only_fresh": 1.0}
+    cached = {"volume": 300.0 * (1 + 1e-9), "r1_iw": 0.002, "only_cached": 2.0}
+    assert compare_parameters(fresh, cached) == {
+        "r1_iw": (0.001, 0.002), "only_fresh": (1.0, None), "only_cached": (None, 2.0)}
+    assert compare_parameters(fresh, dict(fresh)) == {}
+
+
+@pytest.mark.parametrize("net_leased_area", [75, 240])
+def test_check_archetype(tmp_path, net_leased_area):
+    pytest.importorskip("teaser")
+    cache = ArchetypeCache(str(tmp_path))
+    parameters = dict(PARAMETERS, net_leased_area=net_leased_area)
+    differences = check_archetype(
+        cache, partial(new_project, method="tabula_de"), calc_building, name="Check", **parameters)
+    assert differences == {}
+
+
+def test_retrofit_of_cached_archetype(tmp_path):
+    pytest.importorskip("teaser")
+    cache = ArchetypeCache(str(tmp_path))
+    # Erst aus add_residential aufgebaut, dann aus der gespeicherten Vorlage
+    for name in ("Built", "Loaded"):
+        # Projekt ohne Verfahren: IWU-Datenbasis ohne TABULA-Sanierungsbauteile
+        prj = new_project(name)
+        building = cache.add_residential(prj, name=name, **PARAMETERS)
+        calc_building(prj, building)
+        assert prj.data.used_statistic == "tabula_de"
+        retrofitted = retrofit_variant(building, type_of_retrofit="adv_retrofit", project=prj, **RETROFIT_SETTINGS)
+        assert 0 < retrofitted.sum_heat_load < building.sum_heat_load
@@ -0,0 +1,85 @@
+"""Sampling and adaptive refinement of the sweep."""
+import numpy as np
+import pytest
+
+import Residential_urlaub_ebcpy_test as study
+from doe import grid_indices, latin_hypercube, positions, refine_indices, sample_indices, variant_responses
+from sweep import SweepSpec
+
+GRID = {
+    "leased_area": [50, 75, 100, 125],
+    "year_of_construction": [1900, 1925, 1950, 1962, 1970, 1980, 1992, 2000, 2003],
+    "number_of_floors": 1,
+    "height_of_floors": 3.0,
+    "with_ahu": False,
+    "residential_layout": 0,
+    "internal_gains": 1,
+    "with_heating": True,
+    "construction": ["tabula_standard", "tabula_retrofit"],
+    "retrofit": "none",
+}
+# Nur das Baujahr variiert: Variantenindex = Position des Baujahrs
+LINE = dict(GRID, leased_area=75, construction="tabula_standard")
+
+
+def test_latin_hypercube_is_stratified():
+    samples = latin_hypercube(16, 3, seed=1)
+    assert samples.shape == (16, 3)
+    assert ((samples >= 0) & (samples < 1)).all()
+    # Je Dimension genau eine Stichprobe in jeder der 16 Schichten
+    for column in samples.T:
+        assert sorted(np.floor(column * 16).astype(int)) == list(range(16))
+
+
+def test_sample_indices_cover_the_grid():
+    spec = SweepSpec(GRID)
+    indices = sample_indices(spec, 18, method="lhs", seed=3)
+    assert indices == sorted(set(indices)) and 0 <= indices[0] and indices[-1] < len(spec)
+    assert indices == sample_indices(spec, 18, method="lhs", seed=3)
+    # 18 Stichproben auf 9 Baujahre und 2 Bautypen: jeder Wert kommt vor
+    variants = [spec.variant(index) for index in indices]
+    assert {variant["year_of_construction"] for variant in variants} == set(GRID["year_of_construction"])
+    assert {variant["construction"] for variant in variants} == set(GRID["construction"])
+    assert len(sample_indices(spec, 10 * len(spec), seed=3)) <= len(spec)
+    with pytest.raises(ValueError):
+        sample_indices(spec, 4, method="grid")
+
+
+def test_positions_round_trip():
+    spec = SweepSpec(GRID)
+    indices = np.arange(len(spec))
+    assert (grid_indices(spec, positions(spec, indices)) == indices).all()
+    assert spec.index(spec.variant(int(indices[-1]))) == len(spec) - 1
+
+
+def test_refine_indices_between_steep_neighbours():
+    spec = SweepSpec(LINE)
+    # Sprung des Bedarfs zwischen den Baujahren 1970 (Index 4) und 2003 (Index 8)
+    responses = {0: 100.0, 4: 100.0, 8: 40.0}
+    assert refine_indices(spec, responses, 1) == [6]
+    assert refine_indices(spec, responses, 2) == [6, 2]
+    assert refine_indices(spec, {**responses, 6: 90.0}, 1) == [7]
+    assert refine_indices(spec, {0: 1.0}, 3) == []
+
+
+def test_variant_responses_average_schedules():
+    pd = pytest.importorskip("pandas")
+    spec = SweepSpec(LINE)
+    rows = [dict(spec.variant(index), heating_kWh=value) for index, value in ((0, 10.0), (0, 20.0), (3, 5.0))]
+    # Lauf einer früheren Studie mit einem Baujahr außerhalb des Parameterraums
+    rows.append(dict(spec.variant(1), year_of_construction=1850, heating_kWh=1.0))
+    assert variant_responses(spec, pd.DataFrame(rows)) == {0: 15.0, 3: 5.0}
+    assert variant_responses(spec, pd.DataFrame()) == {}
+
+
+def test_refinement_rejects_shards(capsys):
+    with pytest.raises(SystemExit):
+        study.main(["--backend", "stub", "--sampling", "lhs", "--refine-rounds", "1", "--shard", "0/2"])
+    assert "--shard" in capsys.readouterr().err
+
+
+def test_sobol_needs_scipy(monkeypatch, capsys):
+    monkeypatch.setattr(study, "qmc_available", lambda: False)
+    with pytest.raises(SystemExit):
+        study.main(["--backend", "stub", "--sampling", "sobol"])
+    assert "scipy" in capsys.readouterr().err
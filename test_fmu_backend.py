@@ -0,0 +1,101 @@
+"""FMU backend with a stand-in for ebcpy's FMU_API."""
+import os
+import sys
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import fmu_backend
+
+TABLE = os.path.join("B", "InternalGains_B.txt")
+
+
+class FakeFMU:
+    # Entpackt die "FMU" (Verzeichnis neben model.fmu) in sein Arbeitsverzeichnis und liest
+    # beim Simulieren die Tabelle, die beim Export aufgelöst wurde: die Kopie in den
+    # Ressourcen oder, ohne Ressourcen, den absoluten Pfad compiled_table
+    instances = []
+    compiled_table = None
+
+    def __init__(self, model_name, cd, n_cpu):
+        self.cd = cd
+        self._unzip_dir = os.path.join(cd, "model_extracted")
+        self.table = self.compiled_table
+        if os.path.isfile(os.path.join(model_name[:-4], "resources", "InternalGains_B.txt")):
+            self.table = os.path.join(self._unzip_dir, "resources", "InternalGains_B.txt")
+            write(self.table, "0")
+        self.instances.append(self)
+
+    def set_sim_setup(self, setup):
+        self.setup = setup
+
+    def simulate(self, return_option):
+        import pandas as pd
+
+        with open(self.table) as file:
+            value = float(file.read())
+        time_axis = np.arange(self.setup["start_time"], self.setup["stop_time"] + 1, self.setup["output_interval"])
+        return pd.DataFrame({"gains": value}, index=time_axis)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_fmu(monkeypatch):
+    pytest.importorskip("pandas")
+    monkeypatch.setitem(sys.modules, "ebcpy", SimpleNamespace(FMU_API=FakeFMU))
+    monkeypatch.setattr(fmu_backend, "_loaded", OrderedDict())
+    monkeypatch.setattr(FakeFMU, "instances", [])
+    return FakeFMU
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        file.write(text)
+
+
+def runs(tmp_path, values):
+    result = []
+    for value in values:
+        source = str(tmp_path / "tables" / str(value) / TABLE)
+        write(source, str(value))
+        result.append({"result_file_name": "run" + str(value), "tables": {TABLE: source}})
+    return result
+
+
+@pytest.mark.parametrize("resources", [True, False])
+def test_fmu_runs_swap_table_files(tmp_path, fake_fmu, monkeypatch, resources):
+    fmu_file = str(tmp_path / "fmus" / "ab12" / "model.fmu")
+    package_dir = str(tmp_path / "package")
+    write(os.path.join(package_dir, TABLE), "0")
+    if resources:
+        # Dymola hat die Tabelle in die FMU kopiert
+        write(str(tmp_path / "fmus" / "ab12" / "model" / "resources" / "InternalGains_B.txt"), "0")
+    else:
+        # Dymola hat den absoluten Pfad der Tabelle im Paket eingesetzt
+        monkeypatch.setattr(fake_fmu, "compiled_table", os.path.join(package_dir, TABLE))
+    setup = {"start_time": 0, "stop_time": 7200, "output_interval": 3600}
+    paths = fmu_backend.simulate_runs(
+        fmu_file, str(tmp_path / "cd"), ["gains"], setup, runs(tmp_path, [1.5, 2.5]), str(tmp_path / "results"),
+        package_dir)
+    assert [float(np.load(path)["gains"][0]) for path in paths] == [1.5, 2.5]
+    np.testing.assert_array_equal(np.load(paths[0])["time"], [0, 3600, 7200])
+    fmu, = fake_fmu.instances
+    # Entpackt je Worker-Prozess und FMU
+    assert fmu.cd == str(tmp_path / "cd" / ("fmu_worker_" + str(os.getpid())) / "ab12")
+    with open(os.path.join(package_dir, TABLE)) as file:
+        assert file.read() == ("0" if resources else "2.5")
+
+
+def test_fmu_instances_are_reused(tmp_path, fake_fmu):
+    setup = {"start_time": 0, "stop_time": 3600, "output_interval": 3600}
+    for key in ("aa", "bb", "aa"):
+        write(str(tmp_path / "fmus" / key / "model" / "resources" / "InternalGains_B.txt"), "0")
+        fmu_backend.simulate_runs(
+            str(tmp_path / "fmus" / key / "model.fmu"), str(tmp_path / "cd"), ["gains"], setup,
+            runs(tmp_path, [1.0]), str(tmp_path / "results"), str(tmp_path / "package"))
+    assert [os.path.basename(fmu.cd) for fmu in fake_fmu.instances] == ["aa", "bb"]
@@ -0,0 +1,41 @@
+"""Incremental export with sync_tree and the object store."""
+import os
+
+from incremental_export import ObjectStore, sync_tree
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        file.write(text)
+
+
+def read(path):
+    with open(path) as file:
+        return file.read()
+
+
+def test_sync_tree_writes_only_changes(tmp_path):
+    staging, target = tmp_path / "staging", tmp_path / "target"
+    write(str(staging / "package.mo"), "package A")
+    write(str(staging / "B" / "record.mo"), "record")
+    write(str(target / "B" / "stale.mo"), "stale")
+    assert sync_tree(str(staging), str(target)) == {"written": 2, "unchanged": 0, "removed": 1}
+    assert not (target / "B" / "stale.mo").exists()
+
+    write(str(staging / "package.mo"), "package A")
+    write(str(staging / "B" / "record.mo"), "record changed")
+    assert sync_tree(str(staging), str(target)) == {"written": 1, "unchanged": 1, "removed": 0}
+    assert read(str(target / "B" / "record.mo")) == "record changed"
+
+
+def test_sync_tree_object_store_shares_files(tmp_path):
+    store = ObjectStore(str(tmp_path / "objects"))
+    for package in ("A", "B"):
+        staging = tmp_path / ("staging" + package)
+        write(str(staging / "table.txt"), "same table")
+        sync_tree(str(staging), str(tmp_path / package), store)
+    first, second = tmp_path / "A" / "table.txt", tmp_path / "B" / "table.txt"
+    assert read(str(first)) == read(str(second)) == "same table"
+    # Gleicher Inhalt: eine Datei im Objektspeicher, in beide Pakete verlinkt
+    assert os.path.samefile(str(first), str(second))
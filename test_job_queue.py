@@ -0,0 +1,70 @@
+"""JobQueue retries, leases and lazy claiming."""
+import time
+
+import Residential_urlaub_ebcpy_test as study
+from job_queue import JobQueue, LeaseKeeper, iter_claims
+from pipeline import run_pipeline
+
+
+def test_job_queue_retries_with_backoff(tmp_path):
+    with JobQueue(str(tmp_path / "queue.db"), max_attempts=2, backoff=0.2) as job_queue:
+        assert job_queue.publish([("a", {"n": 1}), ("b", {"n": 2})]) == 2
+        assert job_queue.publish([("a", {"n": 1})]) == 0
+        (job_id, payload), = job_queue.claim("w1")
+        assert payload == {"n": 1}
+        assert job_queue.fail(job_id, "error 1")
+        # Backoff: erst nach 0.2 s wieder vergeben, bis dahin nur der zweite Job
+        assert [payload for _, payload in job_queue.claim("w1", 5)] == [{"n": 2}]
+        assert job_queue.claim("w1") == []
+        time.sleep(0.25)
+        (retry_id, payload), = job_queue.claim("w2")
+        assert retry_id == job_id
+        assert not job_queue.fail(retry_id, "error 2")
+        assert job_queue.counts()["failed"] == 1
+        assert job_queue.failures() == [("a", 2, "error 2")]
+
+
+def test_job_queue_lease_expires_and_is_renewed(tmp_path):
+    with JobQueue(str(tmp_path / "queue.db"), lease=0.3, max_attempts=3, shared=True) as job_queue:
+        job_queue.publish([("a", {}), ("b", {})])
+        (first, _), (second, _) = job_queue.claim("dead", 2)
+        with LeaseKeeper(job_queue, "dead", interval=0.05) as leases:
+            leases.add(second)
+            time.sleep(0.5)
+            # Nur der verlängerte Job bleibt beim Worker, der andere wird neu vergeben
+            assert [job_id for job_id, _ in job_queue.claim("other", 5)] == [first]
+        assert not job_queue.heartbeat(first, "dead")
+        assert job_queue.heartbeat(first, "other")
+
+
+def test_iter_claims_feeds_pipeline(tmp_path):
+    with JobQueue(str(tmp_path / "queue.db")) as job_queue:
+        job_queue.publish([(str(index), {"n": index}) for index in range(5)])
+        result = run_pipeline(
+            (dict(payload, job_id=job_id) for job_id, payload in iter_claims(job_queue, "w")),
+            lambda task: task, lambda job: job["n"],
+            n_generate=0, on_result=lambda task, value: job_queue.complete(task["job_id"]))
+        assert result["done"] == 5
+        assert job_queue.counts()["done"] == 5
+        assert job_queue.next_ready() is None
+
+
+def test_worker_rejects_jobs_of_other_settings(tmp_path):
+    published = study.job_settings("stub")
+    with JobQueue(str(tmp_path / "queue.db"), max_attempts=1) as job_queue:
+        job_queue.publish([
+            ("stub", {"variant": {"n": 1}, "settings": published}),
+            ("old", {"variant": {"n": 2}}),
+        ])
+        summary = study.work_queue(
+            job_queue, "w", lambda task: task, lambda job: job["variant"]["n"], settings=study.job_settings("rc"),
+            n_generate=0)
+        assert summary["done"] == 0
+        assert [(task["variant"], step) for task, step, error in summary["failed"]] == [
+            ({"n": 1}, "settings"), ({"n": 2}, "settings")]
+        assert job_queue.counts()["failed"] == 2
+
+        job_queue.publish([("stub again", {"variant": {"n": 3}, "settings": published})])
+        summary = study.work_queue(
+            job_queue, "w", lambda task: task, lambda job: job["variant"]["n"], settings=published, n_generate=0)
+        assert summary == {"done": 1, "failed": []}
@@ -0,0 +1,44 @@
+"""KPIs of stub results."""
+import os
+from functools import partial
+
+import numpy as np
+import pytest
+
+from kpis import HEATER, run_kpis
+from result_store import DEFAULT_VARIABLES, load_variables
+from simulators import SessionPool, StubBackend
+from time_chunks import DAY
+
+# Eine Woche mit Stundenwerten statt eines Jahres
+WEEK = {"start_time": 0, "stop_time": 7 * DAY, "output_interval": 3600}
+
+
+def stub_pool(n_cpu=2, **kwargs):
+    return SessionPool(partial(StubBackend, variables=DEFAULT_VARIABLES, simulation_setup=WEEK, **kwargs), n_cpu)
+
+
+def stub_job(savepath, name, setup=WEEK):
+    return {"savepath": os.fspath(savepath), "result_file_name": name, "simulation_setup": setup}
+
+
+def test_run_kpis_from_stub_results(tmp_path):
+    pd = pytest.importorskip("pandas")
+    with stub_pool() as pool:
+        paths = pool.simulate_batch([stub_job(tmp_path, name) for name in ("a", "b")])
+    frames = []
+    expected = []
+    for name, path in zip(("a", "b"), paths):
+        time_axis, values = load_variables(path, DEFAULT_VARIABLES)
+        frame = pd.DataFrame(values, columns=list(DEFAULT_VARIABLES))
+        frame.insert(0, "time", time_axis)
+        frame.insert(0, "key", name)
+        frames.append(frame)
+        heat = frame[HEATER].to_numpy().sum(axis=1)
+        expected.append(np.sum(0.5 * (heat[1:] + heat[:-1]) * np.diff(time_axis)) / 3.6e6)
+    summary = run_kpis(pd.concat(frames, ignore_index=True))
+    assert list(summary["key"]) == ["a", "b"]
+    np.testing.assert_allclose(summary["heating_kWh"], expected)
+    np.testing.assert_allclose(
+        summary["heating_kWh"], summary[["heating_kWh_z" + str(zone + 1) for zone in range(5)]].sum(axis=1))
+    assert (summary["peak_W"] > 0).all()
@@ -0,0 +1,66 @@
+"""Pipeline overlapping generation and simulation."""
+import os
+
+import pytest
+
+from pipeline import run_pipeline
+
+
+def square(variant):
+    if variant == 3:
+        raise ValueError("generate " + str(variant))
+    return variant * variant
+
+
+def crash(variant):
+    if variant == 2:
+        # Wie ein vom Betriebssystem beendeter Worker-Prozess
+        os._exit(1)
+    return variant
+
+
+@pytest.mark.parametrize("n_generate", [0, 2])
+def test_pipeline_reports_failures_per_stage(n_generate):
+    results = {}
+
+    def simulate(job):
+        if job == 16:
+            raise RuntimeError("simulate")
+        return job + 1
+
+    def on_result(variant, result):
+        if variant == 5:
+            raise RuntimeError("on_result")
+        results[variant] = result
+
+    summary = run_pipeline(range(8), square, simulate, n_generate=n_generate, n_simulate=2, on_result=on_result)
+    assert summary["done"] == 5
+    assert sorted((variant, step) for variant, step, error in summary["failed"]) == [
+        (3, "generate"), (4, "simulate"), (5, "on_result")]
+    assert results == {variant: variant * variant + 1 for variant in (0, 1, 2, 6, 7)}
+
+
+def test_pipeline_on_result_errors_do_not_block():
+    # Mehr fehlschlagende Rückrufe als Plätze in der Queue: Simulation muss weiterlaufen
+    def on_result(variant, result):
+        raise RuntimeError("on_result")
+
+    summary = run_pipeline(
+        range(20), lambda variant: variant, lambda job: job, n_generate=0, max_queued=1, on_result=on_result)
+    assert summary["done"] == 0
+    assert len(summary["failed"]) == 20
+
+
+def test_pipeline_rejects_no_simulation_workers():
+    with pytest.raises(ValueError):
+        run_pipeline([], square, square, n_simulate=0)
+
+
+@pytest.mark.parametrize("max_in_flight", [1, 3])
+def test_pipeline_survives_crashed_generator(max_in_flight):
+    summary = run_pipeline(range(8), crash, lambda job: job, n_generate=2, max_in_flight=max_in_flight)
+    failed = sorted(variant for variant, step, error in summary["failed"])
+    assert all(step == "generate" and "BrokenProcessPool" in error for variant, step, error in summary["failed"])
+    # Nur die Varianten, die gerade im abgestürzten Pool waren, gehen verloren
+    assert 2 in failed and len(failed) <= max_in_flight
+    assert summary["done"] + len(failed) == 8
@@ -0,0 +1,56 @@
+"""RC screening model against analytical responses."""
+import numpy as np
+
+from rc_backend import simulate_rc
+
+HOURS = 48
+C_AIR = 5e6  # J/K
+H = 200.0  # W/K
+
+
+def columns(gains, heat_load, t_set):
+    # Nur der Luftknoten: Wände ohne Kopplung an die Luft
+    scalars = {
+        "c_air": C_AIR, "h_vent": H, "h_win": 0.0, "solar_aperture": 0.0,
+        "c_ow": 1e6, "h_ow_in": 0.0, "h_ow_out": 10.0, "c_iw": 1e6, "h_iw": 0.0,
+        "q_persons": 0.0, "q_lighting": 0.0, "q_machines": gains, "heat_load": heat_load,
+        "with_heating": 1.0 if heat_load else 0.0,
+    }
+    result = {name: np.array([value]) for name, value in scalars.items()}
+    result.update({name: np.zeros((HOURS, 1)) for name in ("persons", "lighting")})
+    result["machines"] = np.ones((HOURS, 1))
+    result["t_set"] = np.full((HOURS, 1), t_set)
+    return result
+
+
+def weather(t_out):
+    return {"dry_bulb": np.full(HOURS, t_out - 273.15), "global_horizontal": np.zeros(HOURS)}
+
+
+def test_free_floating_step_response():
+    # Sprung der Außentemperatur von 20 °C auf 0 °C bei 1 kW inneren Lasten
+    t_air, q_heat = simulate_rc(columns(1000.0, 0.0, 0.0), weather(273.15), substeps=60, t_start=293.15)
+    t_end = 273.15 + 1000.0 / H
+    hours = np.arange(1, HOURS + 1) * 3600.0
+    exact = t_end + (293.15 - t_end) * np.exp(-hours * H / C_AIR)
+    np.testing.assert_allclose(t_air[:, 0], exact, atol=0.05)
+    # Implizites Euler-Verfahren exakt: geometrische Folge je Teilschritt
+    dt = 3600.0 / 60
+    factor = (C_AIR / dt / (C_AIR / dt + H)) ** (60 * np.arange(1, HOURS + 1))
+    np.testing.assert_allclose(t_air[:, 0], t_end + (293.15 - t_end) * factor, rtol=1e-12)
+    assert not q_heat.any()
+
+
+def test_heater_holds_setpoint():
+    t_set = 293.15
+    t_air, q_heat = simulate_rc(columns(500.0, 1e4, t_set), weather(263.15), substeps=4, t_start=t_set)
+    np.testing.assert_allclose(t_air[:, 0], t_set)
+    # Stationär: Heizleistung = Verluste - innere Lasten
+    np.testing.assert_allclose(q_heat[:, 0], H * (t_set - 263.15) - 500.0)
+
+
+def test_heater_limited_by_heat_load():
+    t_air, q_heat = simulate_rc(columns(0.0, 1000.0, 293.15), weather(263.15), substeps=4, t_start=283.15)
+    np.testing.assert_allclose(q_heat[:, 0], 1000.0)
+    assert t_air[-1, 0] < 293.15
+    np.testing.assert_allclose(t_air[-1, 0], 263.15 + 1000.0 / H, atol=0.5)
@@ -0,0 +1,81 @@
+"""ResultCache resume after an interrupted sweep."""
+import os
+from functools import partial
+
+from pipeline import run_pipeline
+from result_cache import ResultCache, file_digest
+from result_store import DEFAULT_VARIABLES
+from simulators import SessionPool, StubBackend
+from time_chunks import DAY
+
+# Eine Woche mit Stundenwerten statt eines Jahres
+WEEK = {"start_time": 0, "stop_time": 7 * DAY, "output_interval": 3600}
+
+
+def stub_pool(n_cpu=2, **kwargs):
+    return SessionPool(partial(StubBackend, variables=DEFAULT_VARIABLES, simulation_setup=WEEK, **kwargs), n_cpu)
+
+
+def stub_job(savepath, name, setup=WEEK):
+    return {"savepath": os.fspath(savepath), "result_file_name": name, "simulation_setup": setup}
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        file.write(text)
+
+
+def read(path):
+    with open(path) as file:
+        return file.read()
+
+
+def test_result_cache_resume(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    keys = ["%064x" % index for index in range(6)]
+    simulated = []
+    # Erster Durchgang: vierte Simulation bricht ab
+    crash = [4]
+
+    def simulate(key, pool):
+        simulated.append(key)
+        if len(simulated) in crash:
+            raise RuntimeError("abgebrochen")
+        return cache.store_result(key, pool.simulate(stub_job(tmp_path / "results", key)), meta={"run": key})
+
+    with stub_pool() as pool:
+        first = run_pipeline(
+            [key for key in keys if not cache.has_result(key)], lambda key: key, partial(simulate, pool=pool),
+            n_generate=0)
+        assert first["done"] == 5 and len(first["failed"]) == 1
+        # Halb geschriebener Eintrag eines abgestürzten Laufs zählt nicht
+        os.makedirs(cache._entry("results", keys[-1]) + ".tmp-crash")
+        missing = [key for key in keys if not cache.has_result(key)]
+        assert missing == [first["failed"][0][0]]
+        crash.clear()
+        second = run_pipeline(missing, lambda key: key, partial(simulate, pool=pool), n_generate=0)
+    assert second["done"] == 1 and not second["failed"]
+    assert all(cache.has_result(key) for key in keys)
+    assert os.path.isfile(cache.result_path(missing[0]))
+    assert len(simulated) == 7
+
+
+def test_result_cache_model(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    write(str(tmp_path / "package" / "package.mo"), "package P")
+    key = "ab" * 32
+    assert cache.model_path(key) is None and cache.model_meta(key) is None
+    path = cache.store_model(key, str(tmp_path / "package"), meta={"package": "P"})
+    assert cache.model_path(key) == path
+    assert read(os.path.join(path, "package.mo")) == "package P"
+    assert cache.model_meta(key)["package"] == "P"
+
+
+def test_file_digest_follows_changes(tmp_path):
+    path = str(tmp_path / "weather.mos")
+    write(path, "first")
+    first = file_digest(path)
+    assert file_digest(path) == first
+    write(path, "changed")
+    assert file_digest(path) != first
@@ -0,0 +1,87 @@
+"""Parquet result store round-trip."""
+import numpy as np
+import pytest
+
+from result_store import DEFAULT_VARIABLES, ResultStore, load_variables
+from simulators import StubBackend
+from sweep import SweepSpec
+
+pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+SPEC = SweepSpec({
+    "leased_area": [75, 100],
+    "year_of_construction": 1970,
+    "number_of_floors": 1,
+    "height_of_floors": 3.0,
+    "with_ahu": False,
+    "residential_layout": 0,
+    "internal_gains": 1,
+    "with_heating": True,
+    "construction": ["tabula_standard", "tabula_retrofit"],
+    "retrofit": "none",
+})
+SCHEDULE = {"scenario": 1, "weekend": 1, "holiday": [4, 5]}
+DAY = {"start_time": 0, "stop_time": 86400, "output_interval": 3600}
+
+
+def stub_results(path, n):
+    backend = StubBackend(simulation_setup=DAY, variables=DEFAULT_VARIABLES)
+    return [backend.simulate({"savepath": str(path), "result_file_name": "run" + str(index)}) for index in range(n)]
+
+
+def test_result_store_round_trip(tmp_path):
+    files = stub_results(tmp_path / "runs", 4)
+    with ResultStore(str(tmp_path / "store"), batch_runs=3) as store:
+        for index, result_file in enumerate(files):
+            assert store.add("key" + str(index), result_file, SPEC.variant(index), SCHEDULE)
+        assert not store.add("key0", files[0], SPEC.variant(0), SCHEDULE)
+
+    store = ResultStore(str(tmp_path / "store"))
+    assert store.keys() == {"key0", "key1", "key2", "key3"}
+    assert not store.add("key1", files[1], SPEC.variant(1), SCHEDULE)
+    frame = store.read()
+    assert len(frame) == 4 * 25
+    for index, result_file in enumerate(files):
+        run = frame[frame["key"] == "key" + str(index)]
+        time_axis, values = load_variables(result_file, DEFAULT_VARIABLES)
+        np.testing.assert_array_equal(run["time"], time_axis)
+        np.testing.assert_array_equal(run[list(DEFAULT_VARIABLES)].to_numpy(), values)
+        assert set(run["construction"]) == {SPEC.variant(index)["construction"]}
+    assert set(frame["holiday"]) == {"4-5"}
+
+
+def test_result_store_selects_columns_and_rows(tmp_path):
+    import pyarrow.dataset as ds
+
+    files = stub_results(tmp_path / "runs", 4)
+    with ResultStore(str(tmp_path / "store"), batch_runs=2) as store:
+        for index, result_file in enumerate(files):
+            store.add("key" + str(index), result_file, SPEC.variant(index), SCHEDULE)
+    frame = store.read(columns=["key", "multizone.TAir[1]"], filter=ds.field("construction") == "tabula_retrofit")
+    assert list(frame.columns) == ["key", "multizone.TAir[1]"]
+    assert set(frame["key"]) == {"key1", "key3"}
+    # Jede Datei enthält vollständige Läufe
+    runs = [run for run in store.iter_runs(columns=["key", "time"])]
+    assert len(runs) == 2
+    assert sorted(key for run in runs for key in run["key"].unique()) == ["key0", "key1", "key2", "key3"]
+
+
+def test_result_store_missing_variables_and_old_files(tmp_path):
+    import pandas as pd
+
+    files = stub_results(tmp_path / "runs", 2)
+    variables = DEFAULT_VARIABLES[:2] + ("multizone.missing",)
+    store_path = tmp_path / "store"
+    with ResultStore(str(store_path), variables=variables) as store:
+        store.add("old", files[0], SPEC.variant(0), SCHEDULE)
+    # Datei einer früheren Version ohne Dimension "retrofit"
+    part, = store_path.glob("*.parquet")
+    pd.read_parquet(part).drop(columns="retrofit").to_parquet(part, index=False)
+    with ResultStore(str(store_path), variables=variables) as store:
+        store.add("new", files[1], SPEC.variant(1), SCHEDULE)
+    frame = store.read(columns=["key", "retrofit", "multizone.missing"]).set_index("key")
+    assert frame["multizone.missing"].isna().all()
+    assert frame.loc["old", "retrofit"].isna().all()
+    assert (frame.loc["new", "retrofit"] == "none").all()
+    assert sorted(run["key"].iloc[0] for run in store.iter_runs(columns=["key", "retrofit"])) == ["new", "old"]
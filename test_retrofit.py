@@ -0,0 +1,53 @@
+"""Retrofit variants derived from one base building."""
+import pytest
+
+from retrofit import RETROFIT_SETTINGS, RETROFIT_SPEC, layer_signature, retrofit_options, retrofit_variant, \
+    retrofit_variants
+from teaser_models import calc_building, new_project
+
+
+def test_retrofit_options():
+    options = retrofit_options(RETROFIT_SPEC)
+    assert [option["type_of_retrofit"] for option in options] == ["retrofit", "adv_retrofit"]
+    assert all(option["year_of_retrofit"] == 2015 for option in options)
+    assert retrofit_options({"year_of_retrofit": 2020}) == [
+        {"year_of_retrofit": 2020, "type_of_retrofit": None, "window_type": None, "material": None}]
+    with pytest.raises(ValueError):
+        retrofit_options({"colour": ["red"]})
+
+
+@pytest.fixture
+def base():
+    pytest.importorskip("teaser")
+    prj = new_project("Retrofit", "tabula_de")
+    building = prj.add_residential(
+        method="tabula_de", usage="single_family_house", name="Base", year_of_construction=1962,
+        number_of_floors=2, height_of_floors=3.0, net_leased_area=120, construction_type="tabula_standard")
+    calc_building(prj, building)
+    return prj, building
+
+
+def test_retrofit_variant_leaves_base_untouched(base):
+    prj, building = base
+    heat_load = building.sum_heat_load
+    signatures = [layer_signature(zone) for zone in building.thermal_zones]
+    variant = retrofit_variant(building, type_of_retrofit="adv_retrofit", name="Variant", **RETROFIT_SETTINGS)
+    assert variant is not building and variant.internal_id != building.internal_id
+    assert variant.name == "Variant" and variant.year_of_retrofit == 2015
+    assert [layer_signature(zone) for zone in building.thermal_zones] == signatures
+    assert building.sum_heat_load == heat_load
+    assert 0 < variant.sum_heat_load < heat_load
+    # Ohne Projekt nicht exportierbar, Projekt und Datenbasis geteilt
+    assert prj.buildings == [building]
+    assert variant.parent is prj
+
+
+def test_retrofit_variants_attach_to_project(base):
+    prj, building = base
+    loads = {}
+    for option, variant in retrofit_variants(building, retrofit_options()):
+        loads[option["type_of_retrofit"]] = variant.sum_heat_load
+    assert loads["adv_retrofit"] < loads["retrofit"] < building.sum_heat_load
+    attached = retrofit_variant(building, type_of_retrofit="retrofit", project=prj, **RETROFIT_SETTINGS)
+    assert [other for other in prj.buildings if other is attached] == [attached]
+    assert attached.sum_heat_load == pytest.approx(loads["retrofit"])
@@ -0,0 +1,233 @@
+"""Schedule engine against the original week/day loop."""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import schedules
+
+# 24 h Profile, wie sie TEASER für die fünf Zonen liefert
+PERSONS = tuple(tuple(0.1 * zone + 0.01 * hour for hour in range(24)) for zone in range(schedules.N_ZONES))
+HEATING = tuple(tuple(293.15 + 0.1 * zone + (hour % 3) for hour in range(24)) for zone in range(schedules.N_ZONES))
+
+
+def legacy_profiles(scenario, weekend, holiday, W_G):
+    # Unveränderte Schleife der ursprünglichen Variantenstudie (Wochen x Tage mit list.extend)
+    zone0_M = []
+    zone1_M = []
+    zone2_M = []
+    zone3_M = []
+    zone4_M = []
+    zone0_H = []
+    zone1_H = []
+    zone2_H = []
+    zone3_H = []
+    zone4_H = []
+    zone0_P = []
+    zone1_P = []
+    zone2_P = []
+    zone3_P = []
+    zone4_P = []
+    for x in range(53):
+        if x in holiday:
+            if scenario == 1 and weekend == 0 or scenario == 1 and weekend == 1:
+                for y in range(7):
+                    zone0_M.extend([0]*24)
+                    zone1_M.extend([0.165]*24)
+                    zone2_M.extend([0]*24)
+                    zone3_M.extend([0]*24)
+                    zone4_M.extend([0] * 24)
+                    zone0_P.extend([0] * 24)
+                    zone1_P.extend([0] * 24)
+                    zone2_P.extend([0] * 24)
+                    zone3_P.extend([0] * 24)
+                    zone4_P.extend([0] * 24)
+                    zone0_H.extend([288.15] * 24)
+                    zone1_H.extend([288.15] * 24)
+                    zone2_H.extend([288.15] * 24)
+                    zone3_H.extend([288.15] * 24)
+                    zone4_H.extend([288.15] * 24)
+
+            elif scenario == 2 and weekend == 0 or scenario == 2 and weekend == 1:
+                for y in range(7):
+                    zone0_M.extend([0] * 24)
+                    zone1_M.extend([0.165] * 24)
+                    zone2_M.extend([0] * 24)
+                    zone3_M.extend([0] * 24)
+                    zone4_M.extend([0] * 24)
+                    zone0_P.extend([0] * 24)
+                    zone1_P.extend([0] * 24)
+                    zone2_P.extend([0] * 24)
+                    zone3_P.extend([0] * 24)
+                    zone4_P.extend([0] * 24)
+                    zone0_H.extend([288.15] * 24)
+                    zone1_H.extend([288.15] * 24)
+                    zone2_H.extend([288.15] * 24)
+                    zone3_H.extend([288.15] * 24)
+                    zone4_H.extend([288.15] * 24)
+            else:
+                print(
+                    'Scenario ' + str(scenario) + ' nicht vorhanden. Kein Modell erstellt!')
+                raise ValueError('Scenario ' + str(scenario))
+        else:
+            if scenario == 1 and weekend == 0:
+                for y in range(5):
+                    zone0_M.extend([0, 0, 0, 0, 0, 0, 0, 0.06, 0.2376, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.297, 0.297, 0.297, 0.2994, 0])
+                    zone1_M.extend([0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.7004, 0.165, 0.165, 0.165, 0.165])
+                    zone2_M.extend([0, 0, 0, 0, 0, 0, 0, 0, 0.005, 0, 0.005, 0, 0, 0, 0, 0, 0, 0.005, 0, 0, 0, 0, 0.03, 0])
+                    zone3_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0.06])
+                    zone4_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0.15, 0.15, 0.15, 0.15, 0, 0, 0, 0.06, 0])
+                    zone0_P.extend(W_G.thermal_zones[0].use_conditions.persons_profile)
+                    zone1_P.extend(W_G.thermal_zones[1].use_conditions.persons_profile)
+                    zone2_P.extend(W_G.thermal_zones[2].use_conditions.persons_profile)
+                    zone3_P.extend(W_G.thermal_zones[3].use_conditions.persons_profile)
+                    zone4_P.extend(W_G.thermal_zones[4].use_conditions.persons_profile)
+                    zone0_H.extend(W_G.thermal_zones[0].use_conditions.heating_profile)
+                    zone1_H.extend(W_G.thermal_zones[1].use_conditions.heating_profile)
+                    zone2_H.extend(W_G.thermal_zones[2].use_conditions.heating_profile)
+                    zone3_H.extend(W_G.thermal_zones[3].use_conditions.heating_profile)
+                    zone4_H.extend(W_G.thermal_zones[4].use_conditions.heating_profile)
+                for y in range(5, 7):
+                    zone0_M.extend([0]*24)
+                    zone1_M.extend([0.165] * 24)
+                    zone2_M.extend([0] * 24)
+                    zone3_M.extend([0] * 24)
+                    zone4_M.extend([0] * 24)
+                    zone0_P.extend([0] * 24)
+                    zone1_P.extend([0] * 24)
+                    zone2_P.extend([0] * 24)
+                    zone3_P.extend([0] * 24)
+                    zone4_P.extend([0] * 24)
+                    zone0_H.extend([288.15] * 24)
+                    zone1_H.extend([288.15] * 24)
+                    zone2_H.extend([288.15] * 24)
+                    zone3_H.extend([288.15] * 24)
+                    zone4_H.extend([288.15] * 24)
+            elif scenario == 1 and weekend == 1:
+                for y in range(5):
+                    zone0_M.extend([0, 0, 0, 0, 0, 0, 0, 0.06, 0.2376, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.297, 0.297, 0.297, 0.2994, 0])
+                    zone1_M.extend([0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165,0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.7004, 0.165, 0.165, 0.165, 0.165])
+                    zone2_M.extend([0, 0, 0, 0, 0, 0, 0, 0, 0.005, 0, 0.005, 0, 0, 0, 0, 0, 0, 0.005, 0, 0, 0, 0, 0.03, 0])
+                    zone3_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0.06])
+                    zone4_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0.15, 0.15, 0.15, 0.15, 0, 0, 0, 0.06, 0])
+                    zone0_P.extend(W_G.thermal_zones[0].use_conditions.persons_profile)
+                    zone1_P.extend(W_G.thermal_zones[1].use_conditions.persons_profile)
+                    zone2_P.extend(W_G.thermal_zones[2].use_conditions.persons_profile)
+                    zone3_P.extend(W_G.thermal_zones[3].use_conditions.persons_profile)
+                    zone4_P.extend(W_G.thermal_zones[4].use_conditions.persons_profile)
+                    zone0_H.extend(W_G.thermal_zones[0].use_conditions.heating_profile)
+                    zone1_H.extend(W_G.thermal_zones[1].use_conditions.heating_profile)
+                    zone2_H.extend(W_G.thermal_zones[2].use_conditions.heating_profile)
+                    zone3_H.extend(W_G.thermal_zones[3].use_conditions.heating_profile)
+                    zone4_H.extend(W_G.thermal_zones[4].use_conditions.heating_profile)
+                for y in range(5, 7):
+                    zone0_M.extend([0, 0, 0, 0, 0, 0, 0, 0.06, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0, 0, 0.255, 0.255])
+                    zone1_M.extend([0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165, 0.165, 0.165, 0.165, 0.165, 0.7004, 0.165, 0.165, 0.165, 0.165])
+                    zone2_M.extend([0, 0, 0, 0, 0, 0, 0.03, 0, 0.005, 0, 0.005, 0, 0, 0, 0, 0, 0, 0.005, 0, 0, 0, 0, 0.03, 0])
+                    zone3_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0.06])
+                    zone4_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0.15, 0.15, 0.15, 0.15, 0, 0, 0, 0.06, 0])
+                    zone0_P.extend(W_G.thermal_zones[0].use_conditions.persons_profile)
+                    zone1_P.extend(W_G.thermal_zones[1].use_conditions.persons_profile)
+                    zone2_P.extend(W_G.thermal_zones[2].use_conditions.persons_profile)
+                    zone3_P.extend(W_G.thermal_zones[3].use_conditions.persons_profile)
+                    zone4_P.extend(W_G.thermal_zones[4].use_conditions.persons_profile)
+                    zone0_H.extend(W_G.thermal_zones[0].use_conditions.heating_profile)
+                    zone1_H.extend(W_G.thermal_zones[1].use_conditions.heating_profile)
+                    zone2_H.extend(W_G.thermal_zones[2].use_conditions.heating_profile)
+                    zone3_H.extend(W_G.thermal_zones[3].use_conditions.heating_profile)
+                    zone4_H.extend(W_G.thermal_zones[4].use_conditions.heating_profile)
+            elif scenario == 2 and weekend == 0:
+                for y in range(5):
+                    zone0_M.extend([0, 0, 0, 0, 0, 0, 0, 0.06, 0.2376, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.297, 0.297, 0.297, 0.2994, 0])
+                    zone1_M.extend([0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165, 0.165, 0.165, 0.165, 0.165, 0.7004, 0.165, 0.165, 0.165, 0.165])
+                    zone2_M.extend([0, 0, 0, 0, 0, 0, 0, 0, 0.005, 0, 0.005, 0, 0, 0, 0, 0, 0, 0.005, 0, 0, 0, 0, 0.03, 0])
+                    zone3_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0.06])
+                    zone4_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0.15, 0.15, 0.15, 0.15, 0, 0, 0, 0.06, 0])
+                    zone0_P.extend(W_G.thermal_zones[0].use_conditions.persons_profile)
+                    zone1_P.extend(W_G.thermal_zones[1].use_conditions.persons_profile)
+                    zone2_P.extend(W_G.thermal_zones[2].use_conditions.persons_profile)
+                    zone3_P.extend(W_G.thermal_zones[3].use_conditions.persons_profile)
+                    zone4_P.extend(W_G.thermal_zones[4].use_conditions.persons_profile)
+                    zone0_H.extend([294.15] * 24)
+                    zone1_H.extend([294.15] * 24)
+                    zone2_H.extend([294.15] * 24)
+                    zone3_H.extend([294.15] * 24)
+                    zone4_H.extend([294.15] * 24)
+                for y in range(5, 7):
+                    zone0_M.extend([0]*24)
+                    zone1_M.extend([0.165] * 24)
+                    zone2_M.extend([0] * 24)
+                    zone3_M.extend([0] * 24)
+                    zone4_M.extend([0] * 24)
+                    zone0_P.extend([0] * 24)
+                    zone1_P.extend([0] * 24)
+                    zone2_P.extend([0] * 24)
+                    zone3_P.extend([0] * 24)
+                    zone4_P.extend([0] * 24)
+                    zone0_H.extend([294.15] * 24)
+                    zone1_H.extend([294.15] * 24)
+                    zone2_H.extend([294.15] * 24)
+                    zone3_H.extend([294.15] * 24)
+                    zone4_H.extend([294.15] * 24)
+            elif scenario == 2 and weekend == 1:
+                for y in range(5):
+                    zone0_M.extend([0, 0, 0, 0, 0, 0, 0, 0.06, 0.2376, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.18, 0.297, 0.297, 0.297, 0.2994, 0])
+                    zone1_M.extend([0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165, 0.165, 0.165, 0.165, 0.165, 0.7004, 0.165, 0.165, 0.165, 0.165])
+                    zone2_M.extend([0, 0, 0, 0, 0, 0, 0, 0, 0.005, 0, 0.005, 0, 0, 0, 0, 0, 0, 0.005, 0, 0, 0, 0, 0.03, 0])
+                    zone3_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0.06])
+                    zone4_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0.15, 0.15, 0.15,0.15, 0, 0, 0, 0.06, 0])
+                    zone0_P.extend(W_G.thermal_zones[0].use_conditions.persons_profile)
+                    zone1_P.extend(W_G.thermal_zones[1].use_conditions.persons_profile)
+                    zone2_P.extend(W_G.thermal_zones[2].use_conditions.persons_profile)
+                    zone3_P.extend(W_G.thermal_zones[3].use_conditions.persons_profile)
+                    zone4_P.extend(W_G.thermal_zones[4].use_conditions.persons_profile)
+                    zone0_H.extend([294.15] * 24)
+                    zone1_H.extend([294.15] * 24)
+                    zone2_H.extend([294.15] * 24)
+                    zone3_H.extend([294.15] * 24)
+                    zone4_H.extend([294.15] * 24)
+                for y in range(5, 7):
+                    zone0_M.extend([0, 0, 0, 0, 0, 0, 0, 0.06, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0.255, 0, 0, 0.255, 0.255])
+                    zone1_M.extend([0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165, 0.165, 0.165, 0.165, 0.165, 0.48, 0.165, 0.165, 0.165, 0.165, 0.165, 0.7004, 0.165, 0.165, 0.165, 0.165])
+                    zone2_M.extend([0, 0, 0, 0, 0, 0, 0.03, 0, 0.005, 0, 0.005, 0, 0, 0, 0, 0, 0, 0.005, 0, 0, 0, 0, 0.03, 0])
+                    zone3_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0.06])
+                    zone4_M.extend([0, 0, 0, 0, 0, 0, 0.06, 0, 0, 0, 0, 0, 0, 0, 0, 0.15, 0.15, 0.15, 0.15, 0, 0, 0, 0.06, 0])
+                    zone0_P.extend(W_G.thermal_zones[0].use_conditions.persons_profile)
+                    zone1_P.extend(W_G.thermal_zones[1].use_conditions.persons_profile)
+                    zone2_P.extend(W_G.thermal_zones[2].use_conditions.persons_profile)
+                    zone3_P.extend(W_G.thermal_zones[3].use_conditions.persons_profile)
+                    zone4_P.extend(W_G.thermal_zones[4].use_conditions.persons_profile)
+                    zone0_H.extend([294.15] * 24)
+                    zone1_H.extend([294.15] * 24)
+                    zone2_H.extend([294.15] * 24)
+                    zone3_H.extend([294.15] * 24)
+                    zone4_H.extend([294.15] * 24)
+            else:
+                print(
+                    'Scenario ' + str(
+                        scenario) + ' nicht vorhanden. Kein Modell erstellt!')
+                raise ValueError('Scenario ' + str(scenario))
+    return {
+        "machines_profile": [zone0_M, zone1_M, zone2_M, zone3_M, zone4_M],
+        "persons_profile": [zone0_P, zone1_P, zone2_P, zone3_P, zone4_P],
+        "heating_profile": [zone0_H, zone1_H, zone2_H, zone3_H, zone4_H],
+    }
+
+
+@pytest.mark.parametrize("scenario, weekend", [(1, 0), (1, 1), (2, 0), (2, 1)])
+@pytest.mark.parametrize("holiday", [[4, 5, 20, 21, 40, 41], [], [0, 52]])
+def test_schedules_match_legacy_loop(scenario, weekend, holiday):
+    W_G = SimpleNamespace(thermal_zones=[
+        SimpleNamespace(use_conditions=SimpleNamespace(persons_profile=list(persons), heating_profile=list(heating)))
+        for persons, heating in zip(PERSONS, HEATING)])
+    expected = legacy_profiles(scenario, weekend, holiday, W_G)
+    for zone in range(schedules.N_ZONES):
+        profiles = schedules.zone_profiles(scenario, weekend, holiday, zone, PERSONS[zone], HEATING[zone])
+        for attr, profile in profiles.items():
+            assert len(profile) == 53 * 7 * 24
+            np.testing.assert_array_equal(profile, expected[attr][zone], err_msg=attr + " zone " + str(zone))
+
+
+def test_schedules_unknown_scenario():
+    with pytest.raises(ValueError):
+        schedules.zone_profiles(3, 0, [], 0, PERSONS[0], HEATING[0])
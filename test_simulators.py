@@ -0,0 +1,76 @@
+"""SessionPool and StubBackend."""
+import os
+import threading
+import time
+from functools import partial
+
+import pytest
+
+from result_store import DEFAULT_VARIABLES, load_variables
+from simulators import SessionDirs, SessionPool, StubBackend
+from time_chunks import DAY
+
+# Eine Woche mit Stundenwerten statt eines Jahres
+WEEK = {"start_time": 0, "stop_time": 7 * DAY, "output_interval": 3600}
+
+
+def stub_pool(n_cpu=2, **kwargs):
+    return SessionPool(partial(StubBackend, variables=DEFAULT_VARIABLES, simulation_setup=WEEK, **kwargs), n_cpu)
+
+
+def stub_job(savepath, name, setup=WEEK):
+    return {"savepath": os.fspath(savepath), "result_file_name": name, "simulation_setup": setup}
+
+
+def test_session_pool_reuses_sessions(tmp_path):
+    pool = stub_pool(n_cpu=2, delay=0.01)
+    with pool:
+        results = pool.simulate_batch([stub_job(tmp_path, "run" + str(index)) for index in range(8)])
+        sessions = list(pool._sessions)
+    assert [os.path.basename(path) for path in results] == ["run" + str(index) + ".npz" for index in range(8)]
+    assert all(os.path.isfile(path) for path in results)
+    # Höchstens n_cpu Sessions, alle Jobs auf diese verteilt und beim Schließen beendet
+    assert 1 <= len(sessions) <= 2
+    assert sum(len(session.jobs) for session in sessions) == 8
+    assert all(session.closed for session in sessions)
+    with pytest.raises(RuntimeError):
+        pool.simulate(stub_job(tmp_path, "late"))
+
+
+def test_stub_backend_runs(tmp_path):
+    backend = StubBackend(variables=DEFAULT_VARIABLES)
+    job = dict(stub_job(tmp_path, "unused"), runs=[{"result_file_name": "a"}, {"result_file_name": "b"}])
+    paths = backend.simulate(job)
+    assert [os.path.basename(path) for path in paths] == ["a.npz", "b.npz"]
+    time_axis, values = load_variables(paths[0], DEFAULT_VARIABLES)
+    assert time_axis[0] == 0 and time_axis[-1] == WEEK["stop_time"]
+    assert values.shape == (len(time_axis), len(DEFAULT_VARIABLES))
+
+
+class DirectoryBackend:
+    # Wie Dymola: eine Simulation belegt das Arbeitsverzeichnis der Session
+    busy = set()
+    lock = threading.Lock()
+
+    def __init__(self, cd):
+        self.cd = cd
+
+    def simulate(self, job):
+        with self.lock:
+            if self.cd in self.busy:
+                raise RuntimeError("Working directory in use: " + self.cd)
+            self.busy.add(self.cd)
+        time.sleep(0.02)
+        with self.lock:
+            self.busy.discard(self.cd)
+        return self.cd
+
+    def close(self):
+        pass
+
+
+def test_sessions_get_own_working_directories(tmp_path):
+    with SessionPool(SessionDirs(DirectoryBackend, tmp_path / "simulators"), n_cpu=3) as pool:
+        directories = pool.simulate_batch([{} for _ in range(12)])
+    assert 1 < len(set(directories)) <= 3
+    assert all(os.path.isdir(cd) and os.path.dirname(cd) == str(tmp_path / "simulators") for cd in directories)
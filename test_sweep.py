@@ -0,0 +1,50 @@
+"""SweepSpec decoding and sharding."""
+import pytest
+
+from sweep import SweepSpec, parse_shard
+
+SPEC = {
+    "leased_area": {"min": 50, "max": 150, "step": 50},
+    "year_of_construction": [1900, 1970, 2003],
+    "number_of_floors": 1,
+    "height_of_floors": [2.5, 3.0],
+    "with_ahu": False,
+    "residential_layout": 0,
+    "internal_gains": 1,
+    "with_heating": [True, False],
+    "construction": ["tabula_standard", "tabula_retrofit"],
+    "retrofit": "none",
+}
+
+
+def test_sweep_spec_decodes_every_index():
+    spec = SweepSpec(SPEC)
+    assert len(spec) == 3 * 3 * 2 * 2 * 2
+    variants = [spec.variant(index) for index in range(len(spec))]
+    assert len({tuple(variant.values()) for variant in variants}) == len(spec)
+    assert all(spec.index(variant) == index for index, variant in enumerate(variants))
+    # Letzte Dimension am schnellsten, wie die früheren Schleifen
+    assert variants[0]["construction"] == "tabula_standard"
+    assert variants[1]["construction"] == "tabula_retrofit"
+    assert variants[0]["leased_area"] == 50 and variants[-1]["leased_area"] == 150
+
+
+@pytest.mark.parametrize("n_shards", [1, 3, 7, 100])
+def test_sweep_shards_partition_the_grid(n_shards):
+    spec = SweepSpec(SPEC)
+    shards = [list(spec.indices(parse_shard(str(index) + "/" + str(n_shards)))) for index in range(n_shards)]
+    flat = [index for shard in shards for index in shard]
+    assert sorted(flat) == list(range(len(spec)))
+    assert len(flat) == len(set(flat))
+
+
+def test_sweep_spec_rejects_bad_input():
+    with pytest.raises(ValueError):
+        SweepSpec(dict(SPEC, unknown=[1]))
+    with pytest.raises(ValueError):
+        SweepSpec({name: value for name, value in SPEC.items() if name != "construction"})
+    with pytest.raises(ValueError):
+        SweepSpec(dict(SPEC, leased_area={"min": 50, "max": 40, "step": 5}))
+    for text in ("3/3", "-1/2", "1", "a/b"):
+        with pytest.raises(ValueError):
+            parse_shard(text)
@@ -0,0 +1,86 @@
+"""Chunked annual runs stitched back into one result."""
+import os
+import threading
+from functools import partial
+
+import numpy as np
+import pytest
+
+from result_store import DEFAULT_VARIABLES, load_variables
+from simulators import SessionDirs, SessionPool, StubBackend
+from time_chunks import DAY, chunk_windows, compare_results, simulate_chunked
+
+# Eine Woche mit Stundenwerten statt eines Jahres
+WEEK = {"start_time": 0, "stop_time": 7 * DAY, "output_interval": 3600}
+
+
+def stub_pool(n_cpu=2, **kwargs):
+    return SessionPool(partial(StubBackend, variables=DEFAULT_VARIABLES, simulation_setup=WEEK, **kwargs), n_cpu)
+
+
+def stub_job(savepath, name, setup=WEEK):
+    return {"savepath": os.fspath(savepath), "result_file_name": name, "simulation_setup": setup}
+
+
+def test_chunk_windows_cover_the_period():
+    windows = chunk_windows("week", warmup=DAY, simulation_setup={"start_time": 0, "stop_time": 28 * DAY})
+    assert [window["keep_start"] for window in windows] == [0, 7 * DAY, 14 * DAY, 21 * DAY]
+    assert windows[0]["start_time"] == 0 and windows[1]["start_time"] == 6 * DAY
+    assert windows[-1]["stop_time"] == 28 * DAY
+    with pytest.raises(ValueError):
+        chunk_windows("day")
+
+
+def test_chunks_are_stitched_without_gaps(tmp_path):
+    setup = {"start_time": 0, "stop_time": 28 * DAY, "output_interval": 3600}
+    job = dict(stub_job(tmp_path, "unused", setup), runs=[{"result_file_name": "a"}, {"result_file_name": "b"}])
+    with stub_pool(n_cpu=3) as pool:
+        stitched = simulate_chunked(pool, job, DEFAULT_VARIABLES, chunk="week", warmup=2 * DAY)
+        full = pool.simulate(dict(job, runs=[{"result_file_name": "a_full"}, {"result_file_name": "b_full"}]))
+    assert [os.path.basename(path) for path in stitched] == ["a.npz", "b.npz"]
+    # Zwischenergebnisse der Abschnitte werden entfernt
+    assert sorted(os.listdir(str(tmp_path))) == ["a.npz", "a_full.npz", "b.npz", "b_full.npz"]
+    time_axis, values = load_variables(stitched[0], DEFAULT_VARIABLES)
+    full_time, _ = load_variables(full[0], DEFAULT_VARIABLES)
+    # Jeder Zeitpunkt genau einmal, Vorlauf verworfen
+    np.testing.assert_array_equal(time_axis, full_time)
+    assert not np.isnan(values).any()
+    errors = compare_results(stitched[0], full[0], DEFAULT_VARIABLES)
+    assert set(errors) == set(DEFAULT_VARIABLES)
+
+
+class SessionBackend(StubBackend):
+    # Stub mit Arbeitsverzeichnis, das während einer Simulation belegt ist
+    busy = set()
+    lock = threading.Lock()
+
+    def __init__(self, cd, **kwargs):
+        super().__init__(**kwargs)
+        self.cd = cd
+
+    def simulate(self, job):
+        with self.lock:
+            if self.cd in self.busy:
+                raise RuntimeError("Working directory in use: " + self.cd)
+            self.busy.add(self.cd)
+        try:
+            return super().simulate(job)
+        finally:
+            with self.lock:
+                self.busy.discard(self.cd)
+
+
+def test_chunks_run_on_several_sessions(tmp_path):
+    setup = {"start_time": 0, "stop_time": 28 * DAY, "output_interval": 3600}
+    job = stub_job(tmp_path / "results", "a", setup)
+    factory = SessionDirs(partial(SessionBackend, delay=0.05, variables=DEFAULT_VARIABLES), tmp_path / "simulators")
+    with SessionPool(factory, n_cpu=4) as pool:
+        stitched = simulate_chunked(pool, job, DEFAULT_VARIABLES, chunk="week", warmup=DAY)
+        full = pool.simulate(dict(job, result_file_name="a_full"))
+        sessions = [session for session in pool._sessions if session.jobs]
+    # Abschnitte eines Jobs gleichzeitig, jede Session in ihrem eigenen Verzeichnis
+    assert len(sessions) > 1
+    assert len({session.cd for session in sessions}) == len(sessions)
+    assert sum(len(session.jobs) for session in sessions) == 5
+    np.testing.assert_array_equal(
+        load_variables(stitched, DEFAULT_VARIABLES)[0], load_variables(full, DEFAULT_VARIABLES)[0])
@@ -0,0 +1,55 @@
+"""Per-stage tracing."""
+import json
+import os
+
+import numpy as np
+import pytest
+
+from tracing import Tracer, rss_mb, stage
+
+
+def test_stage_records_memory_change_of_the_stage():
+    if rss_mb() is None:
+        pytest.skip("resident memory not available")
+    events = []
+    with stage(events, "allocate", "v"):
+        data = np.ones(64 * 1024 * 1024 // 8)
+    with stage(events, "idle", "v"):
+        pass
+    allocate, idle = events
+    assert allocate["rss_delta_mb"] > 48
+    # Spitze des Prozesses bleibt, der Zuwachs gilt nur für die Stufe
+    assert abs(idle["rss_delta_mb"]) < 16
+    assert idle["process_peak_rss_mb"] >= allocate["rss_mb"] - 1
+    del data
+
+
+def test_stage_without_events():
+    with stage(None, "build"):
+        pass
+
+
+def test_tracer_writes_chrome_trace(tmp_path):
+    with Tracer(str(tmp_path), total=4, interval=3600.0) as tracer:
+        for variant in ("a", "b"):
+            events = []
+            with stage(events, "build", variant):
+                pass
+            with stage(events, "simulate", variant):
+                pass
+            tracer.variant_done(events, count=2)
+        assert tracer.summary().startswith("4/4 Varianten")
+    with open(tracer.chrome_path) as file:
+        text = file.read()
+    # JSON-Array ohne Abschluss, wie es chrome://tracing und Perfetto auch nach einem Absturz lesen
+    assert text.startswith("[\n") and text.endswith(",\n")
+    trace = json.loads(text.rstrip(",\n") + "]")
+    assert [(event["name"], event["args"]["variant"]) for event in trace] == [
+        ("build", "a"), ("simulate", "a"), ("build", "b"), ("simulate", "b")]
+    for event in trace:
+        assert event["ph"] == "X" and event["pid"] == os.getpid()
+        assert event["ts"] > 1e15 and event["dur"] >= 0
+        assert set(event["args"]) == {"variant", "cpu_s", "rss_mb", "rss_delta_mb"}
+    with open(tracer.log_path) as file:
+        log = [json.loads(line) for line in file]
+    assert [event["stage"] for event in log] == ["build", "simulate", "build", "simulate"]
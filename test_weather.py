@@ -0,0 +1,61 @@
+"""Weather cache and degree days."""
+import numpy as np
+import pytest
+
+import weather
+from weather import heating_degree_days, load_weather, read_mos
+
+
+def write_mos(path, t_out):
+    # Minimale TMY3-Datei: Kopf, Tabellendeklaration und 30 Spalten je Stunde
+    lines = ["#1", "double tab1(" + str(len(t_out)) + ",30)", "#LOCATION,Test"]
+    for hour, value in enumerate(t_out):
+        row = [hour * 3600.0, value, 0.0, 80.0] + [0.0] * 4 + [100.0 + hour % 24, 50.0, 30.0] + [0.0] * 19
+        lines.append("\t".join(str(item) for item in row))
+    path.write_text("\n".join(lines) + "\n", encoding="latin-1")
+    return str(path)
+
+
+def year(cold_days, t_cold=5.0, t_warm=18.0):
+    return np.repeat(np.where(np.arange(365) < cold_days, t_cold, t_warm), 24)
+
+
+def test_load_weather_parses_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(weather, "_loaded", {})
+    path = write_mos(tmp_path / "test.mos", year(100))
+    cache_dir = str(tmp_path / "cache")
+    parsed = read_mos(path)
+    loaded = load_weather(path, cache_dir)
+    for name in weather.COLUMNS:
+        np.testing.assert_array_equal(loaded[name], parsed[name])
+    assert load_weather(path, cache_dir) is loaded
+    assert len(list((tmp_path / "cache").glob("*.npy"))) == 1
+
+    # Neuer Prozess: Cache-Datei memory-mapped statt erneut einlesen
+    monkeypatch.setattr(weather, "_loaded", {})
+    monkeypatch.setattr(weather, "read_mos", lambda path: pytest.fail("parsed again"))
+    mapped = load_weather(path, cache_dir)
+    assert isinstance(mapped["dry_bulb"].base, np.memmap) or isinstance(mapped["dry_bulb"], np.memmap)
+    assert not mapped["dry_bulb"].flags.writeable
+    np.testing.assert_array_equal(mapped["global_horizontal"], parsed["global_horizontal"])
+
+
+def test_load_weather_follows_file_content(tmp_path, monkeypatch):
+    monkeypatch.setattr(weather, "_loaded", {})
+    path = write_mos(tmp_path / "test.mos", year(100))
+    first = load_weather(path, str(tmp_path / "cache"))
+    write_mos(tmp_path / "test.mos", year(50))
+    second = load_weather(path, str(tmp_path / "cache"))
+    assert len(list((tmp_path / "cache").glob("*.npy"))) == 2
+    assert heating_degree_days(first) == 1500.0
+    assert heating_degree_days(second) == 750.0
+
+
+def test_heating_degree_days():
+    data = {"dry_bulb": year(100)}
+    # 100 Tage mit 5 °C unter der Heizgrenze: je 20 - 5 = 15 Kd
+    assert heating_degree_days(data) == 1500.0
+    assert heating_degree_days(data, monthly=True) == [465.0, 420.0, 465.0, 150.0] + [0.0] * 8
+    assert heating_degree_days(data, t_limit=4.0) == 0.0
+    # Angebrochener letzter Tag zählt nicht
+    assert heating_degree_days({"dry_bulb": np.append(year(100), [0.0] * 12)}) == 1500.0
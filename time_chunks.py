@@ -0,0 +1,126 @@
+"""Annual simulation split into monthly or weekly chunks run in parallel.
+
+Every chunk is an ordinary job with its own ``simulation_setup`` that
+starts a warm-up period before the chunk, so the building mass reaches a
+realistic state; the warm-up output is discarded when the chunk results
+are stitched back into one continuous result file per run. The chunks of
+one job are simulated concurrently through the ``SessionPool``, so the
+latency of a single variant drops with the number of sessions. The sessions
+must not share a working directory (Dymola sessions are created through
+``SessionDirs``), as every chunk translates and simulates the same model.
+
+``compare_results`` reports the stitching error against a full-year run.
+"""
+import os
+
+import numpy as np
+
+from result_store import load_variables
+from simulators import SIMULATION_SETUP, job_runs
+
+DAY = 86400.0
+# Monatsanfänge eines Nicht-Schaltjahres in Tagen (Wetterdaten TRY: 365 Tage)
+MONTH_STARTS = (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+CHUNKS = ("month", "week")
+
+# numpy < 2.0 kennt nur trapz
+_trapezoid = getattr(np, "trapezoid", None) or np.trapz
+
+
+def chunk_windows(chunk="month", warmup=7 * DAY, simulation_setup=None):
+    """Split the simulation period into windows.
+
+    Returns dicts with ``start_time`` (begin of the warm-up), ``keep_start``
+    and ``stop_time``; only output in [keep_start, stop_time) is kept, the
+    last window also keeps its stop time.
+    """
+    setup = simulation_setup or SIMULATION_SETUP
+    start, stop = setup["start_time"], setup["stop_time"]
+    if chunk == "month":
+        year = 365 * DAY
+        first_year = int(start // year)
+        boundaries = [
+            (first_year + year_index) * year + day * DAY
+            for year_index in range(int(stop // year) - first_year + 1) for day in MONTH_STARTS]
+    elif chunk == "week":
+        boundaries = list(np.arange(start, stop, 7 * DAY))
+    else:
+        raise ValueError("Unknown chunk '" + str(chunk) + "', use one of " + ", ".join(CHUNKS))
+    boundaries = sorted({start} | {value for value in boundaries if start < value < stop}) + [stop]
+    if warmup < 0:
+        raise ValueError("warmup must not be negative, got " + str(warmup))
+    return [
+        {"start_time": max(start, keep_start - warmup), "keep_start": keep_start, "stop_time": keep_stop}
+        for keep_start, keep_stop in zip(boundaries[:-1], boundaries[1:])]
+
+
+def chunk_jobs(job, windows):
+    # Ein Job je Zeitfenster, alle Läufe (Nutzungsprofile) des Jobs darin
+    setup = job.get("simulation_setup") or SIMULATION_SETUP
+    jobs = []
+    for index, window in enumerate(windows):
+        suffix = "_chunk" + str(index).zfill(2)
+        chunk = dict(job, simulation_setup=dict(
+            setup, start_time=window["start_time"], stop_time=window["stop_time"]))
+        if "runs" in job:
+            chunk["runs"] = [dict(run, result_file_name=run["result_file_name"] + suffix) for run in job["runs"]]
+        else:
+            chunk["result_file_name"] = job["result_file_name"] + suffix
+        jobs.append(chunk)
+    return jobs
+
+
+def stitch_results(result_files, windows, variables, path):
+    times = []
+    values = []
+    for index, (result_file, window) in enumerate(zip(result_files, windows)):
+        time, data = load_variables(os.fspath(result_file), variables)
+        keep = time >= window["keep_start"]
+        if index < len(windows) - 1:
+            keep &= time < window["stop_time"]
+        times.append(time[keep])
+        values.append(data[keep])
+    values = np.concatenate(values)
+    np.savez(path, time=np.concatenate(times), **{name: values[:, column] for column, name in enumerate(variables)})
+    return path
+
+
+def simulate_chunked(pool, job, variables, chunk="month", warmup=7 * DAY, keep_chunks=False):
+    """Simulate ``job`` chunk-wise through ``pool``; same return value as ``pool.simulate``."""
+    windows = chunk_windows(chunk, warmup, job.get("simulation_setup"))
+    jobs = chunk_jobs(job, windows)
+    chunk_results = pool.simulate_batch(jobs)
+    if "runs" not in job:
+        chunk_results = [[result] for result in chunk_results]
+    results = []
+    for index, run in enumerate(job_runs(job)):
+        files = [os.fspath(results_of_chunk[index]) for results_of_chunk in chunk_results]
+        results.append(stitch_results(
+            files, windows, variables, os.path.join(job["savepath"], run["result_file_name"] + ".npz")))
+        if not keep_chunks:
+            for result_file in files:
+                os.remove(result_file)
+    return results if "runs" in job else results[0]
+
+
+def compare_results(chunked_file, full_file, variables):
+    """Error of the stitched result against a full-year run, per variable.
+
+    Returns ``{variable: {"max_abs", "rmse", "rel_integral"}}``; the full
+    run is interpolated to the time steps of the stitched result.
+    """
+    time, chunked = load_variables(os.fspath(chunked_file), variables)
+    full_time, full = load_variables(os.fspath(full_file), variables)
+    errors = {}
+    for column, name in enumerate(variables):
+        reference = np.interp(time, full_time, full[:, column])
+        difference = chunked[:, column] - reference
+        if np.all(np.isnan(difference)):
+            continue
+        integral = _trapezoid(reference, time)
+        errors[name] = {
+            "max_abs": float(np.nanmax(np.abs(difference))),
+            "rmse": float(np.sqrt(np.nanmean(difference ** 2))),
+            "rel_integral": float(_trapezoid(difference, time) / integral) if integral else 0.0,
+        }
+    return errors
@@ -0,0 +1,159 @@
+"""Per-stage tracing of sweep variants.
+
+Stages (build, calc, retrofit, export, translate, simulate, ingest) are measured with
+``stage(events, name)``: wall time, CPU time of the executing thread and the
+change of the resident memory of the process over the stage; the peak
+resident memory of the process since its start is recorded alongside. Events are plain dicts collected in a
+list that travels with the job, so stages running in worker processes are
+traced as well. The ``Tracer`` in the main process appends them to a JSON
+lines log and a Chrome trace (``chrome://tracing`` / Perfetto, JSON array
+format written incrementally, so it stays readable after a crash) and
+prints a live summary with variants per hour, ETA and mean stage times.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def rss_mb():
+    # Aktueller residenter Speicher des Prozesses
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+def process_peak_rss_mb():
+    # Höchster residenter Speicher seit Prozessstart, nicht je Stufe
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux: KiB, macOS: Byte
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    try:
+        import psutil
+    except ImportError:
+        return None
+    info = psutil.Process().memory_info()
+    return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+
+
+@contextmanager
+def stage(events, name, variant=None):
+    if events is None:
+        yield
+        return
+    start = time.time()
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    rss = rss_mb()
+    try:
+        yield
+    finally:
+        rss_end = rss_mb()
+        events.append({
+            "variant": variant,
+            "stage": name,
+            "start": start,
+            "wall": time.perf_counter() - wall,
+            "cpu": time.thread_time() - cpu,
+            "rss_mb": rss_end,
+            "rss_delta_mb": rss_end - rss if rss is not None and rss_end is not None else None,
+            "process_peak_rss_mb": process_peak_rss_mb(),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        })
+
+
+class Tracer:
+
+    def __init__(self, trace_dir, total=None, interval=60.0):
+        os.makedirs(trace_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.log_path = os.path.join(trace_dir, "stages-" + stamp + ".jsonl")
+        self.chrome_path = os.path.join(trace_dir, "trace-" + stamp + ".json")
+        self._log = open(self.log_path, "a", encoding="utf-8")
+        self._chrome = open(self.chrome_path, "w", encoding="utf-8")
+        self._chrome.write("[\n")
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self.stage_totals = {}
+        self._start = time.time()
+        self._last_report = self._start
+        self._lock = threading.Lock()
+
+    def record(self, events):
+        with self._lock:
+            for event in events:
+                self._log.write(json.dumps(event, default=str) + "\n")
+                self._chrome.write(json.dumps({
+                    "name": event["stage"],
+                    "cat": "sweep",
+                    "ph": "X",
+                    "ts": event["start"] * 1e6,
+                    "dur": event["wall"] * 1e6,
+                    "pid": event["pid"],
+                    "tid": event["tid"],
+                    "args": {
+                        "variant": event["variant"],
+                        "cpu_s": event["cpu"],
+                        "rss_mb": event["rss_mb"],
+                        "rss_delta_mb": event["rss_delta_mb"],
+                    },
+                }) + ",\n")
+                totals = self.stage_totals.setdefault(event["stage"], [0, 0.0, 0.0])
+                totals[0] += 1
+                totals[1] += event["wall"]
+                # Größter Speicherzuwachs einer Ausführung der Stufe
+                totals[2] = max(totals[2], event["rss_delta_mb"] or 0.0)
+            self._log.flush()
+            self._chrome.flush()
+
+    def variant_done(self, events=(), count=1):
+        self.record(events)
+        with self._lock:
+            self.done += count
+            now = time.time()
+            if now - self._last_report >= self.interval:
+                self._last_report = now
+                print(self.summary())
+
+    def summary(self):
+        elapsed = time.time() - self._start
+        rate = self.done / elapsed * 3600 if elapsed > 0 else 0.0
+        text = str(self.done)
+        if self.total:
+            text += "/" + str(self.total)
+        text += " Varianten, %.0f/h" % rate
+        if self.total and rate > 0:
+            remaining = (self.total - self.done) / rate * 3600
+            text += ", ETA " + time.strftime("%H:%M", time.localtime(time.time() + remaining))
+        for name, (count, wall, growth) in self.stage_totals.items():
+            text += " | %s %.2f s (RSS max +%.0f MB)" % (name, wall / count, growth)
+        return text
+
+    def close(self):
+        with self._lock:
+            self._log.close()
+            self._chrome.close()
+        print(self.summary())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,95 @@
+"""Reading of Modelica TMY3 weather files (.mos).
+
+``load_weather`` parses a file only once: the selected columns are stored
+as a binary ``.npy`` array named after the SHA-256 of the file content and
+memory-mapped read-only afterwards. All processes of a host share the same
+pages, so neither parsing nor copying of the weather data is repeated per
+variant or worker. ``heating_degree_days`` derives the degree-day number
+used to normalise heating demand to a reference climate.
+"""
+import os
+import tempfile
+import uuid
+
+import numpy as np
+
+from result_cache import file_digest
+
+# Spalten der TMY3-Tabelle (0-basiert), vgl. Buildings/AixLib ReaderTMY3
+COLUMNS = {
+    "time": 0,
+    "dry_bulb": 1,  # °C
+    "relative_humidity": 3,  # %
+    "global_horizontal": 8,  # Wh/m²
+    "direct_normal": 9,  # Wh/m²
+    "diffuse_horizontal": 10,  # Wh/m²
+}
+
+# Gradtagzahl G20/15 nach VDI 3807: Raumtemperatur 20 °C, Heizgrenze 15 °C
+T_ROOM = 20.0
+T_HEATING_LIMIT = 15.0
+
+_loaded = {}
+
+
+def read_mos(path):
+    # Kommentare (#) und die Tabellendeklaration "double tab1(8760,30)" überspringen
+    rows = []
+    with open(path, encoding="latin-1") as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith("#") or line.startswith("double"):
+                continue
+            rows.append(line.replace(",", " ").split())
+    table = np.asarray(rows, dtype=np.float64)
+    return {name: table[:, column] for name, column in COLUMNS.items()}
+
+
+def default_cache_dir():
+    return os.path.join(tempfile.gettempdir(), "weather_cache")
+
+
+def load_weather(path, cache_dir=None):
+    """Like ``read_mos``, but parsed once per file content and memory-mapped.
+
+    The returned arrays are read-only views into the shared cache file.
+    """
+    path = os.fspath(path)
+    digest = file_digest(os.path.abspath(path))
+    if digest in _loaded:
+        return _loaded[digest]
+    cache_dir = cache_dir or default_cache_dir()
+    cache_file = os.path.join(cache_dir, digest + ".npy")
+    if not os.path.isfile(cache_file):
+        weather = read_mos(path)
+        os.makedirs(cache_dir, exist_ok=True)
+        # Erst vollständig schreiben, dann umbenennen: parallele Worker sehen nie halbe Dateien
+        tmp = os.path.join(cache_dir, "." + digest + "-" + uuid.uuid4().hex + ".npy")
+        np.save(tmp, np.column_stack([weather[name] for name in COLUMNS]))
+        os.replace(tmp, cache_file)
+    table = np.load(cache_file, mmap_mode="r")
+    weather = {name: table[:, column] for column, name in enumerate(COLUMNS)}
+    _loaded[digest] = weather
+    return weather
+
+
+def daily_mean_temperature(weather):
+    # Stundenwerte -> Tagesmittel; ein angebrochener letzter Tag entfällt
+    t_out = np.asarray(weather["dry_bulb"])
+    n_days = len(t_out) // 24
+    return t_out[:n_days * 24].reshape(n_days, 24).mean(axis=1)
+
+
+def heating_degree_days(weather, t_room=T_ROOM, t_limit=T_HEATING_LIMIT, monthly=False):
+    """Degree-day number [Kd] of the weather period (G20/15 by default).
+
+    With ``monthly=True`` a list of 12 values for the months of a 365 day
+    year is returned instead of the annual sum.
+    """
+    daily = daily_mean_temperature(weather)
+    degree_days = np.where(daily < t_limit, t_room - daily, 0.0)
+    if not monthly:
+        return float(degree_days.sum())
+    month_starts = np.cumsum([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30])
+    month_starts = month_starts[month_starts < len(degree_days)]
+    return np.add.reduceat(degree_days, month_starts).tolist()